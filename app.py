@@ -2,23 +2,44 @@ import os
 import django
 import streamlit as st
 import pandas as pd
-from datetime import datetime
 
 # ==========================================
 # 1. CONFIGURAÇÃO DO AMBIENTE DJANGO
 # ==========================================
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'legislativo.settings')  # AJUSTE AQUI
-django.setup()
 
-from www.models import (  # AJUSTE AQUI
-    TipoProposicao, Autor, Comissao, Proposicao, Reuniao, Tramitacao, Parecer
+
+@st.cache_resource
+def configurar_django():
+    # O Streamlit reexecuta o script a cada interação: o setup só na primeira
+    django.setup()
+
+
+configurar_django()
+
+from django.db import transaction  # noqa: E402
+from django.db.models import ProtectedError  # noqa: E402
+
+from www.banco_relatorios import usar_banco_relatorios  # noqa: E402
+from www.filtros import filtrar_lista_proposicoes  # noqa: E402
+from www.indicadores import obter_indicadores  # noqa: E402
+from www.models import (  # noqa: E402  AJUSTE AQUI
+    Autor, Comissao, ParecerVencido, Proposicao, Reuniao, Tramitacao
 )
+from www.paginacao import paginar_por_chave  # noqa: E402
+from www.tabelas import comissoes_ativas, tipos_ativos  # noqa: E402
+from www.views_combos import filtrar_autores, filtrar_reunioes  # noqa: E402
 
 # ==========================================
 # 2. CONFIGURAÇÃO DA PÁGINA STREAMLIT
 # ==========================================
 st.set_page_config(page_title="Sistema Legislativo CRUD", page_icon="🏛️", layout="wide")
 
+TAMANHO_PAGINA = 50     # linhas por página nas tabelas
+LIMITE_OPCOES = 20      # opções por busca nos seletores
+TTL_LISTAS = 60         # s; as gravações daqui invalidam na hora (invalidar())
+TTL_OPCOES = 300
+
 
 def main():
     st.sidebar.title("🏛️ Menu do Sistema")
@@ -50,17 +71,281 @@ def main():
 
 
 # ==========================================
-# 3. MÓDULOS CRUD
+# 3. LEITURAS EM CACHE
+# ==========================================
+# Cada leitura devolve só o necessário para a tela (DataFrame de uma
+# página, ou pares (id, rótulo) para os seletores) e fica no cache do
+# Streamlit entre as reexecuções. Quem grava chama invalidar() com as
+# leituras afetadas; o TTL cobre as gravações feitas pelo site.
+# As listas leem do principal (mostram na hora o que se acabou de gravar);
+# só as contagens do dashboard vão para o banco dos relatórios.
+
+def _pagina(qs, ordenacao, linha, apos=None, antes=None):
+    """Uma página por chave (www/paginacao.py): sem OFFSET e sem COUNT."""
+    pagina = paginar_por_chave(qs, ordenacao, TAMANHO_PAGINA, apos=apos, antes=antes)
+    return {
+        "dados": pd.DataFrame([linha(obj) for obj in pagina.object_list]),
+        "numero": pagina.number,
+        "anterior": pagina.token_anterior,
+        "proxima": pagina.token_proxima,
+    }
+
+
+@st.cache_data(ttl=TTL_LISTAS, show_spinner=False)
+@usar_banco_relatorios()
+def contagens():
+    # COUNT nas tabelas grandes: no banco dos relatórios (www/banco_relatorios.py)
+    return {
+        "proposicoes": Proposicao.objects.count(),
+        "reunioes": Reuniao.objects.count(),
+        "pareceres_relator": Tramitacao.objects.exclude(parecer="").count(),
+        "votos_vencidos": ParecerVencido.objects.count(),
+    }
+
+
+@st.cache_data(ttl=TTL_LISTAS, show_spinner=False)
+def pagina_autores(busca, apos=None, antes=None):
+    qs = filtrar_autores(Autor.objects.all(), busca)
+    return _pagina(qs, ("nome", "id"), lambda a: {
+        "ID": a.id, "Nome": a.nome, "Sexo": a.get_sexo_display(), "Ativo": a.ativo,
+    }, apos, antes)
+
+
+@st.cache_data(ttl=TTL_LISTAS, show_spinner=False)
+def lista_comissoes():
+    return tuple(Comissao.objects.order_by("sigla").values_list("id", "sigla", "nome", "ativa"))
+
+
+@st.cache_data(ttl=TTL_LISTAS, show_spinner=False)
+def pagina_proposicoes(tipo_id, numero, busca, apos=None, antes=None):
+    qs = filtrar_lista_proposicoes(
+        Proposicao.objects.select_related("tipo", "comissao_atual"),
+        tipo=tipo_id, numero=numero, busca=busca,
+    )
+    return _pagina(qs, ("numero",), lambda p: {
+        "Número": p.numero,
+        "Formatado": p.numero_formatado,
+        "Tipo": p.tipo.sigla,
+        "Publicação": p.data_publicacao,
+        "Comissão atual": p.comissao_atual.sigla if p.comissao_atual else "",
+        "Aguardando parecer": p.aguardando_parecer,
+    }, apos, antes)
+
+
+@st.cache_data(ttl=TTL_LISTAS, show_spinner=False)
+def pagina_reunioes(comissao_id, busca, apos=None, antes=None):
+    qs = Reuniao.objects.select_related("comissao")
+    if comissao_id:
+        qs = qs.filter(comissao_id=comissao_id)
+    qs = filtrar_reunioes(qs, busca)
+    return _pagina(qs, ("-data", "-hora", "-id"), lambda r: {
+        "Comissão": r.comissao.sigla,
+        "Tipo": r.get_tipo_display(),
+        "Nº/Ano": f"{r.numero}/{r.ano}",
+        "Data": r.data,
+        "Hora": r.hora,
+    }, apos, antes)
+
+
+def _tramitacoes_da_busca(qs, busca):
+    """Tramitações das proposições que casam com o número ou o texto buscado."""
+    if not busca:
+        return qs
+    campo = "numero" if busca.isdigit() else "busca"
+    proposicoes = filtrar_lista_proposicoes(Proposicao.objects.all(), **{campo: busca})
+    return qs.filter(proposicao_id__in=proposicoes.values("numero"))
+
+
+@st.cache_data(ttl=TTL_LISTAS, show_spinner=False)
+def pagina_tramitacoes(comissao_id, busca, apos=None, antes=None):
+    qs = Tramitacao.objects.select_related("proposicao__tipo", "comissao")
+    if comissao_id:
+        qs = qs.filter(comissao_id=comissao_id)
+    qs = _tramitacoes_da_busca(qs, busca)
+    return _pagina(qs, ("-data_entrada", "-id"), lambda t: {
+        "Proposição": f"{t.proposicao.tipo.sigla} {t.proposicao.numero_formatado}",
+        "Comissão": t.comissao.sigla,
+        "Entrada": t.data_entrada,
+        "Saída": t.data_saida,
+    }, apos, antes)
+
+
+@st.cache_data(ttl=TTL_LISTAS, show_spinner=False)
+def pagina_pareceres_relator(comissao_id, busca, apos=None, antes=None):
+    qs = (
+        Tramitacao.objects
+        .exclude(parecer="")
+        .select_related("proposicao__tipo", "comissao", "relator", "reuniao__comissao")
+        .defer("texto", "proposicao__ementa")
+    )
+    if comissao_id:
+        qs = qs.filter(comissao_id=comissao_id)
+    qs = _tramitacoes_da_busca(qs, busca)
+    return _pagina(qs, ("-data_entrada", "-id"), lambda t: {
+        "Proposição": f"{t.proposicao.tipo.sigla} {t.proposicao.numero_formatado}",
+        "Comissão": t.comissao.sigla,
+        "Relator": t.relator.nome if t.relator else "",
+        "Reunião": t.reuniao.descricao_combo if t.reuniao else "",
+        "Decisão": t.parecer,
+    }, apos, antes)
+
+
+@st.cache_data(ttl=TTL_LISTAS, show_spinner=False)
+def pagina_votos_vencidos(comissao_id, busca, apos=None, antes=None):
+    qs = (
+        ParecerVencido.objects
+        .select_related("tramitacao__proposicao__tipo", "tramitacao__comissao", "relator")
+        .defer("texto", "tramitacao__texto", "tramitacao__proposicao__ementa")
+    )
+    if comissao_id:
+        qs = qs.filter(tramitacao__comissao_id=comissao_id)
+    if busca:
+        qs = qs.filter(tramitacao__in=_tramitacoes_da_busca(Tramitacao.objects.all(), busca).values("pk"))
+    return _pagina(qs, ("-data_apresentacao", "-id"), lambda v: {
+        "Proposição": f"{v.tramitacao.proposicao.tipo.sigla} {v.tramitacao.proposicao.numero_formatado}",
+        "Comissão": v.tramitacao.comissao.sigla,
+        "Relator": v.relator.nome,
+        "Data": v.data_apresentacao,
+        "Decisão": v.parecer,
+    }, apos, antes)
+
+
+# 🔹 Opções dos seletores: no máximo LIMITE_OPCOES, a partir da busca
+
+@st.cache_data(ttl=TTL_OPCOES, show_spinner=False)
+def opcoes_autores(busca):
+    qs = filtrar_autores(Autor.objects.filter(ativo=True).order_by("nome", "pk"), busca)
+    return tuple(qs.values_list("pk", "nome")[:LIMITE_OPCOES])
+
+
+@st.cache_data(ttl=TTL_OPCOES, show_spinner=False)
+def opcoes_proposicoes(busca):
+    qs = Proposicao.objects.all()
+    if busca:
+        campo = "numero" if busca.isdigit() else "busca"
+        qs = filtrar_lista_proposicoes(qs, **{campo: busca})
+    linhas = (
+        qs.order_by("-data_publicacao", "-numero")
+        .values_list("numero", "tipo__sigla", "numero_formatado")[:LIMITE_OPCOES]
+    )
+    return tuple((numero, f"{sigla} {formatado}") for numero, sigla, formatado in linhas)
+
+
+@st.cache_data(ttl=TTL_OPCOES, show_spinner=False)
+def opcoes_tramitacoes(busca):
+    qs = _tramitacoes_da_busca(Tramitacao.objects.all(), busca)
+    linhas = (
+        qs.order_by("-data_entrada", "-id")
+        .values_list(
+            "pk", "proposicao__tipo__sigla", "proposicao__numero_formatado",
+            "comissao__sigla", "data_entrada",
+        )[:LIMITE_OPCOES]
+    )
+    return tuple(
+        (pk, f"{sigla} {formatado} - {comissao} ({entrada:%d/%m/%Y})")
+        for pk, sigla, formatado, comissao, entrada in linhas
+    )
+
+
+@st.cache_data(ttl=TTL_OPCOES, show_spinner=False)
+def opcoes_reunioes(comissao_id, busca):
+    qs = Reuniao.objects.select_related("comissao").order_by("-data", "-hora", "-pk")
+    if comissao_id:
+        qs = qs.filter(comissao_id=comissao_id)
+    return tuple(
+        (r.pk, r.descricao_combo)
+        for r in filtrar_reunioes(qs, busca)[:LIMITE_OPCOES]
+    )
+
+
+@st.cache_data(ttl=TTL_OPCOES, show_spinner=False)
+def comissao_da_tramitacao(tramitacao_id):
+    return Tramitacao.objects.filter(pk=tramitacao_id).values_list("comissao_id", flat=True).first()
+
+
+def invalidar(*leituras):
+    """Descarta as leituras em cache afetadas por uma gravação."""
+    for leitura in leituras:
+        leitura.clear()
+
+
+# ==========================================
+# 4. COMPONENTES
+# ==========================================
+
+def tabela_paginada(chave, carregar, **filtros):
+    """
+    Mostra a página atual de 'carregar(**filtros, apos=, antes=)' com os
+    botões Anterior/Próxima. Os tokens da paginação ficam no session_state;
+    filtros novos voltam para a primeira página.
+    """
+    estado = st.session_state.get(chave)
+    if not estado or estado["filtros"] != filtros:
+        estado = st.session_state[chave] = {"filtros": filtros}
+
+    pagina = carregar(**filtros, apos=estado.get("apos"), antes=estado.get("antes"))
+    if pagina["dados"].empty:
+        st.info("Nenhum registro encontrado.")
+        return
+
+    st.dataframe(pagina["dados"], use_container_width=True, hide_index=True)
+
+    col1, col2, col3 = st.columns([1, 4, 1])
+    if col1.button("◀ Anterior", key=f"{chave}_anterior", disabled=not pagina["anterior"]):
+        st.session_state[chave] = {"filtros": filtros, "antes": pagina["anterior"]}
+        st.rerun()
+    col2.caption(f"Página {pagina['numero'] or '…'} · {TAMANHO_PAGINA} por página")
+    if col3.button("Próxima ▶", key=f"{chave}_proxima", disabled=not pagina["proxima"]):
+        st.session_state[chave] = {"filtros": filtros, "apos": pagina["proxima"]}
+        st.rerun()
+
+
+def seletor(rotulo, opcoes_da_busca, chave, ajuda="Digite parte do nome ou número", **escopo):
+    """
+    Selectbox alimentado por busca: o texto digitado traz até
+    LIMITE_OPCOES opções. Fica fora dos st.form (senão a busca só
+    rodaria no envio). Retorna o id escolhido ou None.
+    """
+    busca = st.text_input(f"Buscar {rotulo.lower()}", key=f"{chave}_busca", help=ajuda)
+    opcoes = dict(opcoes_da_busca(busca=busca.strip(), **escopo))
+    if not opcoes:
+        st.caption(f"Nenhum(a) {rotulo.lower()} encontrado(a).")
+        return None
+    return st.selectbox(rotulo, list(opcoes), format_func=opcoes.get, key=chave)
+
+
+def filtro_comissao(chave):
+    """Selectbox de comissão (ativas) para filtrar as tabelas; None = todas."""
+    comissoes = {c.id: c.sigla for c in comissoes_ativas()}
+    return st.selectbox(
+        "Comissão", [None, *comissoes], key=chave,
+        format_func=lambda c: "Todas" if c is None else comissoes[c],
+    )
+
+
+# ==========================================
+# 5. MÓDULOS CRUD
 # ==========================================
 
 def mostrar_dashboard():
     st.title("📊 Dashboard Legislativo")
 
+    numeros = contagens()
     col1, col2, col3, col4 = st.columns(4)
-    col1.metric("Proposições", Proposicao.objects.count())
-    col2.metric("Comissões Ativas", Comissao.objects.filter(ativa=True).count())
-    col3.metric("Reuniões", Reuniao.objects.count())
-    col4.metric("Pareceres Emitidos", Parecer.objects.count())
+    col1.metric("Proposições", numeros["proposicoes"])
+    col2.metric("Comissões Ativas", len(comissoes_ativas()))
+    col3.metric("Reuniões", numeros["reunioes"])
+    col4.metric("Pareceres Emitidos", numeros["pareceres_relator"],
+                help=f"{numeros['votos_vencidos']} voto(s) vencido(s) além destes")
+
+    # Mesmos indicadores do dashboard do site (em cache, ver www/indicadores.py)
+    with usar_banco_relatorios():
+        indicadores = obter_indicadores()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Em tramitação", indicadores["total"])
+    col2.metric("Aguardando parecer", indicadores["aguardando_parecer"])
+    col3.metric("Entradas (30 dias)", indicadores["entradas_periodo"])
+    col4.metric("Tempo médio (dias)", indicadores["tempo_medio"])
 
 
 def crud_autores():
@@ -68,19 +353,20 @@ def crud_autores():
     tab_listar, tab_cadastrar = st.tabs(["Listar / Excluir", "Cadastrar"])
 
     with tab_listar:
-        autores = Autor.objects.all()
-        if autores.exists():
-            dados = [{"ID": a.id, "Nome": a.nome, "Sexo": a.get_sexo_display(), "Ativo": a.ativo} for a in autores]
-            st.dataframe(pd.DataFrame(dados), use_container_width=True)
-
-            st.markdown("### Excluir Autor")
-            autor_del = st.selectbox("Selecione para excluir:", autores, format_func=lambda x: x.nome)
-            if st.button("Deletar Autor", type="primary"):
-                autor_del.delete()
+        busca = st.text_input("Filtrar pelo nome", key="autores_filtro")
+        tabela_paginada("autores_pagina", pagina_autores, busca=busca.strip())
+
+        st.markdown("### Excluir Autor")
+        autor_id = seletor("Autor", opcoes_autores, "autor_excluir")
+        if autor_id and st.button("Deletar Autor", type="primary"):
+            try:
+                Autor.objects.filter(pk=autor_id).delete()
+            except ProtectedError:
+                st.error("Autor com proposições ou pareceres vinculados: não pode ser excluído.")
+            else:
+                invalidar(pagina_autores, opcoes_autores)
                 st.success("Autor excluído!")
                 st.rerun()
-        else:
-            st.info("Nenhum autor cadastrado.")
 
     with tab_cadastrar:
         with st.form("form_autor"):
@@ -90,6 +376,7 @@ def crud_autores():
             if st.form_submit_button("Salvar Autor"):
                 if nome:
                     Autor.objects.create(nome=nome, sexo=sexo, ativo=ativo)
+                    invalidar(pagina_autores, opcoes_autores)
                     st.success("Autor cadastrado!")
                     st.rerun()
 
@@ -99,16 +386,20 @@ def crud_comissoes():
     tab_listar, tab_cadastrar = st.tabs(["Listar", "Cadastrar"])
 
     with tab_listar:
-        comissoes = Comissao.objects.all()
-        if comissoes.exists():
-            dados = [{"ID": c.id, "Sigla": c.sigla, "Nome": c.nome, "Ativa": c.ativa} for c in comissoes]
-            st.dataframe(pd.DataFrame(dados), use_container_width=True)
+        comissoes = lista_comissoes()
+        if comissoes:
+            dados = [{"ID": id_, "Sigla": sigla, "Nome": nome, "Ativa": ativa}
+                     for id_, sigla, nome, ativa in comissoes]
+            st.dataframe(pd.DataFrame(dados), use_container_width=True, hide_index=True)
 
             st.markdown("### Alterar Status")
-            com_status = st.selectbox("Selecione a Comissão:", comissoes, format_func=lambda x: x.sigla)
+            siglas = {id_: sigla for id_, sigla, _nome, _ativa in comissoes}
+            com_id = st.selectbox("Selecione a Comissão:", list(siglas), format_func=siglas.get)
             if st.button("Inverter Status (Ativar/Inativar)"):
+                com_status = Comissao.objects.get(pk=com_id)
                 com_status.ativa = not com_status.ativa
-                com_status.save()
+                com_status.save()       # o signal renova o cache de www/tabelas.py
+                invalidar(lista_comissoes)
                 st.success(f"Status de {com_status.sigla} alterado!")
                 st.rerun()
 
@@ -120,6 +411,7 @@ def crud_comissoes():
             if st.form_submit_button("Salvar Comissão"):
                 if sigla and nome:
                     Comissao.objects.create(sigla=sigla, nome=nome, ativa=ativa)
+                    invalidar(lista_comissoes)
                     st.success("Comissão cadastrada!")
                     st.rerun()
 
@@ -128,27 +420,34 @@ def crud_proposicoes():
     st.title("📄 Gestão de Proposições")
     tab_listar, tab_cadastrar = st.tabs(["Listar", "Cadastrar Nova"])
 
+    tipos = {t.id: t.nome for t in tipos_ativos()}
+
     with tab_listar:
-        proposicoes = Proposicao.objects.select_related('tipo').all()
-        if proposicoes.exists():
-            dados = [{
-                "Número": p.numero,
-                "Formatado": p.numero_formatado,
-                "Tipo": p.tipo.sigla,
-                "Publicação": p.data_publicacao
-            } for p in proposicoes]
-            st.dataframe(pd.DataFrame(dados), use_container_width=True)
+        col1, col2, col3 = st.columns([1, 1, 2])
+        tipo_id = col1.selectbox("Tipo", [None, *tipos], key="proposicoes_tipo",
+                                 format_func=lambda t: "Todos" if t is None else tipos[t])
+        numero = col2.text_input("Número (início)", key="proposicoes_numero")
+        busca = col3.text_input("Busca na ementa", key="proposicoes_busca")
+        tabela_paginada("proposicoes_pagina", pagina_proposicoes,
+                        tipo_id=tipo_id, numero=numero.strip(), busca=busca.strip())
 
     with tab_cadastrar:
-        with st.form("form_proposicao"):
-            tipos = list(TipoProposicao.objects.filter(ativo=True))
-            if not tipos:
-                st.warning("Cadastre um Tipo de Proposição primeiro (via Django Admin).")
-                return
+        if not tipos:
+            st.warning("Cadastre um Tipo de Proposição primeiro (via Django Admin).")
+            return
+
+        # Autores: a busca traz opções novas, os já escolhidos continuam na lista
+        escolhidos = st.session_state.setdefault("proposicao_autores_rotulos", {})
+        busca_autor = st.text_input("Buscar autor", key="proposicao_autores_busca")
+        opcoes = {**escolhidos, **dict(opcoes_autores(busca_autor.strip()))}
+        autores_sel = st.multiselect("Autores", list(opcoes), format_func=opcoes.get,
+                                     key="proposicao_autores")
+        st.session_state["proposicao_autores_rotulos"] = {a: opcoes[a] for a in autores_sel}
 
+        with st.form("form_proposicao"):
             col1, col2, col3 = st.columns(3)
             with col1:
-                tipo_sel = st.selectbox("Tipo", tipos, format_func=lambda x: x.nome)
+                tipo_id = st.selectbox("Tipo", list(tipos), format_func=tipos.get)
             with col2:
                 numero = st.text_input("Número (ID)", max_chars=11)
             with col3:
@@ -156,21 +455,23 @@ def crud_proposicoes():
 
             ementa = st.text_area("Ementa")
             data_pub = st.date_input("Data de Publicação")
-            autores_sel = st.multiselect("Autores", list(Autor.objects.filter(ativo=True)),
-                                         format_func=lambda x: x.nome)
             link = st.text_input("Link Externo (Opcional)")
 
             if st.form_submit_button("Salvar Proposição"):
                 try:
-                    prop = Proposicao.objects.create(
-                        tipo=tipo_sel, numero=numero, numero_formatado=num_form,
-                        ementa=ementa, data_publicacao=data_pub, link_proposicao=link
-                    )
-                    prop.autores.set(autores_sel)
-                    st.success("Proposição cadastrada!")
-                    st.rerun()
+                    with transaction.atomic():
+                        prop = Proposicao.objects.create(
+                            tipo_id=tipo_id, numero=numero, numero_formatado=num_form,
+                            ementa=ementa, data_publicacao=data_pub, link_proposicao=link
+                        )
+                        prop.autores.set(autores_sel)
                 except Exception as e:
                     st.error(f"Erro: {e}")
+                else:
+                    invalidar(pagina_proposicoes, opcoes_proposicoes, contagens)
+                    st.session_state.pop("proposicao_autores_rotulos", None)
+                    st.success("Proposição cadastrada!")
+                    st.rerun()
 
 
 def crud_reunioes():
@@ -178,27 +479,24 @@ def crud_reunioes():
     tab_listar, tab_cadastrar = st.tabs(["Listar", "Agendar Reunião"])
 
     with tab_listar:
-        reunioes = Reuniao.objects.select_related('comissao').all()
-        if reunioes.exists():
-            dados = [{
-                "Comissão": r.comissao.sigla,
-                "Tipo": r.get_tipo_display(),
-                "Nº/Ano": f"{r.numero}/{r.ano}",
-                "Data": r.data,
-                "Hora": r.hora
-            } for r in reunioes]
-            st.dataframe(pd.DataFrame(dados), use_container_width=True)
+        col1, col2 = st.columns([1, 3])
+        with col1:
+            comissao_id = filtro_comissao("reunioes_comissao")
+        busca = col2.text_input("Busca (ordem, ano, tipo)", key="reunioes_busca",
+                                help='Ex.: "3ª 2025", "extra"')
+        tabela_paginada("reunioes_pagina", pagina_reunioes,
+                        comissao_id=comissao_id, busca=busca.strip())
 
     with tab_cadastrar:
         with st.form("form_reuniao"):
-            comissoes = list(Comissao.objects.filter(ativa=True))
+            comissoes = {c.id: c.nome for c in comissoes_ativas()}
+            tipos = dict(Reuniao.TIPO_CHOICES)
             col1, col2 = st.columns(2)
             with col1:
-                com_sel = st.selectbox("Comissão", comissoes, format_func=lambda x: x.nome)
-                tipo = st.selectbox("Tipo", ["ORDINARIA", "EXTRAORDINARIA"])
+                com_id = st.selectbox("Comissão", list(comissoes), format_func=comissoes.get)
+                tipo = st.selectbox("Tipo", list(tipos), format_func=tipos.get)
                 numero = st.number_input("Número da Reunião", min_value=1)
             with col2:
-                ano = st.number_input("Ano", min_value=2000, value=datetime.now().year)
                 data = st.date_input("Data")
                 hora = st.time_input("Hora")
 
@@ -208,13 +506,15 @@ def crud_reunioes():
             if st.form_submit_button("Salvar Reunião"):
                 try:
                     Reuniao.objects.create(
-                        comissao=com_sel, tipo=tipo, numero=numero, ano=ano,
+                        comissao_id=com_id, tipo=tipo, numero=numero,
                         data=data, hora=hora, pauta=pauta, ata=ata
                     )
+                except Exception as e:
+                    st.error(f"Erro ao agendar a reunião: {e}")
+                else:
+                    invalidar(pagina_reunioes, opcoes_reunioes, contagens)
                     st.success("Reunião agendada!")
                     st.rerun()
-                except Exception as e:
-                    st.error(f"Erro (verifique se já existe reunião com este número/ano na comissão): {e}")
 
 
 def crud_tramitacoes():
@@ -222,22 +522,19 @@ def crud_tramitacoes():
     tab_listar, tab_cadastrar = st.tabs(["Listar", "Registrar Tramitação"])
 
     with tab_listar:
-        trams = Tramitacao.objects.select_related('proposicao', 'comissao').all()
-        if trams.exists():
-            dados = [{
-                "Proposição": t.proposicao.numero_formatado,
-                "Comissão": t.comissao.sigla,
-                "Entrada": t.data_entrada,
-                "Saída": t.data_saida
-            } for t in trams]
-            st.dataframe(pd.DataFrame(dados), use_container_width=True)
+        col1, col2 = st.columns([1, 3])
+        with col1:
+            comissao_id = filtro_comissao("tramitacoes_comissao")
+        busca = col2.text_input("Proposição (número ou texto da ementa)", key="tramitacoes_busca")
+        tabela_paginada("tramitacoes_pagina", pagina_tramitacoes,
+                        comissao_id=comissao_id, busca=busca.strip())
 
     with tab_cadastrar:
+        prop_id = seletor("Proposição", opcoes_proposicoes, "tramitacao_proposicao")
+
         with st.form("form_tram"):
-            prop_sel = st.selectbox("Proposição", list(Proposicao.objects.all()),
-                                    format_func=lambda x: x.numero_formatado)
-            com_sel = st.selectbox("Comissão de Destino", list(Comissao.objects.filter(ativa=True)),
-                                   format_func=lambda x: x.nome)
+            comissoes = {c.id: c.nome for c in comissoes_ativas()}
+            com_id = st.selectbox("Comissão de Destino", list(comissoes), format_func=comissoes.get)
 
             col1, col2 = st.columns(2)
             with col1:
@@ -248,57 +545,87 @@ def crud_tramitacoes():
             obs = st.text_area("Observação")
 
             if st.form_submit_button("Registrar Tramitação"):
+                if not prop_id:
+                    st.error("Escolha a proposição.")
+                    return
                 Tramitacao.objects.create(
-                    proposicao=prop_sel, comissao=com_sel,
+                    proposicao_id=prop_id, comissao_id=com_id,
                     data_entrada=data_in, data_saida=data_out, observacao=obs
                 )
+                invalidar(pagina_tramitacoes, opcoes_tramitacoes, pagina_proposicoes)
                 st.success("Tramitação registrada!")
                 st.rerun()
 
 
 def crud_pareceres():
     st.title("⚖️ Gestão de Pareceres")
-    tab_listar, tab_cadastrar = st.tabs(["Listar", "Emitir Parecer"])
-
-    with tab_listar:
-        pareceres = Parecer.objects.select_related('tramitacao', 'relator', 'reuniao').all()
-        if pareceres.exists():
-            dados = [{
-                "Proposição": p.tramitacao.proposicao.numero_formatado,
-                "Relator": p.relator.nome,
-                "Tipo": p.get_tipo_display(),
-                "Data": p.data_apresentacao,
-                "Decisão": p.parecer
-            } for p in pareceres]
-            st.dataframe(pd.DataFrame(dados), use_container_width=True)
+    tab_relator, tab_vencidos, tab_cadastrar = st.tabs(
+        ["Pareceres do Relator", "Votos Vencidos", "Emitir Parecer"]
+    )
+
+    with tab_relator:
+        col1, col2 = st.columns([1, 3])
+        with col1:
+            comissao_id = filtro_comissao("pareceres_comissao")
+        busca = col2.text_input("Proposição (número ou texto da ementa)", key="pareceres_busca")
+        tabela_paginada("pareceres_pagina", pagina_pareceres_relator,
+                        comissao_id=comissao_id, busca=busca.strip())
+
+    with tab_vencidos:
+        col1, col2 = st.columns([1, 3])
+        with col1:
+            comissao_id = filtro_comissao("vencidos_comissao")
+        busca = col2.text_input("Proposição (número ou texto da ementa)", key="vencidos_busca")
+        tabela_paginada("vencidos_pagina", pagina_votos_vencidos,
+                        comissao_id=comissao_id, busca=busca.strip())
 
     with tab_cadastrar:
-        with st.form("form_parecer"):
-            tram_sel = st.selectbox("Tramitação Referente", list(Tramitacao.objects.all()),
-                                    format_func=lambda x: f"{x.proposicao.numero_formatado} - {x.comissao.sigla}")
-            reuniao_sel = st.selectbox("Reunião", list(Reuniao.objects.all()), format_func=lambda x: x.descricao)
-            relator_sel = st.selectbox("Relator", list(Autor.objects.filter(ativo=True)), format_func=lambda x: x.nome)
+        # O parecer do relator são campos da própria Tramitacao;
+        # o voto vencido é um ParecerVencido ligado a ela.
+        tipo = st.radio("Tipo de Parecer", ["RELATOR", "VENCIDO"], horizontal=True)
+        tram_id = seletor("Tramitação", opcoes_tramitacoes, "parecer_tramitacao",
+                          ajuda="Número da proposição ou texto da ementa")
+        if not tram_id:
+            return
+        reuniao_id = seletor("Reunião", opcoes_reunioes, "parecer_reuniao",
+                             ajuda='Ex.: "3ª", "2025", "extra"',
+                             comissao_id=comissao_da_tramitacao(tram_id))
+        relator_id = seletor("Relator", opcoes_autores, "parecer_relator")
 
+        with st.form("form_parecer"):
             col1, col2 = st.columns(2)
             with col1:
-                tipo = st.selectbox("Tipo de Parecer", ["RELATOR", "VENCIDO"])
                 parecer_resumo = st.text_input("Parecer (Resumo/Decisão)", max_chars=200)
             with col2:
-                data_apresentacao = st.date_input("Data de Apresentação")
+                data_apresentacao = st.date_input("Data de Apresentação",
+                                                  disabled=(tipo == "RELATOR"))
 
             st.caption("Texto Completo (Markdown / HTML permitido)")
             texto = st.text_area("Texto do Parecer", height=200)
 
             if st.form_submit_button("Salvar Parecer"):
-                Parecer.objects.create(
-                    tramitacao=tram_sel, reuniao=reuniao_sel, relator=relator_sel,
-                    tipo=tipo, parecer=parecer_resumo, texto=texto,
-                    data_apresentacao=data_apresentacao
-                )
+                if not (reuniao_id and relator_id):
+                    st.error("Escolha a reunião e o relator.")
+                    return
+                if tipo == "RELATOR":
+                    tramitacao = Tramitacao.objects.get(pk=tram_id)
+                    tramitacao.reuniao_id = reuniao_id
+                    tramitacao.relator_id = relator_id
+                    tramitacao.parecer = parecer_resumo
+                    tramitacao.texto = texto
+                    tramitacao.save()
+                    invalidar(pagina_pareceres_relator, pagina_tramitacoes,
+                              pagina_proposicoes, contagens)
+                else:
+                    ParecerVencido.objects.create(
+                        tramitacao_id=tram_id, reuniao_id=reuniao_id, relator_id=relator_id,
+                        parecer=parecer_resumo, texto=texto,
+                        data_apresentacao=data_apresentacao
+                    )
+                    invalidar(pagina_votos_vencidos, contagens)
                 st.success("Parecer emitido com sucesso!")
                 st.rerun()
 
 
 if __name__ == "__main__":
     main()
-
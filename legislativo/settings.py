@@ -43,10 +43,13 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'www.instrumentacao.InstrumentacaoMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'www.permissoes.ContextoUsuarioMiddleware',
+    'www.banco_relatorios.UltimaEscritaMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -74,11 +77,90 @@ WSGI_APPLICATION = 'legislativo.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
+#
+# Perfil de produção do SQLite (vários workers + processar_pdfs no mesmo arquivo):
+#   - WAL: leituras não bloqueiam a escrita e vice-versa (o modo fica gravado
+#     no arquivo; os demais PRAGMAs valem por conexão e vêm no init_command);
+#   - timeout: espera até 20 s pelo lock em vez de "database is locked" na hora;
+#   - transaction_mode IMMEDIATE: todo atomic() já começa com o lock de escrita.
+#     Numa transação "deferred" que lê e depois escreve, o SQLite não consegue
+#     esperar (o lock de leitura impede o upgrade) e devolve "database is
+#     locked" mesmo com timeout.
+#   - synchronous=NORMAL é seguro com WAL (só a última transação pode se perder
+#     numa queda de energia, o banco não corrompe); mmap e cache de 64 MB.
+# Manutenção: "python manage.py manutencao_banco"; carga concorrente para
+# comparar com o padrão do Django: "python manage.py estressar_banco".
+
+SQLITE_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA temp_store=MEMORY",
+)
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db_sistema_legislativo.sqlite3',
-    }
+        # Conexão reaproveitada entre requisições: os PRAGMAs rodam uma vez por conexão
+        'CONN_MAX_AGE': 60,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'timeout': 20,
+            'transaction_mode': 'IMMEDIATE',
+            'init_command': ';'.join(("PRAGMA journal_mode=WAL", *SQLITE_PRAGMAS)),
+        },
+    },
+}
+
+# Banco de leitura dos relatórios, dashboard, exportações e PDFs (ver
+# www/banco_relatorios.py). Sem configuração é o próprio arquivo principal,
+# só para leitura. Para tirar essa carga do principal, apontar NAME para um
+# snapshot renovado por "python manage.py atualizar_banco_relatorios" (cron)
+# ou para a réplica de um servidor de banco.
+DATABASES['relatorios'] = {
+    **DATABASES['default'],
+    # Sem conexão persistente: o snapshot novo vale já na próxima requisição
+    'CONN_MAX_AGE': 0,
+    'OPTIONS': {
+        'timeout': 20,
+        'init_command': ';'.join((*SQLITE_PRAGMAS, "PRAGMA query_only=ON")),
+    },
+    'TEST': {'MIRROR': 'default'},
+}
+
+DATABASE_ROUTERS = ['www.banco_relatorios.RoteadorRelatorios']
+
+# Depois de um POST, o usuário lê do principal por esse tempo (segundos):
+# vê o que acabou de gravar mesmo que o snapshot ainda não tenha sido renovado.
+BANCO_RELATORIOS_PRINCIPAL_APOS_ESCRITA = 300
+
+
+# Sessões num cookie assinado (SECRET_KEY): login e mensagens não gravam
+# mais na tabela django_session a cada requisição. O "sair" apaga o cookie;
+# para derrubar todas as sessões de uma vez, trocar a SECRET_KEY.
+SESSION_ENGINE = 'django.contrib.sessions.backends.signed_cookies'
+SESSION_COOKIE_HTTPONLY = True
+
+
+# Cache compartilhado entre os processos (workers) do servidor:
+# a invalidação feita por um worker precisa valer para todos.
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+    },
+    # Fragmentos de template por objeto ({% cache %}) e seus contadores de
+    # versão (ver www/fragmentos.py): separados para que a quantidade deles
+    # não expulse as versões do default
+    'template_fragments': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'fragmentos',
+        'TIMEOUT': 60 * 60 * 24 * 7,
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    },
 }
 
 
@@ -171,3 +253,39 @@ CKEDITOR_5_CONFIGS = {
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# PDFs em segundo plano: a requisição só enfileira (TarefaPDF) e o comando
+# "python manage.py processar_pdfs" gera os arquivos. Com False, o modo
+# por tarefa vale apenas quando a URL tiver ?assincrono=1.
+PDF_ASSINCRONO = False
+
+# Cache em disco dos PDFs de parecer e dossiê (ver www/pdf.py).
+# Passando do limite, os PDFs usados há mais tempo são descartados;
+# "python manage.py limpar_cache_pdf" esvazia o cache.
+PDF_CACHE_DIR = BASE_DIR / "cache" / "pdf"
+PDF_CACHE_MAX_MB = 500
+
+# Processos do WeasyPrint para os downloads de ZIP de dossiês na tela: um
+# pool por processo do servidor, dividido entre os downloads simultâneos.
+# O comando exportar_dossies usa DOSSIES_PROCESSOS (padrão: nº de CPUs)
+DOSSIES_PROCESSOS_WEB = 2
+
+# Imagens já decodificadas que cada processo/thread de PDF guarda entre um
+# documento e outro (ver www/motor_pdf.py)
+PDF_CACHE_IMAGENS = 200
+
+# Instrumentação das consultas por requisição (ver www/instrumentacao.py):
+# nº de consultas, tempo de SQL e de template nos cabeçalhos X-Consultas-*
+# e no log; avisa de prováveis N+1 (mesma consulta repetida LIMIAR vezes).
+INSTRUMENTACAO_CONSULTAS = False
+INSTRUMENTACAO_LIMIAR_N_MAIS_1 = 5
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "www.instrumentacao": {"handlers": ["console"], "level": "INFO"},
+    },
+}
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from www.models import TipoProposicao, Autor, Comissao, Proposicao, Tramitacao, PerfilUsuario, ParecerVencido
+from www.models import TipoProposicao, Autor, Comissao, Proposicao, Tramitacao, PerfilUsuario, ParecerVencido, TarefaPDF
 
 admin.site.register(Autor)
 admin.site.register(Proposicao)
@@ -28,3 +28,10 @@ class ComissaoAdmin(admin.ModelAdmin):
     search_fields = ("sigla", "nome")
     ordering = ("nome",)
 
+
+@admin.register(TarefaPDF)
+class TarefaPDFAdmin(admin.ModelAdmin):
+    list_display = ("nome_arquivo", "status", "solicitada_por", "criada_em", "concluida_em")
+    list_filter = ("status",)
+    exclude = ("html",)
+    readonly_fields = ("chave", "arquivo", "erro", "solicitada_por", "iniciada_em", "concluida_em")
@@ -3,3 +3,9 @@ from django.apps import AppConfig
 
 class WwwConfig(AppConfig):
     name = 'www'
+
+    def ready(self):
+        # registra os signals de invalidação do cache do dashboard,
+        # do cache local das tabelas pequenas, dos fragmentos de template
+        # e do GET condicional
+        from www import condicional, fragmentos, indicadores, tabelas  # noqa: F401
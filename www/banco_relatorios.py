@@ -0,0 +1,188 @@
+"""
+Banco de leitura dos relatórios (alias "relatorios" em settings.DATABASES).
+
+Relatórios, dashboard, exportações e PDFs só leem: com o BancoRelatoriosMixin
+as consultas deles vão para o alias "relatorios" — um snapshot do SQLite
+renovado por "python manage.py atualizar_banco_relatorios", a réplica de um
+servidor de banco ou, sem configuração, o próprio arquivo principal aberto
+só para leitura. Um relatório longo deixa de segurar o banco das telas de
+cadastro.
+
+Ficam sempre no principal:
+    - toda escrita (db_for_write);
+    - usuários, sessões e permissões (apps fora do www), o perfil e a fila
+      de PDFs (SEMPRE_NO_PRINCIPAL);
+    - a requisição de quem acabou de gravar algo: por
+      BANCO_RELATORIOS_PRINCIPAL_APOS_ESCRITA segundos o usuário lê do
+      principal e vê o que salvou (o snapshot pode estar atrasado);
+    - as tabelas pequenas (tabelas.py), lidas com usar_banco_principal():
+      um valor do snapshot ficaria guardado com a versão nova do cache.
+Os indicadores do dashboard (indicadores.py) são calculados na cópia, mas
+com validade_cache(): vindo de uma cópia defasada, ficam no cache no
+máximo pela janela de atraso.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.http import FileResponse
+
+ALIAS = "relatorios"
+SEMPRE_NO_PRINCIPAL = {"www.perfilusuario", "www.tarefapdf"}
+CHAVE_SESSAO = "ultima_escrita"
+
+# None = regra padrão do Django; ALIAS ou DEFAULT_DB_ALIAS = forçado
+_banco = ContextVar("www_banco_leitura", default=None)
+
+
+@contextmanager
+def _usar(alias):
+    token = _banco.set(alias)
+    try:
+        yield
+    finally:
+        _banco.reset(token)
+
+
+def usar_banco_relatorios():
+    """Leituras do bloco (ou da função decorada) no banco dos relatórios."""
+    return _usar(ALIAS)
+
+
+def usar_banco_principal():
+    """Leituras do bloco no principal, mesmo dentro de usar_banco_relatorios()."""
+    return _usar(DEFAULT_DB_ALIAS)
+
+
+def em_banco_relatorios(iteravel):
+    """
+    Itera com as leituras no banco dos relatórios. Para respostas em fluxo:
+    as consultas acontecem depois que a view já retornou.
+    """
+    iterador = iter(iteravel)
+    while True:
+        with usar_banco_relatorios():
+            try:
+                item = next(iterador)
+            except StopIteration:
+                return
+        yield item
+
+
+def _janela_atraso():
+    return getattr(settings, "BANCO_RELATORIOS_PRINCIPAL_APOS_ESCRITA", 300)
+
+
+def leitura_defasada():
+    """As leituras de agora vão para uma cópia (snapshot/réplica) do principal?"""
+    if _banco.get() != ALIAS or ALIAS not in settings.DATABASES:
+        return False
+    principal = settings.DATABASES[DEFAULT_DB_ALIAS]
+    copia = settings.DATABASES[ALIAS]
+    return (
+        (str(copia["NAME"]), copia.get("HOST"))
+        != (str(principal["NAME"]), principal.get("HOST"))
+    )
+
+
+def validade_cache(timeout):
+    """Timeout para guardar um valor lido agora: curto se veio de cópia defasada."""
+    if leitura_defasada():
+        return min(timeout, _janela_atraso())
+    return timeout
+
+
+def _escreveu_ha_pouco(request):
+    janela = _janela_atraso()
+    sessao = getattr(request, "session", None)
+    ultima = sessao.get(CHAVE_SESSAO) if sessao is not None else None
+    return ultima is not None and time.time() - ultima < janela
+
+
+# =========================================================================
+# 🔹 Roteador
+# =========================================================================
+
+class RoteadorRelatorios:
+    """settings.DATABASE_ROUTERS: leituras marcadas vão para o alias ALIAS."""
+
+    def db_for_read(self, model, **hints):
+        banco = _banco.get()
+        if banco != ALIAS:
+            return banco
+        if ALIAS not in settings.DATABASES:
+            return DEFAULT_DB_ALIAS
+        opcoes = model._meta
+        if opcoes.app_label != "www" or opcoes.label_lower in SEMPRE_NO_PRINCIPAL:
+            return DEFAULT_DB_ALIAS
+        return ALIAS
+
+    def db_for_write(self, model, **hints):
+        # Também para objetos lidos do snapshot (o Django usaria o banco de origem)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Mesmos dados nos dois bancos
+        bancos = {DEFAULT_DB_ALIAS, ALIAS}
+        if obj1._state.db in bancos and obj2._state.db in bancos:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # O snapshot é cópia do principal; réplicas seguem o servidor
+        return False if db == ALIAS else None
+
+
+# =========================================================================
+# 🔹 Views e middleware
+# =========================================================================
+
+class BancoRelatoriosMixin:
+    """
+    A view lê do banco dos relatórios — inclusive na renderização do
+    template e no conteúdo em fluxo (exportações, ZIP) — salvo se o
+    usuário acabou de gravar algo.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if _escreveu_ha_pouco(request):
+            return super().dispatch(request, *args, **kwargs)
+
+        with usar_banco_relatorios():
+            response = super().dispatch(request, *args, **kwargs)
+            # TemplateResponse só renderiza depois da view: renderiza aqui dentro
+            if hasattr(response, "render") and not response.is_rendered:
+                inicio = time.perf_counter()
+                response.render()
+                # Tempo de template para o InstrumentacaoMiddleware, que não
+                # vê mais esta renderização (atributo criado por ele)
+                if hasattr(request, "_tempo_template"):
+                    request._tempo_template = time.perf_counter() - inicio
+
+        if response.streaming and not isinstance(response, FileResponse):
+            response.streaming_content = em_banco_relatorios(response.streaming_content)
+        return response
+
+
+class UltimaEscritaMiddleware:
+    """
+    Marca na sessão a hora do último POST bem-sucedido do usuário.
+    Vem depois do SessionMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            request.method not in ("GET", "HEAD", "OPTIONS")
+            and response.status_code < 400
+            and getattr(request, "session", None) is not None
+            and request.user.is_authenticated
+        ):
+            request.session[CHAVE_SESSAO] = int(time.time())
+        return response
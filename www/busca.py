@@ -0,0 +1,136 @@
+"""
+Busca textual de proposições (número, número formatado e ementa).
+
+No SQLite usa o índice FTS5 www_proposicao_fts (criado na migração 0009),
+com tokenizador unicode61 sem acentos: "educacao" encontra "Educação".
+O índice é mantido por triggers na www_proposicao, então qualquer escrita
+(ORM, bulk_create ou SQL direto) já o atualiza.
+Em outros bancos, cai no icontains antigo.
+
+As leituras usam o banco que o roteador escolher para Proposicao: numa
+view com BancoRelatoriosMixin, o alias "relatorios" (o snapshot também
+tem o índice FTS). Só reconstruir_indice() escreve, sempre no principal.
+"""
+
+import re
+
+from django.db import connection, connections, router
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from www.models import Proposicao
+
+TABELA_FTS = "www_proposicao_fts"
+
+# Marcadores do snippet(); trocados por <mark> depois do escape do texto
+_INICIO, _FIM = "\x02", "\x03"
+
+_TERMO = re.compile(r"\w+", re.UNICODE)
+
+
+def fts_disponivel(conexao=connection):
+    return conexao.vendor == "sqlite"
+
+
+def expressao_fts(busca):
+    """
+    Converte o texto digitado numa consulta FTS5: cada palavra vira um
+    prefixo entre aspas ("educa"*), todas obrigatórias (AND implícito).
+    Retorna None se não sobrar nenhuma palavra.
+    """
+    termos = _TERMO.findall(busca or "")
+    if not termos:
+        return None
+    return " ".join(f'"{termo}"*' for termo in termos)
+
+
+def filtrar_proposicoes(qs, busca):
+    """Restringe um queryset de Proposicao ao resultado da busca textual."""
+    # A subconsulta roda no banco do próprio queryset
+    if not fts_disponivel(connections[qs.db]):
+        return qs.filter(
+            Q(numero__icontains=busca) |
+            Q(numero_formatado__icontains=busca) |
+            Q(ementa__icontains=busca)
+        )
+
+    expressao = expressao_fts(busca)
+    if expressao is None:
+        return qs.none()
+
+    return qs.filter(pk__in=RawSQL(
+        f"SELECT numero FROM {TABELA_FTS} WHERE {TABELA_FTS} MATCH %s",
+        [expressao],
+    ))
+
+
+def buscar_proposicoes(busca, limite=20):
+    """
+    Proposições mais relevantes para a busca, em ordem de relevância (bm25),
+    cada uma com o atributo 'trecho': a ementa com os termos em <mark>.
+    """
+    conexao = connections[router.db_for_read(Proposicao)]
+    if not fts_disponivel(conexao):
+        resultados = list(
+            filtrar_proposicoes(Proposicao.objects.all(), busca)
+            .select_related("tipo")[:limite]
+        )
+        for proposicao in resultados:
+            proposicao.trecho = proposicao.ementa
+        return resultados
+
+    expressao = expressao_fts(busca)
+    if expressao is None:
+        return []
+
+    # Pesos do bm25 por coluna: numero, numero_formatado, ementa
+    with conexao.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT numero,
+                   snippet({TABELA_FTS}, 2, %s, %s, '…', 24)
+            FROM {TABELA_FTS}
+            WHERE {TABELA_FTS} MATCH %s
+            ORDER BY bm25({TABELA_FTS}, 10.0, 10.0, 1.0)
+            LIMIT %s
+            """,
+            [_INICIO, _FIM, expressao, limite],
+        )
+        linhas = cursor.fetchall()
+
+    proposicoes = Proposicao.objects.select_related("tipo").in_bulk(
+        [numero for numero, _ in linhas]
+    )
+
+    resultados = []
+    for numero, trecho in linhas:
+        proposicao = proposicoes.get(numero)
+        if proposicao is None:
+            continue
+        proposicao.trecho = _destacar(trecho)
+        resultados.append(proposicao)
+    return resultados
+
+
+def _destacar(trecho):
+    """Escapa o HTML do trecho e só então insere os <mark> do snippet()."""
+    return mark_safe(
+        escape(trecho)
+        .replace(_INICIO, "<mark>")
+        .replace(_FIM, "</mark>")
+    )
+
+
+def reconstruir_indice():
+    """Recria todo o conteúdo do índice FTS a partir da www_proposicao."""
+    if not fts_disponivel():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABELA_FTS}")
+        cursor.execute(
+            f"INSERT INTO {TABELA_FTS} (numero, numero_formatado, ementa) "
+            f"SELECT numero, numero_formatado, ementa FROM www_proposicao"
+        )
+        cursor.execute(f"INSERT INTO {TABELA_FTS} ({TABELA_FTS}) VALUES ('optimize')")
@@ -0,0 +1,104 @@
+"""
+GET condicional (ETag / Last-Modified) nas páginas e PDFs das tramitações.
+
+Antes de montar a resposta, uma única consulta agregada lê a última
+alteração do que a página mostra — tramitações, votos vencidos e reuniões
+citadas (alterada_em de cada um) — e o cache dá os contadores de versão de
+www/fragmentos.py (proposição e autores dela, nomes de autores/comissões).
+Se o navegador ou o proxy já tem essa versão (If-None-Match /
+If-Modified-Since), a resposta é um 304: nenhum template é renderizado e o
+WeasyPrint não roda.
+
+O ETag leva também o que muda por usuário (links de edição, "gerado por")
+e a versão dos templates. Nas páginas com formulário (toda página sobre
+base.html tem o do "sair") leva o segredo do CSRF: depois de um novo login
+o token guardado no HTML antigo já não vale, e a página precisa vir de
+novo. As respostas saem "private, no-cache": o cliente guarda o corpo, mas
+confirma a versão a cada uso.
+"""
+
+import hashlib
+
+from django.contrib import messages
+from django.db.models import Count, Max
+from django.db.models.signals import post_delete
+from django.middleware.csrf import get_token
+from django.dispatch import receiver
+from django.utils.cache import get_conditional_response, patch_cache_control, quote_etag
+from django.utils.http import http_date
+from django.utils.timezone import now
+
+from www.models import ParecerVencido, Tramitacao
+
+
+def ultima_alteracao(tramitacoes):
+    """
+    (última alteração, nº de tramitações, nº de votos vencidos) do queryset
+    de tramitações, incluindo votos vencidos e reuniões citadas.
+    """
+    dados = tramitacoes.order_by().aggregate(
+        tramitacoes=Count("pk", distinct=True),
+        votos=Count("pareceres_vencidos", distinct=True),
+        tramitacao=Max("alterada_em"),
+        voto=Max("pareceres_vencidos__alterada_em"),
+        reuniao=Max("reuniao__alterada_em"),
+        reuniao_voto=Max("pareceres_vencidos__reuniao__alterada_em"),
+    )
+    datas = [
+        dados[campo]
+        for campo in ("tramitacao", "voto", "reuniao", "reuniao_voto")
+        if dados[campo]
+    ]
+    return (max(datas) if datas else None), dados["tramitacoes"], dados["votos"]
+
+
+class GetCondicionalMixin:
+    """
+    A view define versao_condicional(): (partes do ETag, última alteração),
+    ou None para responder sem GET condicional. Age no dispatch, antes do
+    get() da view (que pode ser o da própria classe).
+    """
+
+    # Página com {% csrf_token %}: o segredo do CSRF entra no ETag
+    etag_com_csrf = False
+
+    def versao_condicional(self, request, *args, **kwargs):
+        raise NotImplementedError
+
+    def dispatch(self, request, *args, **kwargs):
+        # Mensagem pendente (ex.: "salvo com sucesso") precisa ser exibida
+        versao = None
+        if request.method in ("GET", "HEAD") and not len(messages.get_messages(request)):
+            versao = self.versao_condicional(request, *args, **kwargs)
+        if versao is None:
+            return super().dispatch(request, *args, **kwargs)
+
+        partes, alterada_em = versao
+        if self.etag_com_csrf:
+            # get_token() cria o cookie se ainda não há; o META guarda o segredo
+            get_token(request)
+            partes = (partes, request.META.get("CSRF_COOKIE"))
+        etag = quote_etag(hashlib.sha256(repr(partes).encode("utf-8")).hexdigest()[:32])
+        ultima = int(alterada_em.timestamp()) if alterada_em else None
+
+        response = get_conditional_response(request, etag=etag, last_modified=ultima)
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+
+        if response.status_code in (200, 304):
+            response.headers["ETag"] = etag
+            if ultima is not None:
+                response.headers["Last-Modified"] = http_date(ultima)
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+# =========================================================================
+# 🔹 Exclusão de voto vencido
+# =========================================================================
+# Excluir um voto não deixa alterada_em nenhum mais novo: a tramitação
+# recebe a data da exclusão (update(): sem signals nem usuário de alteração).
+
+@receiver(post_delete, sender=ParecerVencido)
+def tocar_tramitacao(sender, instance, **kwargs):
+    Tramitacao.objects.filter(pk=instance.tramitacao_id).update(alterada_em=now())
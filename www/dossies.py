@@ -0,0 +1,273 @@
+"""
+Dossiê da proposição: HTML, impressão digital (cache de PDF) e geração em lote.
+
+Na geração em lote o HTML é renderizado no processo principal (precisa do
+banco) e só o WeasyPrint vai para um ProcessPoolExecutor. Os PDFs são
+entregues NA ORDEM das proposições, com uma janela limitada de tarefas em
+andamento: a memória não cresce com o tamanho do lote e uma exportação
+interrompida pode ser retomada a partir da última proposição entregue.
+
+Os downloads de ZIP na tela usam um pool único por processo do servidor
+(pool_web), com settings.DOSSIES_PROCESSOS_WEB processos: downloads
+simultâneos dividem esses processos em vez de abrir cada um o seu.
+
+O ZIP é escrito em fluxo (zipfile sobre um FluxoDeBytes, sem seek): cada PDF vira
+bytes de resposta assim que fica pronto, sem montar o arquivo inteiro.
+"""
+
+import os
+import threading
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+
+import django
+from django.conf import settings
+from django.template.loader import render_to_string
+from django.utils.timezone import localdate, localtime, now
+
+from www.exportacao import FluxoDeBytes
+from www.models import Proposicao
+from www.pdf import (
+    gerar_pdf,
+    guardar_em_cache,
+    impressao_digital,
+    pdf_em_cache,
+    resumo_texto,
+    versao_templates,
+)
+
+TEMPLATE = "www/relatorios/dossie_pdf.html"
+
+PREFETCH = (
+    "autores",
+    "tramitacoes__comissao",
+    "tramitacoes__relator",
+    "tramitacoes__reuniao__comissao",
+    "tramitacoes__pareceres_vencidos__relator",
+    "tramitacoes__pareceres_vencidos__reuniao__comissao",
+)
+
+
+def dossies_queryset(qs=None):
+    """Proposições com tudo que o dossiê mostra já carregado."""
+    if qs is None:
+        qs = Proposicao.objects.all()
+    return qs.select_related("tipo").prefetch_related(*PREFETCH)
+
+
+def nome_arquivo_dossie(proposicao):
+    return f"dossie_{proposicao.pk}.pdf"
+
+
+def html_dossie(proposicao, usuario=None):
+    return render_to_string(TEMPLATE, {
+        "proposicao": proposicao,
+        "gerado_em": now(),
+        "gerado_por": usuario,
+    })
+
+
+def impressao_digital_dossie(proposicao, usuario=None):
+    """
+    Tudo que aparece no dossiê. O usuário e o dia entram na chave porque
+    o cabeçalho do PDF informa quem o gerou e quando.
+    """
+    tramitacoes = []
+    for t in proposicao.tramitacoes.all():
+        tramitacoes.append((
+            t.pk,
+            t.alterada_em,
+            t.comissao.nome,
+            t.comissao.sigla,
+            t.relator.nome if t.relator else None,
+            t.reuniao.descricao_combo if t.reuniao else None,
+            [
+                (
+                    v.pk,
+                    v.relator.nome,
+                    v.reuniao.descricao_combo,
+                    v.data_apresentacao,
+                    v.parecer,
+                    resumo_texto(v.texto),
+                )
+                for v in t.pareceres_vencidos.all()
+            ],
+        ))
+
+    return impressao_digital(
+        "dossie",
+        versao_templates(TEMPLATE, "www/relatorios/base_pdf.html"),
+        usuario.pk if usuario else None,
+        localdate(),
+        proposicao.pk,
+        proposicao.numero_formatado,
+        proposicao.ementa,
+        proposicao.data_publicacao,
+        proposicao.link_proposicao,
+        proposicao.tipo.nome,
+        proposicao.tipo.sigla,
+        [a.nome for a in proposicao.autores.all()],
+        tramitacoes,
+    )
+
+
+# =========================================================================
+# 🔹 Geração em lote
+# =========================================================================
+
+def processos_padrao():
+    return getattr(settings, "DOSSIES_PROCESSOS", None) or os.cpu_count() or 2
+
+
+def processos_web():
+    """
+    Processos do pool dos downloads de ZIP na tela (pool_web): poucos, para
+    não lotarem o servidor web.
+    """
+    return getattr(settings, "DOSSIES_PROCESSOS_WEB", 2)
+
+
+def _novo_pool(processos):
+    # spawn: os processos filhos não herdam as conexões do banco nem as
+    # threads do servidor; só importam www.pdf e rodam o WeasyPrint.
+    # django.setup() no início de cada um: o BuscadorLocal do motor de PDF
+    # acha os arquivos de /static/ pelos finders, que dependem dos apps.
+    return ProcessPoolExecutor(max_workers=processos,
+                               mp_context=get_context("spawn"),
+                               initializer=django.setup)
+
+
+_pool_web = None
+_trava_pool_web = threading.Lock()
+
+
+def pool_web():
+    """
+    Pool compartilhado pelos downloads de ZIP deste processo do servidor,
+    criado no primeiro download. Os processos ficam vivos entre um download
+    e outro (e o motor de PDF deles, aquecido).
+    """
+    global _pool_web
+    with _trava_pool_web:
+        if _pool_web is None:
+            _pool_web = _novo_pool(processos_web())
+        return _pool_web
+
+
+def _descartar_pool_web(pool):
+    """Pool quebrado (processo morto): o próximo pool_web() cria outro."""
+    global _pool_web
+    with _trava_pool_web:
+        if _pool_web is pool:
+            _pool_web = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def gerar_dossies(proposicoes, usuario=None, processos=None, ignorar=(),
+                  tamanho_lote=100, compartilhado=False):
+    """
+    Gera os dossiês das proposições (queryset), na ordem do queryset.
+
+    Produz tuplas (proposicao, nome_arquivo, pdf, erro): 'pdf' são os bytes
+    do PDF (None se falhou) e 'erro' a mensagem da falha — uma proposição
+    com problema não derruba o lote inteiro. PDFs já presentes no cache de
+    disco são lidos de lá, sem passar pelo WeasyPrint; os gerados vão para
+    o cache. Proposições cujo pk
+    estiver em 'ignorar' são puladas (retomada de uma exportação).
+
+    compartilhado=True (downloads na tela): usa o pool_web() em vez de abrir
+    um pool próprio com 'processos'.
+    """
+    if compartilhado:
+        processos = processos_web()
+        executor = pool_web()
+    else:
+        processos = max(1, processos or processos_padrao())
+        executor = _novo_pool(processos)
+    janela = deque()
+
+    try:
+        for proposicao in dossies_queryset(proposicoes).iterator(chunk_size=tamanho_lote):
+            if proposicao.pk in ignorar:
+                continue
+
+            chave = impressao_digital_dossie(proposicao, usuario)
+            caminho = pdf_em_cache(chave)
+            if caminho:
+                janela.append((proposicao, chave, caminho, None))
+            else:
+                html_string = html_dossie(proposicao, usuario)
+                try:
+                    futuro = executor.submit(gerar_pdf, html_string)
+                except BrokenProcessPool:
+                    if not compartilhado:
+                        raise
+                    _descartar_pool_web(executor)
+                    executor = pool_web()
+                    futuro = executor.submit(gerar_pdf, html_string)
+                janela.append((proposicao, chave, None, futuro))
+
+            # Até 2 PDFs por processo em andamento; o resto espera na fila
+            while len(janela) > processos * 2:
+                yield _entregar(*janela.popleft())
+
+        while janela:
+            yield _entregar(*janela.popleft())
+    finally:
+        # Download cancelado no meio: descarta os PDFs que ainda nem começaram
+        if compartilhado:
+            for *_, futuro in janela:
+                if futuro is not None:
+                    futuro.cancel()
+        else:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _entregar(proposicao, chave, caminho, futuro):
+    nome = nome_arquivo_dossie(proposicao)
+    if caminho:
+        with open(caminho, "rb") as arquivo:
+            return proposicao, nome, arquivo.read(), None
+    try:
+        pdf = futuro.result()
+    except Exception as exc:
+        return proposicao, nome, None, f"{type(exc).__name__}: {exc}"
+    guardar_em_cache(chave, pdf)
+    return proposicao, nome, pdf, None
+
+
+# =========================================================================
+# 🔹 ZIP em fluxo
+# =========================================================================
+
+def zip_em_fluxo(arquivos):
+    """
+    Recebe (nome, bytes) e produz os pedaços do ZIP conforme cada arquivo
+    chega. PDFs já são comprimidos: ZIP_STORED evita gastar CPU à toa.
+    """
+    fluxo = FluxoDeBytes()
+    with zipfile.ZipFile(fluxo, mode="w", compression=zipfile.ZIP_STORED) as zf:
+        for nome, conteudo in arquivos:
+            info = zipfile.ZipInfo(nome, date_time=localtime().timetuple()[:6])
+            zf.writestr(info, conteudo)
+            yield fluxo.retirar()
+    yield fluxo.retirar()  # diretório central, gravado no close()
+
+
+def arquivos_do_lote(dossies):
+    """
+    Converte o resultado de gerar_dossies em (nome, bytes) para o ZIP.
+    As falhas vão para um ERROS.txt no fim do arquivo.
+    """
+    erros = []
+    for proposicao, nome, pdf, erro in dossies:
+        if erro:
+            erros.append(f"{proposicao.pk}\t{erro}")
+            continue
+        yield nome, pdf
+
+    if erros:
+        yield "ERROS.txt", ("\n".join(erros) + "\n").encode("utf-8")
@@ -0,0 +1,216 @@
+"""
+Exportação das telas em CSV e XLSX, em fluxo.
+
+As linhas chegam como tuplas (normalmente de values_list().iterator()) e
+nunca ficam todas na memória: a memória não cresce com o número de linhas.
+
+CSV: separador ';' e BOM UTF-8 — o Excel em português abre direto. As
+linhas viram bytes de resposta conforme são lidas: o download começa logo.
+XLSX: openpyxl no modo write_only, que grava as linhas num arquivo
+temporário em vez de guardá-las na memória; o arquivo salvo sai em
+pedaços. O download do XLSX só começa depois do save(), no fim das linhas.
+
+Texto que começa com =, +, - ou @ sai com um apóstrofo na frente: ementas
+e nomes vêm de fora, e o Excel/LibreOffice os leria como fórmula.
+"""
+
+import csv
+import re
+import tempfile
+from datetime import date, datetime, time
+
+from django.http import Http404, StreamingHttpResponse
+from django.utils.timezone import is_aware, localtime
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.styles import Font
+
+FORMATOS = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+LINHAS_POR_PEDACO = 500  # linhas acumuladas antes de cada envio (CSV)
+BYTES_POR_PEDACO = 64 * 1024  # leitura do XLSX salvo
+
+# Início de fórmula no Excel/LibreOffice (tab e CR também, pela OWASP)
+_INICIO_DE_FORMULA = ("=", "+", "-", "@", "\t", "\r")
+
+
+class FluxoDeBytes:
+    """
+    Arquivo só de escrita: acumula os bytes até serem retirados.
+    Sem seek(), o zipfile grava os tamanhos depois de cada arquivo
+    (data descriptor) e nunca volta atrás — dá para enviar em fluxo.
+    """
+
+    def __init__(self):
+        self._partes = []
+        self._posicao = 0
+
+    def write(self, dados):
+        self._partes.append(bytes(dados))
+        self._posicao += len(dados)
+        return len(dados)
+
+    def tell(self):
+        return self._posicao
+
+    def flush(self):
+        pass
+
+    def retirar(self):
+        dados = b"".join(self._partes)
+        self._partes.clear()
+        return dados
+
+
+def _sem_fuso(valor):
+    if isinstance(valor, datetime) and is_aware(valor):
+        return localtime(valor).replace(tzinfo=None)
+    return valor
+
+
+def _sem_formula(texto):
+    """Texto que a planilha leria como fórmula ganha um apóstrofo na frente."""
+    if texto.startswith(_INICIO_DE_FORMULA):
+        return "'" + texto
+    return texto
+
+
+# =========================================================================
+# 🔹 CSV
+# =========================================================================
+
+def _texto_csv(valor):
+    valor = _sem_fuso(valor)
+    if valor is None:
+        return ""
+    if valor is True:
+        return "Sim"
+    if valor is False:
+        return "Não"
+    if isinstance(valor, datetime):
+        return valor.strftime("%d/%m/%Y %H:%M")
+    if isinstance(valor, date):
+        return valor.strftime("%d/%m/%Y")
+    if isinstance(valor, time):
+        return valor.strftime("%H:%M")
+    if isinstance(valor, str):
+        return _sem_formula(valor)
+    return valor
+
+
+class _Linha:
+    """O csv.writer escreve aqui e devolve a linha pronta."""
+
+    def write(self, linha):
+        return linha
+
+
+def linhas_csv(cabecalho, linhas):
+    escritor = csv.writer(_Linha(), delimiter=";")
+    yield "\ufeff" + escritor.writerow(cabecalho)  # BOM: o Excel reconhece o UTF-8
+
+    pedaco = []
+    for linha in linhas:
+        pedaco.append(escritor.writerow([_texto_csv(v) for v in linha]))
+        if len(pedaco) >= LINHAS_POR_PEDACO:
+            yield "".join(pedaco)
+            pedaco = []
+    if pedaco:
+        yield "".join(pedaco)
+
+
+# =========================================================================
+# 🔹 XLSX
+# =========================================================================
+
+_FORMATOS_DATA = {datetime: "dd/mm/yyyy hh:mm", date: "dd/mm/yyyy", time: "hh:mm"}
+
+
+def _nome_da_aba(titulo):
+    return re.sub(r"[\[\]:*?/\\]", " ", titulo or "Planilha")[:31]
+
+
+def _valor_xlsx(folha, valor):
+    valor = _sem_fuso(valor)
+    formato = _FORMATOS_DATA.get(type(valor))
+    if formato:
+        celula = WriteOnlyCell(folha, value=valor)
+        celula.number_format = formato
+        return celula
+    if isinstance(valor, str):
+        # Caracteres de controle não são aceitos no XML da planilha
+        texto = ILLEGAL_CHARACTERS_RE.sub("", valor)[:32767]  # limite de uma célula do Excel
+        return _sem_formula(texto)
+    return valor
+
+
+def pedacos_xlsx(cabecalho, linhas, titulo=None):
+    livro = Workbook(write_only=True)
+    folha = livro.create_sheet(_nome_da_aba(titulo))
+    folha.freeze_panes = "A2"  # cabeçalho congelado
+
+    negrito = Font(bold=True)
+    titulos = []
+    for coluna in cabecalho:
+        celula = WriteOnlyCell(folha, value=_valor_xlsx(folha, coluna))
+        celula.font = negrito
+        titulos.append(celula)
+    folha.append(titulos)
+
+    for linha in linhas:
+        folha.append([_valor_xlsx(folha, v) for v in linha])
+
+    with tempfile.TemporaryFile() as arquivo:
+        livro.save(arquivo)
+        arquivo.seek(0)
+        while pedaco := arquivo.read(BYTES_POR_PEDACO):
+            yield pedaco
+
+
+# =========================================================================
+# 🔹 Resposta HTTP e mixin das telas
+# =========================================================================
+
+def resposta_exportacao(formato, nome_arquivo, cabecalho, linhas, titulo=None):
+    if formato not in FORMATOS:
+        raise Http404("Formato de exportação inválido")
+
+    if formato == "csv":
+        conteudo = linhas_csv(cabecalho, linhas)
+    else:
+        conteudo = pedacos_xlsx(cabecalho, linhas, titulo)
+
+    response = StreamingHttpResponse(conteudo, content_type=FORMATOS[formato])
+    response["Content-Disposition"] = f'attachment; filename="{nome_arquivo}.{formato}"'
+    return response
+
+
+class ExportacaoMixin:
+    """
+    Exporta a tela em CSV/XLSX com os MESMOS filtros dela: a view de
+    exportação herda da view da tela e só troca o get().
+    A subclasse define 'colunas' e linhas_exportacao() (tuplas, em fluxo).
+    """
+
+    colunas = ()
+    nome_exportacao = "exportacao"
+    titulo_exportacao = None
+
+    def linhas_exportacao(self):
+        raise NotImplementedError
+
+    def get_nome_exportacao(self):
+        return self.nome_exportacao
+
+    def get(self, request, formato, *args, **kwargs):
+        return resposta_exportacao(
+            formato,
+            self.get_nome_exportacao(),
+            self.colunas,
+            self.linhas_exportacao(),
+            self.titulo_exportacao,
+        )
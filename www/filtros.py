@@ -0,0 +1,74 @@
+"""
+Filtros da listagem de proposições.
+
+Usados pela tela (ProposicaoListView), pela exportação de dossiês em ZIP
+e pelo comando exportar_dossies — assim os três sempre selecionam
+exatamente as mesmas proposições.
+"""
+
+from django.db.models import Q
+
+from www.busca import filtrar_proposicoes
+
+
+def restringir_por_usuario(qs, usuario):
+    """
+    🔒 Restrição por comissão (baseada na ÚLTIMA tramitação).
+    Proposições SEM nenhuma tramitação também ficam visíveis,
+    senão ninguém conseguiria registrar a primeira tramitação.
+    """
+    if usuario is None or usuario.is_superuser:
+        return qs
+    try:
+        comissao_usuario = usuario.perfil.comissao_padrao_id
+    except Exception:
+        return qs.none()
+    return qs.filter(
+        Q(comissao_atual_id=comissao_usuario)
+        | Q(tramitacao_atual__isnull=True)
+    )
+
+
+def filtrar_lista_proposicoes(qs, usuario=None, tipo=None, numero=None, busca=None,
+                              autor=None, comissao=None, aguardando_parecer=False):
+    """Aplica a restrição do usuário e os filtros da tela de proposições."""
+    qs = restringir_por_usuario(qs, usuario)
+
+    if tipo:
+        qs = qs.filter(tipo_id=tipo)
+
+    if numero:
+        termo = numero.strip()
+        inicio_livre = termo.startswith("*")   # * no começo -> não ancora no início
+        fim_livre = termo.endswith("*")        # * no fim -> não ancora no fim
+        termo = termo.strip("*")
+
+        # Busca apenas no campo 'numero' (ano + código interno),
+        # por isso "2025" traz proposições DE 2025.
+        if not termo:
+            pass  # só asteriscos: ignora o filtro
+        elif inicio_livre and fim_livre:
+            qs = qs.filter(numero__icontains=termo)      # *2025* -> contém
+        elif inicio_livre:
+            qs = qs.filter(numero__iendswith=termo)      # *2025 -> termina com
+        else:
+            qs = qs.filter(numero__istartswith=termo)    # 2025 / 2025* -> começa com
+
+    # Texto livre (número/ementa) via índice full-text
+    if busca:
+        qs = filtrar_proposicoes(qs, busca)
+
+    if autor:
+        qs = qs.filter(autores__id=autor)
+
+    if comissao:
+        qs = qs.filter(
+            Q(comissao_atual_id=comissao)
+            | Q(tramitacao_atual__isnull=True)
+        )
+
+    # 🟡 Aguardando parecer do relator (tramitação atual sem relator)
+    if aguardando_parecer:
+        qs = qs.filter(aguardando_parecer=True)
+
+    return qs
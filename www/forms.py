@@ -1,5 +1,6 @@
 from django import forms
 from django.core.exceptions import ValidationError
+from django.urls import reverse_lazy
 from django_ckeditor_5.widgets import CKEditor5Widget
 from www.models import Proposicao, Tramitacao, Autor, Reuniao, ParecerVencido
 
@@ -32,9 +33,80 @@ class AutorForm(forms.ModelForm):
         }
 
 
-class ReuniaoSelect(forms.Select):
+class BuscaRemotaSelect(forms.Select):
+    """
+    Select que só traz a opção já escolhida; as demais vêm da busca
+    remota (www/static/www/busca_remota.js, endpoints em views_combos.py).
+    A página não cresce com o histórico e a validação continua no
+    queryset do ModelChoiceField, como antes.
+
+    filtros: {"parametro": "id do campo"} enviados junto com a busca
+             (ex.: {"comissao": "id_comissao"}).
+    fixos:   {"parametro": valor} sempre enviados (ex.: a comissão da tramitação).
+    """
+
+    class Media:
+        js = ("www/busca_remota.js",)
+
+    def __init__(self, url, attrs=None, filtros=None, fixos=None):
+        super().__init__(attrs)
+        self.url = url
+        self.filtros = filtros or {}
+        self.fixos = fixos or {}
+
+    def __deepcopy__(self, memo):
+        obj = super().__deepcopy__(memo)
+        obj.filtros = dict(self.filtros)
+        obj.fixos = dict(self.fixos)
+        return obj
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        widget_attrs = context["widget"]["attrs"]
+        widget_attrs["data-busca-url"] = str(self.url)
+        if self.filtros:
+            widget_attrs["data-busca-filtros"] = ",".join(
+                f"{parametro}={campo}" for parametro, campo in self.filtros.items()
+            )
+        if self.fixos:
+            widget_attrs["data-busca-fixos"] = ",".join(
+                f"{parametro}={valor}" for parametro, valor in self.fixos.items()
+            )
+        return context
+
+    def optgroups(self, name, value, attrs=None):
+        # Só a opção vazia e a(s) selecionada(s): uma consulta por pk,
+        # em vez de percorrer o queryset inteiro do campo.
+        selecionados = [v for v in value if v not in ("", None)]
+        opcoes = []
+        iterador = self.choices
+        if getattr(iterador, "field", None) is not None:
+            if iterador.field.empty_label is not None:
+                opcoes.append(("", iterador.field.empty_label))
+            if selecionados:
+                try:
+                    objetos = iterador.queryset.filter(pk__in=selecionados)
+                    opcoes += [iterador.choice(obj) for obj in objetos]
+                except (ValueError, TypeError, ValidationError):
+                    pass        # valor inválido no POST: o campo já acusa o erro
+        else:
+            opcoes = [(v, l) for v, l in iterador if v in ("", None) or str(v) in selecionados]
+
+        grupos = []
+        for indice, (valor_opcao, rotulo) in enumerate(opcoes):
+            selecionado = str(valor_opcao) in selecionados
+            grupos.append((None, [
+                self.create_option(name, valor_opcao, rotulo, selecionado, indice)
+            ], indice))
+        return grupos
+
+
+class ReuniaoSelect(BuscaRemotaSelect):
     """Select de Reunião com data-comissao em cada opção (para filtragem via JS)."""
 
+    def __init__(self, attrs=None, filtros=None, fixos=None):
+        super().__init__(reverse_lazy("busca_reunioes"), attrs, filtros, fixos)
+
     def create_option(self, name, value, label, selected, index, subindex=None, attrs=None):
         option = super().create_option(name, value, label, selected, index, subindex, attrs)
         instance = getattr(value, "instance", None)
@@ -43,6 +115,13 @@ class ReuniaoSelect(forms.Select):
         return option
 
 
+class AutorSelect(BuscaRemotaSelect):
+    """Select de Autor/Relator com busca por prefixo do nome."""
+
+    def __init__(self, attrs=None):
+        super().__init__(reverse_lazy("busca_autores"), attrs)
+
+
 class ReuniaoChoiceField(forms.ModelChoiceField):
     """Combo de Reunião no formato: 1ª Reunião EXTRAORDINÁRIA (SIGLA dd/mm/aaaa)."""
 
@@ -53,7 +132,10 @@ class ReuniaoChoiceField(forms.ModelChoiceField):
 class TramitacaoForm(forms.ModelForm):
     reuniao = ReuniaoChoiceField(
         queryset=Reuniao.objects.select_related("comissao"),
-        widget=ReuniaoSelect(attrs={"class": "form-select"}),
+        widget=ReuniaoSelect(
+            attrs={"class": "form-select"},
+            filtros={"comissao": "id_comissao"},
+        ),
         required=False,
     )
 
@@ -81,18 +163,19 @@ class TramitacaoForm(forms.ModelForm):
             "observacao": forms.Textarea(
                 attrs={"class": "form-control", "rows": 2}
             ),
-            "relator": forms.Select(attrs={"class": "form-select"}),
+            "relator": AutorSelect(attrs={"class": "form-select"}),
             "parecer": forms.TextInput(attrs={"class": "form-control"}),
             "texto": CKEditor5Widget(config_name="default"),
             "pedido_vista": forms.CheckboxInput(attrs={"class": "form-check-input"}),
         }
 
     def __init__(self, *args, **kwargs):
-        user = kwargs.pop("user", None)
+        # id da comissão padrão do usuário (ver www/permissoes.py)
+        comissao_padrao = kwargs.pop("comissao_padrao", None)
         super().__init__(*args, **kwargs)
 
-        if user and hasattr(user, "perfil") and user.perfil.comissao_padrao:
-            self.fields["comissao"].initial = user.perfil.comissao_padrao
+        if comissao_padrao:
+            self.fields["comissao"].initial = comissao_padrao
 
     def clean(self):
         cleaned_data = super().clean()
@@ -112,7 +195,7 @@ class TramitacaoForm(forms.ModelForm):
 class ParecerVencidoForm(forms.ModelForm):
     reuniao = ReuniaoChoiceField(
         queryset=Reuniao.objects.select_related("comissao"),
-        widget=forms.Select(attrs={"class": "form-select"}),
+        widget=ReuniaoSelect(attrs={"class": "form-select"}),
     )
 
     class Meta:
@@ -125,7 +208,7 @@ class ParecerVencidoForm(forms.ModelForm):
             "data_apresentacao",
         ]
         widgets = {
-            "relator": forms.Select(attrs={"class": "form-select"}),
+            "relator": AutorSelect(attrs={"class": "form-select"}),
             "parecer": forms.TextInput(attrs={"class": "form-control"}),
             "texto": CKEditor5Widget(config_name="default"),
             "data_apresentacao": forms.DateInput(
@@ -133,6 +216,14 @@ class ParecerVencidoForm(forms.ModelForm):
             ),
         }
 
+    def __init__(self, *args, **kwargs):
+        comissao = kwargs.pop("comissao", None)
+        super().__init__(*args, **kwargs)
+
+        # Busca de reuniões restrita à comissão da tramitação
+        if comissao:
+            self.fields["reuniao"].widget.fixos["comissao"] = comissao
+
 
 
 class ReuniaoForm(forms.ModelForm):
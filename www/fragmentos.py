@@ -0,0 +1,164 @@
+"""
+Versões por objeto para o cache de fragmentos de template.
+
+Os blocos pesados (texto do parecer em HTML do CKEditor, votos vencidos,
+descrições das reuniões) usam o {% cache %} do Django com a versão do
+objeto na chave:
+
+    {% load cache fragmentos %}
+    {% cache 604800 parecer_relator tramitacao|versao %} ... {% endcache %}
+
+A versão junta o alterada_em do objeto (quando ele tem) e um contador por
+objeto no cache compartilhado, que os signals incrementam:
+    Tramitacao      -> a própria
+    ParecerVencido  -> o próprio e a tramitação dele
+    Reuniao         -> a própria e as tramitações que a citam (direto ou
+                       pelos votos vencidos)
+    Proposicao      -> a própria (inclusive a lista de autores)
+    Autor/Comissao  -> um contador geral ("cadastros"), que entra em todas
+                       as versões: nomes mudam pouco e aparecem em tudo
+Os mesmos contadores entram no ETag das páginas (www/condicional.py).
+Nenhum fragmento é apagado: com a versão nova a chave muda e o antigo
+expira sozinho. O cache dos fragmentos é o "template_fragments" do
+settings (o default, se não houver), e os contadores ficam nele também:
+são um por objeto visto e, no default, expulsariam as versões do
+dashboard e das tabelas. Contador expulso recomeça de time_ns(), um valor
+que nenhum fragmento usou: no pior caso o bloco é montado de novo.
+
+Escritas que não disparam signals (update(), SQL direto) devem chamar
+invalidar_fragmentos().
+"""
+
+import time
+
+from django.core.cache import InvalidCacheBackendError, caches
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from www.models import Autor, Comissao, ParecerVencido, Proposicao, Reuniao, Tramitacao
+
+CADASTROS = "cadastros"
+
+
+def _cache():
+    """O mesmo cache que a tag {% cache %} usa para os fragmentos."""
+    try:
+        return caches["template_fragments"]
+    except InvalidCacheBackendError:
+        return caches["default"]
+
+
+def _chave_versao(rotulo):
+    return f"fragmentos:versao:{rotulo}"
+
+
+def _rotulo(objeto):
+    return f"{objeto._meta.label_lower}:{objeto.pk}"
+
+
+def _versao_inicial():
+    # Cache limpo/expulso: recomeça de um valor que nenhum fragmento usou
+    return time.time_ns()
+
+
+def versoes(model, pk):
+    """(contador do objeto, contador geral "cadastros"), sem ler o objeto."""
+    chaves = [_chave_versao(f"{model._meta.label_lower}:{pk}"), _chave_versao(CADASTROS)]
+    cache = _cache()
+    valores = cache.get_many(chaves)
+    for chave in chaves:
+        if chave not in valores:
+            cache.add(chave, _versao_inicial(), None)
+            valores[chave] = cache.get(chave)
+    return valores[chaves[0]], valores[chaves[1]]
+
+
+def versao_fragmento(objeto):
+    """Texto que identifica a versão atual do objeto (vazio para None)."""
+    if objeto is None:
+        return ""
+    versao, cadastros = versoes(type(objeto), objeto.pk)
+    alterada_em = getattr(objeto, "alterada_em", None)
+    carimbo = alterada_em.timestamp() if alterada_em else ""
+    return f"{_rotulo(objeto)}:{carimbo}:{versao}:{cadastros}"
+
+
+def invalidar_fragmentos(*rotulos):
+    """
+    Nova versão para cada rótulo ("www.tramitacao:12", ou CADASTROS para
+    todos os fragmentos).
+    """
+    cache = _cache()
+    for rotulo in rotulos:
+        chave = _chave_versao(rotulo)
+        cache.add(chave, _versao_inicial(), None)
+        try:
+            cache.incr(chave)
+        except ValueError:  # expulsa do cache entre o add e o incr
+            cache.set(chave, _versao_inicial(), None)
+
+
+# =========================================================================
+# 🔹 Invalidação por eventos
+# =========================================================================
+# Como em tabelas.py: a versão só muda depois do commit.
+
+def _invalidar_apos_commit(*rotulos):
+    transaction.on_commit(lambda: invalidar_fragmentos(*rotulos))
+
+
+def _rotulos_tramitacoes(ids):
+    return [f"{Tramitacao._meta.label_lower}:{pk}" for pk in ids]
+
+
+@receiver(post_save, sender=Tramitacao)
+@receiver(post_delete, sender=Tramitacao)
+def invalidar_tramitacao(sender, instance, **kwargs):
+    _invalidar_apos_commit(_rotulo(instance))
+
+
+@receiver(post_save, sender=ParecerVencido)
+@receiver(post_delete, sender=ParecerVencido)
+def invalidar_parecer_vencido(sender, instance, **kwargs):
+    _invalidar_apos_commit(
+        _rotulo(instance), *_rotulos_tramitacoes([instance.tramitacao_id])
+    )
+
+
+@receiver(post_save, sender=Reuniao)
+@receiver(post_delete, sender=Reuniao)
+def invalidar_reuniao(sender, instance, **kwargs):
+    # A descrição da reunião aparece nos blocos das tramitações que a citam
+    tramitacoes = (
+        Tramitacao.objects
+        .filter(Q(reuniao=instance.pk) | Q(pareceres_vencidos__reuniao=instance.pk))
+        .values_list("pk", flat=True)
+        .distinct()
+    )
+    _invalidar_apos_commit(_rotulo(instance), *_rotulos_tramitacoes(tramitacoes))
+
+
+@receiver(post_save, sender=Proposicao)
+@receiver(post_delete, sender=Proposicao)
+def invalidar_proposicao(sender, instance, **kwargs):
+    _invalidar_apos_commit(_rotulo(instance))
+
+
+@receiver(m2m_changed, sender=Proposicao.autores.through)
+def invalidar_autores_proposicao(sender, instance, action, pk_set=None, **kwargs):
+    if not action.startswith("post_"):
+        return
+    if isinstance(instance, Proposicao):
+        _invalidar_apos_commit(_rotulo(instance))
+    elif pk_set:  # pelo lado do autor: autor.proposicoes_autoria.add(...)
+        _invalidar_apos_commit(*(f"{Proposicao._meta.label_lower}:{pk}" for pk in pk_set))
+
+
+@receiver(post_save, sender=Autor)
+@receiver(post_delete, sender=Autor)
+@receiver(post_save, sender=Comissao)
+@receiver(post_delete, sender=Comissao)
+def invalidar_cadastros(sender, **kwargs):
+    _invalidar_apos_commit(CADASTROS)
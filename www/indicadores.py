@@ -0,0 +1,264 @@
+"""
+Indicadores do dashboard.
+
+Os indicadores são guardados no cache por escopo (global + cada comissão).
+A chave leva o dia corrente — "entradas 30 dias" e "tempo médio" mudam
+com a data — e um número de versão por escopo, incrementado pelos signals
+sempre que uma Tramitacao, ParecerVencido ou Proposicao daquele escopo muda.
+Calculados no banco dos relatórios, valem no máximo a janela de atraso dele
+(ver www/banco_relatorios.py).
+"""
+
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models import Count, F, Q, Sum, Value
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from django.utils.timezone import now
+
+from www.banco_relatorios import validade_cache
+from www.models import ParecerVencido, Proposicao, Tramitacao
+
+CACHE_TIMEOUT = 60 * 60 * 24  # o dia na chave já garante a virada
+DIAS_PERIODO = 30  # janela do indicador "entradas no período"
+
+
+def _escopo(comissao_id):
+    return f"comissao-{comissao_id}" if comissao_id else "global"
+
+
+def _chave_versao(comissao_id):
+    return f"dashboard:versao:{_escopo(comissao_id)}"
+
+
+def _indicadores_vazios():
+    return {"total": 0, "aguardando_parecer": 0, "entradas_periodo": 0,
+            "tempo_medio": 0, "_tramitacoes": 0, "_dias": 0}
+
+
+def _finalizar(indicadores):
+    """Converte a soma de dias em média e remove os campos auxiliares."""
+    n = indicadores.pop("_tramitacoes")
+    dias = indicadores.pop("_dias")
+    indicadores["tempo_medio"] = round(dias / n, 1) if n else 0
+    return indicadores
+
+
+def indicadores_zerados():
+    """Indicadores de um escopo sem nenhum dado."""
+    return _finalizar(_indicadores_vazios())
+
+
+def _agregar_por_comissao(comissao_id=None):
+    """
+    Motor dos indicadores: uma consulta agrupada por métrica, todas as
+    comissões de uma vez (ou só uma, se comissao_id for informado).
+    Nenhuma linha é trazida para o Python — só um registro por comissão.
+    Retorna {comissao_id: indicadores_brutos}.
+    """
+    hoje = now().date()
+    data_inicio = hoje - timedelta(days=DIAS_PERIODO)
+
+    proposicoes = Proposicao.objects.all()
+    # order_by() vazio: a ordenação padrão da Tramitacao entraria no GROUP BY
+    tramitacoes = Tramitacao.objects.order_by()
+    if comissao_id:
+        proposicoes = proposicoes.filter(comissao_atual_id=comissao_id)
+        tramitacoes = tramitacoes.filter(comissao_id=comissao_id)
+
+    grupos = defaultdict(_indicadores_vazios)
+
+    # 🔹 Total e aguardando parecer (pela comissão ATUAL da proposição)
+    for linha in (
+        proposicoes
+        .values("comissao_atual")
+        .annotate(
+            total=Count("pk"),
+            aguardando=Count("pk", filter=Q(aguardando_parecer=True)),
+        )
+    ):
+        grupo = grupos[linha["comissao_atual"]]
+        grupo["total"] = linha["total"]
+        grupo["aguardando_parecer"] = linha["aguardando"]
+
+    # 🔹 Entradas no período
+    for linha in (
+        tramitacoes
+        .filter(data_entrada__gte=data_inicio)
+        .values("comissao")
+        .annotate(n=Count("pk"))
+    ):
+        grupos[linha["comissao"]]["entradas_periodo"] = linha["n"]
+
+    # 🔹 Tempo médio na comissão: soma dos dias calculada pelo banco
+    for linha in (
+        tramitacoes
+        .values("comissao")
+        .annotate(
+            n=Count("pk"),
+            dias=Sum(
+                models.ExpressionWrapper(
+                    Value(hoje) - F("data_entrada"),
+                    output_field=models.DurationField(),
+                )
+            ),
+        )
+    ):
+        grupo = grupos[linha["comissao"]]
+        grupo["_tramitacoes"] = linha["n"]
+        grupo["_dias"] = linha["dias"].days if linha["dias"] else 0
+
+    return grupos
+
+
+def _somar(grupos):
+    """Visão global = soma dos grupos (proposições sem comissão incluídas)."""
+    total = _indicadores_vazios()
+    for grupo in grupos.values():
+        for campo in total:
+            total[campo] += grupo[campo]
+    return total
+
+
+def calcular_indicadores(comissao=None):
+    """
+    Calcula os 4 indicadores do dashboard.
+    comissao=None -> visão global do sistema.
+    """
+    if comissao:
+        grupos = _agregar_por_comissao(comissao.pk)
+        if comissao.pk not in grupos:
+            return indicadores_zerados()
+        return _finalizar(grupos[comissao.pk])
+    return _finalizar(_somar(_agregar_por_comissao()))
+
+
+def calcular_indicadores_por_comissao():
+    """
+    Indicadores de TODAS as comissões numa única passada do motor.
+    Retorna {comissao_id: indicadores}, com a chave None para a visão global.
+    """
+    grupos = _agregar_por_comissao()
+    resultado = {None: _finalizar(_somar(grupos))}
+    for comissao_id, grupo in grupos.items():
+        if comissao_id is not None:
+            resultado[comissao_id] = _finalizar(grupo)
+    return resultado
+
+
+def _versao_inicial():
+    # Cache limpo/expulso: recomeça de um valor que nenhuma chave de
+    # indicadores guardada usou (com 0, voltariam as entradas "v0" antigas)
+    return time.time_ns()
+
+
+def _versao(comissao_id):
+    chave = _chave_versao(comissao_id)
+    versao = cache.get(chave)
+    if versao is None:
+        cache.add(chave, _versao_inicial(), None)
+        versao = cache.get(chave)
+    return versao
+
+
+def obter_indicadores(comissao=None):
+    """Indicadores do escopo, calculados no máximo uma vez por versão/dia."""
+    comissao_id = comissao.pk if comissao else None
+    chave = (
+        f"dashboard:indicadores:{_escopo(comissao_id)}:"
+        f"{now().date().isoformat()}:v{_versao(comissao_id)}"
+    )
+
+    indicadores = cache.get(chave)
+    if indicadores is None:
+        indicadores = calcular_indicadores(comissao)
+        cache.set(chave, indicadores, validade_cache(CACHE_TIMEOUT))
+    return indicadores
+
+
+def obter_indicadores_por_comissao():
+    """
+    Todas as comissões + global, em cache. Toda invalidação também incrementa
+    a versão global, então ela basta para versionar o quadro inteiro.
+    """
+    chave = (
+        f"dashboard:indicadores:todas:"
+        f"{now().date().isoformat()}:v{_versao(None)}"
+    )
+
+    indicadores = cache.get(chave)
+    if indicadores is None:
+        indicadores = calcular_indicadores_por_comissao()
+        cache.set(chave, indicadores, validade_cache(CACHE_TIMEOUT))
+    return indicadores
+
+
+def invalidar_indicadores(comissao_ids=()):
+    """Invalida o escopo global e o de cada comissão informada."""
+    for comissao_id in {None, *comissao_ids}:
+        chave = _chave_versao(comissao_id)
+        cache.add(chave, _versao_inicial(), None)
+        try:
+            cache.incr(chave)
+        except ValueError:  # expulsa do cache entre o add e o incr
+            cache.set(chave, _versao_inicial(), None)
+
+
+# =========================================================================
+# 🔹 Invalidação por eventos
+# =========================================================================
+
+# Como em tabelas.py e fragmentos.py: a versão só muda depois do commit.
+# Antes, uma leitura do dashboard entre o incremento e o commit guardaria
+# os números antigos na versão nova. As comissões também são lidas só no
+# callback, já com os dados gravados.
+
+@receiver(post_init, sender=Tramitacao)
+def guardar_comissao_anterior(sender, instance, **kwargs):
+    # Editar a comissão de uma tramitação muda os números das DUAS comissões.
+    # Sem consulta: o valor com que o objeto foi carregado (via __dict__,
+    # para não buscar um comissao_id adiado com defer())
+    instance._comissao_anterior_id = instance.__dict__.get("comissao_id")
+
+
+def _comissoes_da_proposicao(proposicao_id):
+    return set(
+        Tramitacao.objects
+        .filter(proposicao_id=proposicao_id)
+        .values_list("comissao_id", flat=True)
+    )
+
+
+@receiver(post_save, sender=Tramitacao)
+@receiver(post_delete, sender=Tramitacao)
+def invalidar_por_tramitacao(sender, instance, **kwargs):
+    proposicao_id = instance.proposicao_id
+    comissoes = {instance.comissao_id, getattr(instance, "_comissao_anterior_id", None)}
+
+    def invalidar():
+        # Qualquer comissão por onde a proposição passou pode ter sido a "atual"
+        invalidar_indicadores((comissoes | _comissoes_da_proposicao(proposicao_id)) - {None})
+
+    transaction.on_commit(invalidar)
+
+
+@receiver(post_save, sender=ParecerVencido)
+@receiver(post_delete, sender=ParecerVencido)
+def invalidar_por_parecer_vencido(sender, instance, **kwargs):
+    tramitacao_id = instance.tramitacao_id
+    transaction.on_commit(lambda: invalidar_indicadores(
+        Tramitacao.objects
+        .filter(pk=tramitacao_id)
+        .values_list("comissao_id", flat=True)
+    ))
+
+
+@receiver(post_save, sender=Proposicao)
+@receiver(post_delete, sender=Proposicao)
+def invalidar_por_proposicao(sender, instance, **kwargs):
+    comissoes = [instance.comissao_atual_id] if instance.comissao_atual_id else []
+    transaction.on_commit(lambda: invalidar_indicadores(comissoes))
@@ -0,0 +1,186 @@
+"""
+Instrumentação das consultas SQL por requisição (opcional).
+
+Com settings.INSTRUMENTACAO_CONSULTAS = True, o InstrumentacaoMiddleware
+registra em cada requisição: quantidade de consultas, tempo total de SQL,
+consultas repetidas (mesmo formato, parâmetros diferentes) e o tempo de
+renderização do template. O resultado sai nos cabeçalhos da resposta
+(X-Consultas-*, e Server-Timing para as ferramentas do navegador) e numa
+linha de log ("www.instrumentacao").
+
+Um formato repetido INSTRUMENTACAO_LIMIAR_N_MAIS_1 vezes ou mais é um
+provável N+1 (ex.: {{ tramitacao.comissao }} dentro de um for sem
+select_related): o aviso traz o template e a linha — ou o arquivo .py —
+de onde a consulta partiu.
+
+Desligado (o padrão), o middleware se retira na inicialização
+(MiddlewareNotUsed) e não custa nada.
+"""
+
+import logging
+import os
+import re
+import sys
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger("www.instrumentacao")
+
+_LISTA_IN = re.compile(r"IN \((?:%s, )*%s\)")
+_TEXTO = re.compile(r"'(?:[^']|'')*'")
+_NUMERO = re.compile(r"\b\d+\b")
+
+_TEMPLATE_BASE = os.path.join("django", "template", "base.py")
+
+
+def impressao_digital_sql(sql):
+    """
+    Formato da consulta, sem os valores: duas consultas com o mesmo
+    formato só diferem nos parâmetros (o sinal típico de um N+1).
+    """
+    sql = _LISTA_IN.sub("IN (...)", sql)
+    sql = _TEXTO.sub("?", sql)
+    return _NUMERO.sub("?", sql)
+
+
+def _origem_da_consulta():
+    """
+    De onde partiu a consulta: (nó de template mais interno em
+    renderização, "www/x.html:42"; linha de código do projeto). Cada um
+    pode ser None.
+    """
+    base = str(settings.BASE_DIR)
+    template = codigo = None
+    frame = sys._getframe(2)
+    while frame and not (template and codigo):
+        arquivo = frame.f_code.co_filename
+        if (
+            template is None
+            and frame.f_code.co_name == "render_annotated"
+            and arquivo.endswith(_TEMPLATE_BASE)
+        ):
+            no = frame.f_locals.get("self")
+            origem, token = getattr(no, "origin", None), getattr(no, "token", None)
+            if origem is not None and token is not None:
+                template = f"{origem.template_name or origem.name}:{token.lineno}"
+        elif (
+            codigo is None
+            and arquivo.startswith(base)
+            and "site-packages" not in arquivo
+            and arquivo != __file__
+        ):
+            codigo = f"{os.path.relpath(arquivo, base)}:{frame.f_lineno} ({frame.f_code.co_name})"
+        frame = frame.f_back
+    return template, codigo
+
+
+class RegistroConsultas:
+    """execute_wrapper: mede cada consulta e guarda formato e origem."""
+
+    def __init__(self):
+        self.quantidade = 0
+        self.tempo = 0.0
+        self.formatos = Counter()
+        self.origens = {}           # formato -> Counter de origens
+        self.durante_template = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.tempo += time.perf_counter() - inicio
+            self.quantidade += 1
+            formato = impressao_digital_sql(sql)
+            self.formatos[formato] += 1
+            template, codigo = _origem_da_consulta()
+            origem = " ← ".join(parte for parte in (template, codigo) if parte) or "?"
+            self.origens.setdefault(formato, Counter())[origem] += 1
+            if template:
+                self.durante_template += 1
+
+    def repetidas(self, minimo=2):
+        """[(formato, vezes, origem mais comum)] dos formatos repetidos."""
+        return [
+            (formato, vezes, self.origens[formato].most_common(1)[0][0])
+            for formato, vezes in self.formatos.most_common()
+            if vezes >= minimo
+        ]
+
+
+class InstrumentacaoMiddleware:
+
+    def __init__(self, get_response):
+        if not getattr(settings, "INSTRUMENTACAO_CONSULTAS", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.limiar = getattr(settings, "INSTRUMENTACAO_LIMIAR_N_MAIS_1", 5)
+
+    def __call__(self, request):
+        registro = RegistroConsultas()
+        request._tempo_template = None
+        inicio = time.perf_counter()
+
+        with ExitStack() as pilha:
+            for conexao in connections.all():
+                pilha.enter_context(conexao.execute_wrapper(registro))
+            response = self.get_response(request)
+
+        total = time.perf_counter() - inicio
+        self._cabecalhos(response, registro, total, request._tempo_template)
+        self._log(request, response, registro, total, request._tempo_template)
+        return response
+
+    def process_template_response(self, request, response):
+        # Já renderizada pela view (BancoRelatoriosMixin): ela mediu o tempo
+        if response.is_rendered:
+            return response
+
+        # TemplateResponse: a renderização vem logo depois deste método
+        inicio = time.perf_counter()
+
+        def fim_da_renderizacao(_response):
+            request._tempo_template = time.perf_counter() - inicio
+
+        response.add_post_render_callback(fim_da_renderizacao)
+        return response
+
+    # -----------------------------------------------------------------
+
+    def _cabecalhos(self, response, registro, total, tempo_template):
+        # Respostas em fluxo consultam o banco DEPOIS daqui: os números
+        # só cobrem a montagem da resposta (o log avisa).
+        n_mais_1 = registro.repetidas(self.limiar)
+        response["X-Consultas-SQL"] = str(registro.quantidade)
+        response["X-Consultas-Tempo-ms"] = f"{registro.tempo * 1000:.1f}"
+        response["X-Consultas-Repetidas"] = str(len(registro.repetidas()))
+        response["X-Consultas-N-Mais-1"] = str(len(n_mais_1))
+
+        metricas = [
+            f'sql;dur={registro.tempo * 1000:.1f};desc="{registro.quantidade} consultas"',
+        ]
+        if tempo_template is not None:
+            response["X-Template-Tempo-ms"] = f"{tempo_template * 1000:.1f}"
+            metricas.append(f"template;dur={tempo_template * 1000:.1f}")
+        metricas.append(f"total;dur={total * 1000:.1f}")
+        response["Server-Timing"] = ", ".join(metricas)
+
+    def _log(self, request, response, registro, total, tempo_template):
+        template = f", template {tempo_template * 1000:.1f} ms" if tempo_template is not None else ""
+        fluxo = " (resposta em fluxo: consultas do conteúdo não incluídas)" if response.streaming else ""
+        logger.info(
+            "%s %s %s: %d consultas (%d no template), SQL %.1f ms%s, total %.1f ms%s",
+            request.method, request.get_full_path(), response.status_code,
+            registro.quantidade, registro.durante_template, registro.tempo * 1000,
+            template, total * 1000, fluxo,
+        )
+        for formato, vezes, origem in registro.repetidas(self.limiar):
+            logger.warning(
+                "Provável N+1 em %s: %d× a mesma consulta, a partir de %s\n    %s",
+                request.path, vezes, origem, formato[:500],
+            )
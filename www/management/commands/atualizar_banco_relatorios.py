@@ -0,0 +1,55 @@
+import os
+import sqlite3
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from www.banco_relatorios import ALIAS
+
+
+class Command(BaseCommand):
+    help = (
+        "Renova o snapshot SQLite lido pelos relatórios (DATABASES['relatorios']): "
+        "copia o banco principal com VACUUM INTO e troca o arquivo de uma vez. "
+        "Feito para rodar periodicamente (cron) com o sistema no ar."
+    )
+
+    def handle(self, *args, **options):
+        principal = settings.DATABASES[DEFAULT_DB_ALIAS]
+        copia = settings.DATABASES.get(ALIAS)
+        if copia is None:
+            raise CommandError(f"Não há o banco '{ALIAS}' em settings.DATABASES.")
+        if "sqlite3" not in principal["ENGINE"] or "sqlite3" not in copia["ENGINE"]:
+            raise CommandError("O snapshot é só para SQLite; réplicas de servidor se atualizam sozinhas.")
+
+        destino = Path(copia["NAME"])
+        if destino.resolve() == Path(principal["NAME"]).resolve():
+            raise CommandError(
+                f"DATABASES['{ALIAS}'] aponta para o próprio banco principal: "
+                "defina NAME como o arquivo do snapshot."
+            )
+
+        inicio = time.perf_counter()
+        temporario = destino.with_name(destino.name + ".novo")
+        temporario.unlink(missing_ok=True)
+
+        with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+            cursor.execute("VACUUM INTO %s", [str(temporario)])
+
+        # O snapshot é só lido: journal "delete", sem os arquivos -wal/-shm
+        # que poderiam ficar para trás na troca
+        with sqlite3.connect(temporario) as conexao:
+            conexao.execute("PRAGMA journal_mode=DELETE")
+            conexao.execute("ANALYZE")
+        conexao.close()
+
+        # Troca atômica: quem já está lendo termina no arquivo antigo
+        os.replace(temporario, destino)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Snapshot {destino} renovado em {time.perf_counter() - inicio:.1f} s "
+            f"({destino.stat().st_size / 1048576:.1f} MB)."
+        ))
@@ -0,0 +1,171 @@
+import random
+import tempfile
+import threading
+import time
+from copy import deepcopy
+from pathlib import Path
+from statistics import median
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connection, connections, transaction
+from django.db.models import Count
+
+from www.models import Tramitacao
+
+# Como o Django abre o SQLite sem configuração: journal "delete",
+# transação "deferred" e timeout de 5 s
+OPCOES_PADRAO_DJANGO = {"init_command": "PRAGMA journal_mode=DELETE"}
+
+
+class Command(BaseCommand):
+    help = (
+        "Carga concorrente de leituras e escritas numa cópia do banco, com o "
+        "SQLite padrão do Django e com o perfil do settings (WAL, timeout, "
+        "transações IMMEDIATE): mostra as operações por segundo, a latência "
+        "e quantas falharam com 'database is locked'."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--escritores", type=int, default=4,
+            help="Threads que leem e depois alteram uma tramitação numa transação (padrão: 4).",
+        )
+        parser.add_argument(
+            "--leitores", type=int, default=4,
+            help="Threads com consultas de relatório/dashboard (padrão: 4).",
+        )
+        parser.add_argument(
+            "--segundos", type=float, default=10,
+            help="Duração da carga em cada perfil (padrão: 10).",
+        )
+        parser.add_argument(
+            "--perfil", choices=("padrao", "producao", "ambos"), default="ambos",
+            help="Perfil do SQLite a testar (padrão: ambos, para comparar).",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("O teste de concorrência foi escrito para o SQLite.")
+
+        self.amostra = self._amostra()
+        perfis = {
+            "padrao": OPCOES_PADRAO_DJANGO,
+            "producao": connections.settings[DEFAULT_DB_ALIAS].get("OPTIONS", {}),
+        }
+        if options["perfil"] != "ambos":
+            perfis = {options["perfil"]: perfis[options["perfil"]]}
+
+        with tempfile.TemporaryDirectory() as diretorio:
+            for nome, opcoes in perfis.items():
+                arquivo = Path(diretorio) / f"{nome}.sqlite3"
+                self.stdout.write(f"Copiando o banco para o perfil '{nome}'…")
+                with connection.cursor() as cursor:
+                    cursor.execute("VACUUM INTO %s", [str(arquivo)])
+
+                resultado = self._executar(nome, arquivo, opcoes, options)
+                self._mostrar(nome, resultado, options["segundos"])
+
+    # -----------------------------------------------------------------
+
+    def _amostra(self):
+        tramitacoes = list(Tramitacao.objects.order_by("-pk").values_list("pk", flat=True)[:2000])
+        if not tramitacoes:
+            raise CommandError(
+                "Banco sem tramitações. Gere uma massa de teste antes: "
+                "python manage.py gerar_dados_sinteticos"
+            )
+        comissoes = list(
+            Tramitacao.objects.filter(pk__in=tramitacoes)
+            .values_list("comissao_id", flat=True).distinct()
+        )
+        return {"tramitacoes": tramitacoes, "comissoes": comissoes}
+
+    def _executar(self, nome, arquivo, opcoes, options):
+        """Registra um alias temporário apontando para a cópia e roda as threads."""
+        alias = f"estresse_{nome}"
+        configuracao = deepcopy(connections.settings[DEFAULT_DB_ALIAS])
+        configuracao.update(NAME=str(arquivo), OPTIONS=deepcopy(opcoes), CONN_MAX_AGE=0)
+        connections.settings[alias] = configuracao
+
+        # Uma conexão antes das threads: o journal_mode fica definido no arquivo
+        connections[alias].ensure_connection()
+        connections[alias].close()
+
+        resultado = {"escrita": [], "leitura": [], "travado": 0, "outros_erros": 0}
+        trava = threading.Lock()
+        fim = time.monotonic() + options["segundos"]
+
+        threads = [
+            threading.Thread(target=self._trabalhador, args=(alias, self._escrever, "escrita", fim, resultado, trava))
+            for _ in range(options["escritores"])
+        ] + [
+            threading.Thread(target=self._trabalhador, args=(alias, self._ler, "leitura", fim, resultado, trava))
+            for _ in range(options["leitores"])
+        ]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            del connections.settings[alias]
+        return resultado
+
+    def _trabalhador(self, alias, operacao, tipo, fim, resultado, trava):
+        sorteio = random.Random()
+        try:
+            while time.monotonic() < fim:
+                inicio = time.perf_counter()
+                try:
+                    operacao(alias, sorteio)
+                except OperationalError as erro:
+                    with trava:
+                        if "locked" in str(erro):
+                            resultado["travado"] += 1
+                        else:
+                            resultado["outros_erros"] += 1
+                    continue
+                decorrido = (time.perf_counter() - inicio) * 1000
+                with trava:
+                    resultado[tipo].append(decorrido)
+        finally:
+            connections[alias].close()
+
+    def _escrever(self, alias, sorteio):
+        """Como um POST de formulário: lê dentro da transação e depois grava."""
+        pk = sorteio.choice(self.amostra["tramitacoes"])
+        with transaction.atomic(using=alias):
+            observacao = (
+                Tramitacao.objects.using(alias)
+                .filter(pk=pk).values_list("observacao", flat=True).first()
+            )
+            Tramitacao.objects.using(alias).filter(pk=pk).update(
+                observacao=(observacao or "")[-200:] + "."
+            )
+
+    def _ler(self, alias, sorteio):
+        """Como o dashboard e os relatórios: agregação por comissão."""
+        comissao = sorteio.choice(self.amostra["comissoes"])
+        list(
+            Tramitacao.objects.using(alias)
+            .filter(comissao_id=comissao, data_saida__isnull=True)
+            .values("relator_id")
+            .annotate(n=Count("pk"))
+        )
+
+    def _mostrar(self, nome, resultado, segundos):
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Perfil '{nome}'"))
+        for tipo in ("escrita", "leitura"):
+            tempos = sorted(resultado[tipo])
+            if not tempos:
+                self.stdout.write(f"  {tipo:<8} nenhuma operação concluída")
+                continue
+            p95 = tempos[min(len(tempos) - 1, int(len(tempos) * 0.95))]
+            self.stdout.write(
+                f"  {tipo:<8} {len(tempos) / segundos:8.1f} op/s   "
+                f"p50 {median(tempos):7.1f} ms   p95 {p95:7.1f} ms   máx {tempos[-1]:7.1f} ms"
+            )
+        estilo = self.style.ERROR if resultado["travado"] else self.style.SUCCESS
+        self.stdout.write(estilo(f"  'database is locked': {resultado['travado']}"))
+        if resultado["outros_erros"]:
+            self.stdout.write(self.style.WARNING(f"  outros erros do banco: {resultado['outros_erros']}"))
@@ -0,0 +1,179 @@
+import os
+import time
+import zipfile
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from www.dossies import gerar_dossies, processos_padrao
+from www.filtros import filtrar_lista_proposicoes
+from www.models import Comissao, Proposicao, TipoProposicao
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera os dossiês em PDF das proposições selecionadas pelos mesmos "
+        "filtros da listagem, em paralelo, gravando numa pasta. "
+        "Rodar de novo retoma de onde parou (PDFs já gravados são pulados)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "destino",
+            help="Pasta onde os PDFs serão gravados (criada se não existir).",
+        )
+        parser.add_argument(
+            "--zip", dest="arquivo_zip",
+            help="Ao final, empacota os PDFs do filtro neste arquivo .zip.",
+        )
+
+        # 🔍 Mesmos filtros da tela de proposições
+        parser.add_argument(
+            "--tipo", default="PL",
+            help="Sigla do tipo (padrão: PL, como na tela). Use --tipo= para todos.",
+        )
+        parser.add_argument("--numero", help='Número, com * como na tela ("2025" = de 2025).')
+        parser.add_argument("--busca", help="Busca livre na ementa / número.")
+        parser.add_argument("--autor", type=int, help="Id do autor.")
+        parser.add_argument("--comissao", help="Sigla da comissão atual.")
+        parser.add_argument(
+            "--aguardando-parecer", action="store_true",
+            help="Só proposições aguardando parecer do relator.",
+        )
+        parser.add_argument(
+            "--usuario",
+            help="Gera como este usuário: aplica a restrição por comissão "
+                 "e o nome sai no cabeçalho do PDF.",
+        )
+
+        parser.add_argument(
+            "--processos", type=int, default=processos_padrao(),
+            help="Quantidade de PDFs gerados em paralelo (padrão: nº de CPUs).",
+        )
+        parser.add_argument(
+            "--refazer", action="store_true",
+            help="Gera de novo os PDFs que já estão na pasta.",
+        )
+
+    def handle(self, *args, **options):
+        destino = Path(options["destino"])
+        destino.mkdir(parents=True, exist_ok=True)
+
+        usuario = self._usuario(options["usuario"])
+        proposicoes = filtrar_lista_proposicoes(
+            Proposicao.objects.all(),
+            usuario,
+            tipo=self._tipo(options["tipo"]),
+            numero=options["numero"],
+            busca=(options["busca"] or "").strip(),
+            autor=options["autor"],
+            comissao=self._comissao(options["comissao"]),
+            aguardando_parecer=options["aguardando_parecer"],
+        ).order_by("numero")
+
+        # Retomada: o nome do arquivo identifica a proposição
+        prontos = set() if options["refazer"] else self._ja_gerados(destino)
+        selecionadas = list(proposicoes.values_list("pk", flat=True))
+        total = len(selecionadas)
+        pendentes = total - len(prontos.intersection(selecionadas))
+
+        self.stdout.write(
+            f"{total} proposição(ões) no filtro, {total - pendentes} já na pasta, "
+            f"{pendentes} a gerar com {options['processos']} processo(s)."
+        )
+
+        erros = []
+        feitos = 0
+        inicio = ultimo_aviso = time.monotonic()
+
+        for proposicao, nome, pdf, erro in gerar_dossies(
+            proposicoes, usuario=usuario,
+            processos=options["processos"], ignorar=prontos,
+        ):
+            feitos += 1
+            if erro:
+                erros.append(f"{proposicao.pk}\t{erro}")
+                self.stderr.write(f"✘ {proposicao.pk}: {erro}")
+            else:
+                self._gravar(destino / nome, pdf)
+
+            agora = time.monotonic()
+            if agora - ultimo_aviso >= 5 or feitos == pendentes:
+                ultimo_aviso = agora
+                self._progresso(feitos, pendentes, agora - inicio)
+
+        self._registrar_erros(destino, erros)
+
+        if options["arquivo_zip"]:
+            quantidade = self._empacotar(destino, selecionadas, options["arquivo_zip"])
+            self.stdout.write(f"{quantidade} PDF(s) em {options['arquivo_zip']}.")
+
+        estilo = self.style.WARNING if erros else self.style.SUCCESS
+        self.stdout.write(estilo(
+            f"Concluído: {feitos - len(erros)} gerado(s), {len(erros)} com erro."
+        ))
+
+    # -----------------------------------------------------------------
+
+    def _usuario(self, username):
+        if not username:
+            return None
+        try:
+            return User.objects.get(username=username)
+        except User.DoesNotExist:
+            raise CommandError(f"Usuário '{username}' não encontrado.")
+
+    def _tipo(self, sigla):
+        if not sigla:
+            return None
+        tipo = TipoProposicao.objects.filter(sigla=sigla).first()
+        if tipo is None:
+            raise CommandError(f"Tipo '{sigla}' não encontrado.")
+        return tipo.pk
+
+    def _comissao(self, sigla):
+        if not sigla:
+            return None
+        comissao = Comissao.objects.filter(sigla=sigla).first()
+        if comissao is None:
+            raise CommandError(f"Comissão '{sigla}' não encontrada.")
+        return comissao.pk
+
+    def _ja_gerados(self, destino):
+        return {
+            arquivo.stem[len("dossie_"):]
+            for arquivo in destino.glob("dossie_*.pdf")
+        }
+
+    def _gravar(self, caminho, pdf):
+        # escrita atômica: uma interrupção nunca deixa PDF pela metade na pasta
+        temporario = caminho.with_suffix(".tmp")
+        temporario.write_bytes(pdf)
+        os.replace(temporario, caminho)
+
+    def _progresso(self, feitos, pendentes, decorrido):
+        taxa = feitos / decorrido if decorrido else 0
+        restante = (pendentes - feitos) / taxa if taxa else 0
+        self.stdout.write(
+            f"[{feitos}/{pendentes}] {taxa:.1f} PDF/s, "
+            f"faltam ~{int(restante // 60)}min{int(restante % 60):02d}s"
+        )
+
+    def _registrar_erros(self, destino, erros):
+        arquivo = destino / "ERROS.txt"
+        if erros:
+            arquivo.write_text("\n".join(erros) + "\n", encoding="utf-8")
+        elif arquivo.exists():
+            arquivo.unlink()
+
+    def _empacotar(self, destino, selecionadas, arquivo_zip):
+        """Só os PDFs do filtro atual (a pasta pode ter sobras de outras exportações)."""
+        quantidade = 0
+        with zipfile.ZipFile(arquivo_zip, "w", compression=zipfile.ZIP_STORED) as zf:
+            for pk in selecionadas:
+                caminho = destino / f"dossie_{pk}.pdf"
+                if caminho.exists():
+                    zf.write(caminho, caminho.name)
+                    quantidade += 1
+        return quantidade
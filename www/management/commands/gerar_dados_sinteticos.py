@@ -0,0 +1,359 @@
+import random
+import time
+from datetime import date, time as hora, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils.timezone import now
+
+from www.fragmentos import CADASTROS, invalidar_fragmentos
+from www.indicadores import invalidar_indicadores
+from www.models import (
+    Autor,
+    Comissao,
+    ParecerVencido,
+    Proposicao,
+    Reuniao,
+    TipoProposicao,
+    Tramitacao,
+    recalcular_estado_proposicoes,
+    resumir_texto,
+)
+from www.tabelas import invalidar_tabelas
+
+# Números sintéticos ficam numa faixa própria (código >= 9000000), longe
+# da numeração real: "2025" + "9000001". Assim --acrescentar nunca colide.
+INICIO_FAIXA = 9000000
+
+TIPOS_PADRAO = (
+    ("PL", "Projeto Lei"),
+    ("PLC", "Projeto Lei Compl."),
+    ("PDL", "Proj. Decreto Legislativo"),
+    ("PR", "Proj. de Resolução"),
+    ("IND", "Indicações"),
+)
+
+PARECERES = ("FAVORÁVEL", "CONTRÁRIO", "FAVORÁVEL COM EMENDAS", "PELA DILIGÊNCIA")
+
+TEMAS = (
+    "educação ambiental", "transporte público", "saúde da família", "segurança alimentar",
+    "proteção de dados", "patrimônio histórico", "recursos hídricos", "assistência social",
+    "agricultura familiar", "mobilidade urbana", "energia renovável", "defesa do consumidor",
+    "cultura popular", "esporte amador", "saneamento básico", "inclusão digital",
+)
+
+PALAVRAS = (
+    "dispõe", "sobre", "institui", "altera", "programa", "estadual", "política", "municipal",
+    "proteção", "incentivo", "fiscal", "regime", "servidores", "fundo", "criação", "normas",
+    "prazo", "serviço", "público", "acesso", "informação", "gestão", "controle", "parecer",
+    "comissão", "relator", "constitucionalidade", "mérito", "emenda", "substitutivo",
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera uma massa de dados sintética (proposições, tramitações, reuniões, "
+        "votos vencidos) para medir desempenho. NÃO use no banco de produção."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--proposicoes", type=int, default=100_000)
+        parser.add_argument("--tramitacoes", type=int, default=500_000)
+        parser.add_argument("--reunioes", type=int, default=20_000)
+        parser.add_argument("--pareceres-vencidos", type=int, default=50_000)
+        parser.add_argument("--autores", type=int, default=500)
+        parser.add_argument("--comissoes", type=int, default=25)
+        parser.add_argument(
+            "--anos", type=int, default=10,
+            help="Quantos anos, terminando no atual (padrão: 10).",
+        )
+        parser.add_argument(
+            "--tamanho-texto", type=int, default=4000,
+            help="Tamanho médio, em caracteres, do HTML dos pareceres (padrão: 4000).",
+        )
+        parser.add_argument("--lote", type=int, default=5000)
+        parser.add_argument("--semente", type=int, default=42)
+        parser.add_argument(
+            "--acrescentar", action="store_true",
+            help="Permite gerar num banco que já tem proposições.",
+        )
+
+    def handle(self, *args, **options):
+        if Proposicao.objects.exists() and not options["acrescentar"]:
+            raise CommandError(
+                "O banco já tem proposições. Use um banco de testes "
+                "(ou --acrescentar, se for mesmo para somar os dados)."
+            )
+        if options["proposicoes"] < 1 or options["comissoes"] < 1 or options["autores"] < 1:
+            raise CommandError("Informe ao menos 1 proposição, 1 comissão e 1 autor.")
+
+        self.rnd = random.Random(options["semente"])
+        self.lote = options["lote"]
+        self.hoje = now().date()
+        ano_final = self.hoje.year
+        self.anos = list(range(ano_final - options["anos"] + 1, ano_final + 1))
+        self.textos = self._textos_html(options["tamanho_texto"])
+        # bulk_create não passa pelo save(): resumo calculado uma vez por texto
+        self.resumos = {texto: resumir_texto(texto) for texto in ["", *self.textos]}
+        inicio = time.monotonic()
+
+        with transaction.atomic():
+            tipos = self._tipos()
+            comissoes = self._comissoes(options["comissoes"])
+            autores = self._autores(options["autores"])
+            reunioes = self._reunioes(options["reunioes"], comissoes)
+            proposicoes = self._proposicoes(options["proposicoes"], tipos, autores)
+            self._tramitacoes(
+                proposicoes, comissoes, autores, reunioes,
+                options["tramitacoes"], options["pareceres_vencidos"],
+            )
+
+            self._etapa("Recalculando o estado atual das proposições")
+            recalcular_estado_proposicoes()
+
+        invalidar_indicadores()
+        invalidar_tabelas()       # bulk_create não dispara os signals
+        invalidar_fragmentos(CADASTROS)
+        self.stdout.write(self.style.SUCCESS(
+            f"Massa sintética gerada em {time.monotonic() - inicio:.0f}s."
+        ))
+
+    # -----------------------------------------------------------------
+
+    def _etapa(self, mensagem):
+        self.stdout.write(f"• {mensagem}...")
+
+    def _texto(self, minimo, maximo):
+        quantidade = self.rnd.randint(minimo, maximo)
+        return " ".join(self.rnd.choice(PALAVRAS) for _ in range(quantidade))
+
+    def _textos_html(self, tamanho_medio):
+        """
+        Um repertório de textos no formato do CKEditor (parágrafos, negrito,
+        listas) sorteados depois: montar 500 mil HTMLs diferentes só
+        gastaria tempo sem mudar o que se mede.
+        """
+        textos = []
+        for _ in range(200):
+            alvo = max(200, int(self.rnd.gauss(tamanho_medio, tamanho_medio / 3)))
+            partes = []
+            while sum(map(len, partes)) < alvo:
+                if self.rnd.random() < 0.15:
+                    itens = "".join(f"<li>{self._texto(5, 15)}</li>" for _ in range(3))
+                    partes.append(f"<ul>{itens}</ul>")
+                else:
+                    partes.append(
+                        f"<p><strong>{self._texto(2, 4).capitalize()}</strong> "
+                        f"{self._texto(30, 80)}.</p>"
+                    )
+            textos.append("".join(partes))
+        return textos
+
+    def _data_no_ano(self, ano, ate_hoje=True):
+        data = date(ano, 1, 1) + timedelta(days=self.rnd.randrange(365))
+        return min(data, self.hoje) if ate_hoje else data
+
+    def _assinado(self, pendente):
+        return not pendente or self.rnd.random() < 0.5
+
+    # -----------------------------------------------------------------
+
+    def _tipos(self):
+        tipos = list(TipoProposicao.objects.filter(ativo=True).values_list("pk", "sigla"))
+        if not tipos:
+            self._etapa("Criando os tipos de proposição")
+            for sigla, nome in TIPOS_PADRAO:
+                TipoProposicao.objects.get_or_create(sigla=sigla, defaults={"nome": nome})
+            tipos = list(TipoProposicao.objects.values_list("pk", "sigla"))
+
+        # Metade das proposições é PL, como na base real
+        pesos = [len(tipos) if sigla == "PL" else 1 for _pk, sigla in tipos]
+        return [pk for pk, _sigla in tipos], pesos
+
+    def _comissoes(self, quantidade):
+        self._etapa(f"Comissões ({quantidade})")
+        siglas = [f"SINT{i:02d}" for i in range(1, quantidade + 1)]
+        existentes = set(Comissao.objects.filter(sigla__in=siglas).values_list("sigla", flat=True))
+        Comissao.objects.bulk_create([
+            Comissao(sigla=sigla, nome=f"Comissão Sintética {sigla[4:]}")
+            for sigla in siglas if sigla not in existentes
+        ])
+        return list(Comissao.objects.filter(sigla__in=siglas).values_list("pk", flat=True))
+
+    def _autores(self, quantidade):
+        self._etapa(f"Autores ({quantidade})")
+        criados = Autor.objects.bulk_create([
+            Autor(nome=f"Deputado(a) Sintético(a) {i}", sexo=self.rnd.choice("MF"))
+            for i in range(1, quantidade + 1)
+        ], batch_size=self.lote)
+        return [a.pk for a in criados]
+
+    def _reunioes(self, quantidade, comissoes):
+        """Retorna {(comissao, ano): [(pk, data), ...]} para as tramitações."""
+        self._etapa(f"Reuniões ({quantidade})")
+        ordem = {}
+        reunioes = []
+        for _ in range(quantidade):
+            comissao = self.rnd.choice(comissoes)
+            # reuniões podem estar agendadas para depois de hoje
+            data = self._data_no_ano(self.rnd.choice(self.anos), ate_hoje=False)
+            numero = ordem[comissao, data.year] = ordem.get((comissao, data.year), 0) + 1
+            pendente = self.rnd.random() < 0.3     # ~30% com alguma pendência
+            reunioes.append(Reuniao(
+                comissao_id=comissao,
+                tipo=self.rnd.choice(("ORDINÁRIA", "ORDINÁRIA", "EXTRAORDINÁRIA")),
+                numero=numero,
+                data=data,
+                hora=hora(self.rnd.choice((9, 10, 11, 14, 15))),
+                pauta=self._texto(20, 60),
+                data_edital_do=data - timedelta(days=3),
+                tem_edital_assinado=self._assinado(pendente),
+                tem_presenca_assinada=self._assinado(pendente),
+                tem_ata_assinada=self._assinado(pendente),
+                data_ata_do=data + timedelta(days=7) if not pendente else None,
+                tem_parecer_assinado=self._assinado(pendente),
+                tem_deliberacao=True,
+                tem_deliberacao_assinada=self._assinado(pendente),
+                tem_conclusao=True,
+                tem_conclusao_assinada=self._assinado(pendente),
+            ))
+
+        por_comissao_ano = {}
+        for reuniao in Reuniao.objects.bulk_create(reunioes, batch_size=self.lote):
+            por_comissao_ano.setdefault((reuniao.comissao_id, reuniao.data.year), []).append(
+                (reuniao.pk, reuniao.data)
+            )
+        return por_comissao_ano
+
+    def _proposicoes(self, quantidade, tipos, autores):
+        """Retorna [(numero, data_publicacao), ...]."""
+        self._etapa(f"Proposições ({quantidade})")
+        tipos, pesos = tipos
+        proximo = {}
+        for ano in self.anos:
+            ultimo = (
+                Proposicao.objects
+                .filter(numero__startswith=f"{ano}{INICIO_FAIXA // 1000000}")
+                .order_by("-numero")
+                .values_list("numero", flat=True)
+                .first()
+            )
+            proximo[ano] = int(ultimo[4:]) + 1 if ultimo else INICIO_FAIXA + 1
+
+        criadas = []
+        Autoria = Proposicao.autores.through
+        for inicio in range(0, quantidade, self.lote):
+            proposicoes, autorias = [], []
+            for _ in range(min(self.lote, quantidade - inicio)):
+                ano = self.rnd.choice(self.anos)
+                codigo = proximo[ano]
+                proximo[ano] += 1
+                numero = f"{ano}{codigo:07d}"
+                tema = self.rnd.choice(TEMAS)
+                data = self._data_no_ano(ano)
+                proposicoes.append(Proposicao(
+                    numero=numero,
+                    numero_formatado=f"{codigo}/{ano}",
+                    tipo_id=self.rnd.choices(tipos, pesos)[0],
+                    ementa=f"Dispõe sobre {tema} e {self._texto(8, 30)}.",
+                    data_publicacao=data,
+                ))
+                for autor in self.rnd.sample(autores, min(len(autores), self.rnd.randint(1, 3))):
+                    autorias.append(Autoria(proposicao_id=numero, autor_id=autor))
+                criadas.append((numero, data))
+
+            Proposicao.objects.bulk_create(proposicoes)
+            Autoria.objects.bulk_create(autorias)
+            self.stdout.write(f"  {inicio + len(proposicoes)}/{quantidade}")
+        return criadas
+
+    def _tramitacoes(self, proposicoes, comissoes, autores, reunioes, quantidade, vencidos):
+        self._etapa(f"Tramitações ({quantidade}) e votos vencidos ({vencidos})")
+        media = quantidade / len(proposicoes)
+        restantes_t, restantes_v = quantidade, vencidos
+        tamanho_bloco = max(1, round(self.lote / max(media, 1)))  # ~1 lote de tramitações
+
+        for inicio in range(0, len(proposicoes), tamanho_bloco):
+            bloco = proposicoes[inicio:inicio + tamanho_bloco]
+            ultimo_bloco = inicio + len(bloco) >= len(proposicoes)
+            meta = restantes_t if ultimo_bloco else min(restantes_t, round(media * len(bloco)))
+
+            tramitacoes = []
+            # distribui a meta do bloco entre as proposições (0 a ~2x a média)
+            cotas = [0] * len(bloco)
+            for _ in range(meta):
+                cotas[self.rnd.randrange(len(bloco))] += 1
+
+            for (numero, publicacao), cota in zip(bloco, cotas):
+                entrada = min(publicacao + timedelta(days=self.rnd.randint(1, 20)), self.hoje)
+                for passo in range(cota):
+                    comissao = self.rnd.choice(comissoes)
+                    ultima = passo == cota - 1
+                    saida = None if ultima else min(
+                        entrada + timedelta(days=self.rnd.randint(5, 60)), self.hoje
+                    )
+
+                    # ~70% com parecer de relator; a reunião é da mesma comissão e ano
+                    relator = reuniao = None
+                    parecer = texto = ""
+                    if self.rnd.random() < 0.7:
+                        relator = self.rnd.choice(autores)
+                        candidatas = reunioes.get((comissao, entrada.year))
+                        if candidatas:
+                            reuniao = self.rnd.choice(candidatas)[0]
+                        parecer = self.rnd.choice(PARECERES)
+                        texto = self.rnd.choice(self.textos)
+
+                    tramitacoes.append(Tramitacao(
+                        proposicao_id=numero,
+                        comissao_id=comissao,
+                        data_entrada=entrada,
+                        data_saida=saida,
+                        observacao=self._texto(0, 12),
+                        relator_id=relator,
+                        reuniao_id=reuniao,
+                        parecer=parecer,
+                        texto=texto,
+                        texto_tamanho=self.resumos[texto][0],
+                        texto_resumo=self.resumos[texto][1],
+                    ))
+                    entrada = min((saida or entrada) + timedelta(days=self.rnd.randint(0, 10)),
+                                  self.hoje)
+
+            # Votos vencidos: só em tramitações com reunião (pedido de vista)
+            com_reuniao = [t for t in tramitacoes if t.reuniao_id]
+            cota_v = restantes_v if ultimo_bloco else min(
+                restantes_v, round(vencidos * len(tramitacoes) / quantidade) if quantidade else 0
+            )
+            com_vista = self.rnd.sample(com_reuniao, min(len(com_reuniao), cota_v))
+            for t in com_vista:
+                t.pedido_vista = True
+
+            Tramitacao.objects.bulk_create(tramitacoes)
+            votos = []
+            for t in com_vista:
+                # mesma ordem de sorteios de antes: a semente gera a mesma massa
+                relator = self.rnd.choice(autores)
+                parecer = self.rnd.choice(PARECERES)
+                texto = self.rnd.choice(self.textos)
+                votos.append(ParecerVencido(
+                    tramitacao_id=t.pk,
+                    reuniao_id=t.reuniao_id,
+                    relator_id=relator,
+                    parecer=parecer,
+                    texto=texto,
+                    texto_tamanho=self.resumos[texto][0],
+                    texto_resumo=self.resumos[texto][1],
+                    data_apresentacao=t.data_entrada + timedelta(days=self.rnd.randint(1, 15)),
+                ))
+            ParecerVencido.objects.bulk_create(votos, batch_size=self.lote)
+
+            restantes_t -= len(tramitacoes)
+            restantes_v -= len(com_vista)
+            self.stdout.write(f"  {quantidade - restantes_t}/{quantidade}")
+
+        if restantes_v > 0:
+            self.stderr.write(
+                f"  {restantes_v} voto(s) vencido(s) não gerado(s): faltaram "
+                "tramitações com reunião (aumente --reunioes ou --tramitacoes)."
+            )
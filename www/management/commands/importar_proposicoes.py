@@ -0,0 +1,462 @@
+import csv
+import sqlite3
+import time
+from datetime import date, datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from www.fragmentos import CADASTROS, invalidar_fragmentos
+from www.indicadores import invalidar_indicadores
+from www.models import Autor, Proposicao, TipoProposicao
+
+CAMPOS_PROPOSICAO = [
+    "tipo_id", "numero_formatado", "ementa", "data_publicacao", "link_proposicao",
+]
+
+# Colunas das tabelas legadas (e da planilha exportada delas)
+COLUNAS = ["numero", "numero_formatado", "ementa", "data_publicacao", "link", "tipo", "autor"]
+
+
+class Rejeitada(Exception):
+    """Linha da origem que não pode ser importada (o motivo vai no relatório)."""
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa proposições e autores das tabelas legadas (projetos_de_lei / "
+        "autores) ou de uma planilha CSV/XLSX, atualizando o que já existe. "
+        "Pode ser rodado de novo: só grava o que mudou."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "arquivo", nargs="?",
+            help="Planilha .csv ou .xlsx com as colunas de projetos_de_lei "
+                 "(numero, numero_formatado, ementa, data_publicacao, link, tipo, autor). "
+                 "Sem arquivo, lê as tabelas legadas do banco.",
+        )
+        parser.add_argument(
+            "--banco",
+            help="Arquivo SQLite com as tabelas legadas (padrão: o banco do sistema).",
+        )
+        parser.add_argument(
+            "--lote", type=int, default=2000,
+            help="Linhas por transação (padrão: 2000).",
+        )
+        parser.add_argument(
+            "--data-padrao",
+            help="Data (dd/mm/aaaa) para linhas sem data de publicação. "
+                 "Sem ela, essas linhas são rejeitadas.",
+        )
+        parser.add_argument(
+            "--sexo-padrao", choices=["M", "F"], default="M",
+            help="Sexo dos autores NOVOS quando a origem não informa (padrão: M). "
+                 "Autores já cadastrados mantêm o sexo.",
+        )
+        parser.add_argument(
+            "--delimitador", default=";",
+            help="Delimitador do CSV (padrão: ;).",
+        )
+        parser.add_argument(
+            "--rejeitadas",
+            help="Grava as linhas rejeitadas (com o motivo) neste arquivo CSV.",
+        )
+
+    def handle(self, *args, **options):
+        self.tamanho_lote = max(1, options["lote"])
+        self.sexo_padrao = options["sexo_padrao"]
+        self._datas = {}
+        self.data_padrao = (
+            self._data(options["data_padrao"]) if options["data_padrao"] else None
+        )
+
+        self.tipos = dict(TipoProposicao.objects.values_list("sigla", "id"))
+        # Autor.nome não é único: fica o cadastro mais antigo
+        self.autores = {}
+        for autor_id, nome in Autor.objects.order_by("-pk").values_list("pk", "nome"):
+            self.autores[self._chave_autor(nome)] = autor_id
+
+        self.criadas = self.atualizadas = self.vinculos = self.autores_criados = 0
+        self.rejeitadas = []
+
+        inicio = time.monotonic()
+        if options["arquivo"]:
+            linhas = self._ler_planilha(Path(options["arquivo"]), options["delimitador"])
+        else:
+            banco = options["banco"] or self._banco_padrao()
+            self._importar_autores_legados(banco)
+            linhas = self._ler_tabela(banco)
+
+        lote = []
+        lidas = 0
+        for linha in linhas:
+            lote.append(linha)
+            lidas += 1
+            if len(lote) >= self.tamanho_lote:
+                self._gravar_lote(lote)
+                lote = []
+                self.stdout.write(f"  {lidas} linha(s) lida(s)...")
+        if lote:
+            self._gravar_lote(lote)
+
+        # bulk_create/bulk_update não disparam signals: o total de proposições
+        # do dashboard precisa ser invalidado à mão. Proposição nova não tem
+        # tramitação, então o estado derivado (comissão atual etc.) já nasce certo.
+        # O índice de busca é mantido pelos triggers do banco. Os ETags e
+        # fragmentos das proposições atualizadas mudam pela versão geral.
+        if self.criadas or self.atualizadas:
+            invalidar_indicadores()
+            invalidar_fragmentos(CADASTROS)
+
+        if options["rejeitadas"] and self.rejeitadas:
+            self._gravar_rejeitadas(options["rejeitadas"])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{lidas} linha(s) em {time.monotonic() - inicio:.1f}s: "
+            f"{self.criadas} proposição(ões) criada(s), {self.atualizadas} atualizada(s), "
+            f"{self.autores_criados} autor(es) novo(s), {self.vinculos} vínculo(s) de autoria novo(s)."
+        ))
+        if self.rejeitadas:
+            self.stdout.write(self.style.WARNING(
+                f"{len(self.rejeitadas)} linha(s) rejeitada(s):"
+            ))
+            for numero_linha, motivo, _ in self.rejeitadas[:20]:
+                self.stdout.write(f"  linha {numero_linha}: {motivo}")
+            if len(self.rejeitadas) > 20:
+                self.stdout.write("  ... (use --rejeitadas arquivo.csv para a lista completa)")
+
+    # =================================================================
+    # 🔹 Leitura das origens (sempre em fluxo)
+    # =================================================================
+
+    def _banco_padrao(self):
+        banco = settings.DATABASES["default"]
+        if "sqlite" not in banco["ENGINE"]:
+            raise CommandError("Informe --banco com o arquivo SQLite das tabelas legadas.")
+        return str(banco["NAME"])
+
+    def _conectar(self, banco):
+        try:
+            return sqlite3.connect(f"file:{banco}?mode=ro", uri=True)
+        except sqlite3.Error as exc:
+            raise CommandError(f"Não foi possível abrir {banco}: {exc}")
+
+    def _ler_tabela(self, banco):
+        """
+        projetos_de_lei em pedaços pelo rowid: cada SELECT termina antes da
+        gravação do lote, então a leitura nunca segura o banco bloqueado.
+        """
+        conexao = self._conectar(banco)
+        conexao.row_factory = sqlite3.Row
+        ultimo = 0
+        try:
+            while True:
+                try:
+                    pedaco = conexao.execute(
+                        "SELECT rowid, * FROM projetos_de_lei "
+                        "WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                        [ultimo, self.tamanho_lote],
+                    ).fetchall()
+                except sqlite3.Error as exc:
+                    raise CommandError(f"Erro lendo projetos_de_lei: {exc}")
+                if not pedaco:
+                    return
+                for registro in pedaco:
+                    ultimo = registro["rowid"]
+                    yield ultimo, dict(registro)
+        finally:
+            conexao.close()
+
+    def _importar_autores_legados(self, banco):
+        """Tabela autores: cadastra quem ainda não existe (autores sem proposição inclusive)."""
+        conexao = self._conectar(banco)
+        conexao.row_factory = sqlite3.Row
+        try:
+            registros = conexao.execute("SELECT * FROM autores").fetchall()
+        except sqlite3.Error:
+            return  # tabela opcional
+        finally:
+            conexao.close()
+
+        with transaction.atomic():
+            self._garantir_autores(
+                (registro["nome"], self._valor(registro, "sexo"))
+                for registro in registros
+                if (registro["nome"] or "").strip()
+            )
+
+    def _ler_planilha(self, caminho, delimitador):
+        if not caminho.exists():
+            raise CommandError(f"Arquivo não encontrado: {caminho}")
+
+        if caminho.suffix.lower() == ".xlsx":
+            yield from self._ler_xlsx(caminho)
+            return
+
+        with open(caminho, newline="", encoding="utf-8-sig") as arquivo:
+            leitor = csv.DictReader(arquivo, delimiter=delimitador)
+            # linha 1 é o cabeçalho
+            for numero_linha, registro in enumerate(leitor, start=2):
+                yield numero_linha, registro
+
+    def _ler_xlsx(self, caminho):
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise CommandError("Para ler .xlsx instale o openpyxl (pip install openpyxl).")
+
+        # read_only: a planilha é lida linha a linha, sem carregar tudo
+        planilha = load_workbook(caminho, read_only=True, data_only=True)
+        try:
+            linhas = planilha.active.iter_rows(values_only=True)
+            cabecalho = [str(c).strip().lower() if c is not None else "" for c in next(linhas, [])]
+            for numero_linha, valores in enumerate(linhas, start=2):
+                if not any(v not in (None, "") for v in valores):
+                    continue
+                yield numero_linha, dict(zip(cabecalho, valores))
+        finally:
+            planilha.close()
+
+    # =================================================================
+    # 🔹 Validação de cada linha
+    # =================================================================
+
+    def _valor(self, registro, campo):
+        try:
+            valor = registro[campo]
+        except (KeyError, IndexError):
+            return None
+        if valor is None:
+            return None
+        if isinstance(valor, float) and valor.is_integer():
+            valor = int(valor)  # números vindos do Excel (2025000001.0)
+        if isinstance(valor, (date, datetime)):
+            return valor
+        return str(valor).strip() or None
+
+    def _data(self, valor):
+        if isinstance(valor, datetime):
+            return valor.date()
+        if isinstance(valor, date):
+            return valor
+
+        # Poucas datas distintas se repetem em milhares de linhas: o strptime
+        # roda uma vez por texto.
+        convertida = self._datas.get(valor)
+        if convertida is None:
+            for formato in ("%d/%m/%Y", "%Y-%m-%d", "%Y-%m-%d %H:%M:%S"):
+                try:
+                    convertida = datetime.strptime(valor, formato).date()
+                    break
+                except ValueError:
+                    continue
+            else:
+                raise Rejeitada(f"data de publicação inválida: {valor!r}")
+            self._datas[valor] = convertida
+        return convertida
+
+    def _validar(self, registro):
+        """Converte a linha em (campos da proposição, nomes dos autores) ou rejeita."""
+        numero = self._valor(registro, "numero")
+        if not numero:
+            raise Rejeitada("sem número")
+        numero = str(numero)
+        tamanho = Proposicao._meta.get_field("numero").max_length
+        if len(numero) > tamanho:
+            # o script antigo cortava com substr e podia juntar proposições diferentes
+            raise Rejeitada(f"número com mais de {tamanho} caracteres: {numero!r}")
+
+        sigla = self._valor(registro, "tipo")
+        if sigla not in self.tipos:
+            raise Rejeitada(f"tipo desconhecido: {sigla!r}")
+
+        numero_formatado = self._valor(registro, "numero_formatado")
+        if not numero_formatado:
+            raise Rejeitada("sem número formatado")
+        numero_formatado = str(numero_formatado)
+        if len(numero_formatado) > Proposicao._meta.get_field("numero_formatado").max_length:
+            raise Rejeitada(f"número formatado longo demais: {numero_formatado!r}")
+
+        ementa = self._valor(registro, "ementa")
+        if not ementa:
+            raise Rejeitada("sem ementa")
+
+        data_publicacao = self._valor(registro, "data_publicacao")
+        if data_publicacao:
+            data_publicacao = self._data(data_publicacao)
+        elif self.data_padrao:
+            data_publicacao = self.data_padrao
+        else:
+            raise Rejeitada("sem data de publicação (veja --data-padrao)")
+
+        link = self._valor(registro, "link") or self._valor(registro, "link_proposicao")
+
+        # Vários autores na mesma célula: "Fulano; Beltrana"
+        autores = [
+            nome.strip()
+            for nome in str(self._valor(registro, "autor") or "").split(";")
+            if nome.strip()
+        ]
+
+        return {
+            "numero": numero,
+            "tipo_id": self.tipos[sigla],
+            "numero_formatado": numero_formatado,
+            "ementa": ementa,
+            "data_publicacao": data_publicacao,
+            "link_proposicao": link,
+        }, [(nome, self._valor(registro, "sexo")) for nome in autores]
+
+    def _rejeitar(self, numero_linha, motivo, registro):
+        self.rejeitadas.append((numero_linha, motivo, registro))
+
+    # =================================================================
+    # 🔹 Gravação em lote
+    # =================================================================
+
+    def _chave_autor(self, nome):
+        return " ".join(nome.split()).casefold()
+
+    def _garantir_autores(self, nomes_sexos):
+        """Cria de uma vez os autores que ainda não existem."""
+        novos = {}
+        for nome, sexo in nomes_sexos:
+            chave = self._chave_autor(nome)
+            if chave in self.autores or chave in novos:
+                continue
+            sexo = (sexo or "").upper()[:1]
+            novos[chave] = Autor(
+                nome=" ".join(nome.split()),
+                sexo=sexo if sexo in ("M", "F") else self.sexo_padrao,
+                ativo=False,  # como na carga antiga: autores históricos ficam inativos
+            )
+        if not novos:
+            return
+
+        Autor.objects.bulk_create(novos.values(), batch_size=self.tamanho_lote)
+        for chave, autor in novos.items():
+            self.autores[chave] = autor.pk
+        self.autores_criados += len(novos)
+
+    def _gravar_lote(self, lote):
+        # 1) valida; linhas do mesmo número (uma por autor) viram uma proposição
+        proposicoes = {}
+        autoria = []
+        for numero_linha, registro in lote:
+            try:
+                dados, autores = self._validar(registro)
+            except Rejeitada as exc:
+                self._rejeitar(numero_linha, str(exc), registro)
+                continue
+
+            anterior = proposicoes.get(dados["numero"])
+            if anterior and anterior != dados:
+                self._rejeitar(
+                    numero_linha,
+                    f"número {dados['numero']} repetido com dados diferentes",
+                    registro,
+                )
+                continue
+            proposicoes[dados["numero"]] = dados
+            autoria.extend((dados["numero"], nome, sexo) for nome, sexo in autores)
+
+        if not proposicoes:
+            return
+
+        with transaction.atomic():
+            self._gravar_proposicoes(proposicoes, lote)
+            self._garantir_autores((nome, sexo) for _, nome, sexo in autoria)
+
+            Vinculo = Proposicao.autores.through
+            vinculos = {
+                (numero, self.autores[self._chave_autor(nome)])
+                for numero, nome, _ in autoria
+                if numero in proposicoes
+            }
+            existentes = set(
+                Vinculo.objects
+                .filter(proposicao_id__in=list(proposicoes))
+                .values_list("proposicao_id", "autor_id")
+            )
+            novos = [
+                Vinculo(proposicao_id=numero, autor_id=autor_id)
+                for numero, autor_id in vinculos - existentes
+            ]
+            Vinculo.objects.bulk_create(novos, batch_size=self.tamanho_lote, ignore_conflicts=True)
+            self.vinculos += len(novos)
+
+    def _gravar_proposicoes(self, proposicoes, lote):
+        # Tuplas, não instâncias: numa reimportação quase tudo é igual e
+        # montar 200 mil objetos só para comparar custaria mais que a consulta.
+        existentes = {
+            linha[0]: linha[1:]
+            for linha in (
+                Proposicao.objects
+                .filter(numero__in=list(proposicoes))
+                .values_list("numero", *CAMPOS_PROPOSICAO)
+            )
+        }
+
+        # (tipo, número formatado) é único: outra proposição já com o mesmo par
+        # faria o lote inteiro falhar no banco — rejeita só a linha.
+        ocupados = {
+            (tipo_id, numero_formatado): numero
+            for numero, tipo_id, numero_formatado in (
+                Proposicao.objects
+                # tipo + número formatado: usa o índice da constraint única
+                .filter(
+                    tipo_id__in={d["tipo_id"] for d in proposicoes.values()},
+                    numero_formatado__in={d["numero_formatado"] for d in proposicoes.values()},
+                )
+                .values_list("numero", "tipo_id", "numero_formatado")
+            )
+        }
+        linha_do_numero = {}
+        for numero_linha, registro in lote:
+            linha_do_numero.setdefault(str(self._valor(registro, "numero")), (numero_linha, registro))
+
+        criar, atualizar = [], []
+        for numero, dados in list(proposicoes.items()):
+            par = (dados["tipo_id"], dados["numero_formatado"])
+            dono = ocupados.get(par)
+            if dono is not None and dono != numero:
+                numero_linha, registro = linha_do_numero[numero]
+                self._rejeitar(
+                    numero_linha,
+                    f"número formatado {dados['numero_formatado']} já usado pela proposição {dono}",
+                    registro,
+                )
+                del proposicoes[numero]
+                continue
+            ocupados[par] = numero
+
+            atual = existentes.get(numero)
+            if atual is None:
+                criar.append(Proposicao(**dados))
+            elif atual != tuple(dados[c] for c in CAMPOS_PROPOSICAO):
+                atualizar.append(Proposicao(**dados))
+
+        Proposicao.objects.bulk_create(criar, batch_size=self.tamanho_lote)
+        if atualizar:
+            Proposicao.objects.bulk_update(atualizar, CAMPOS_PROPOSICAO, batch_size=500)
+        self.criadas += len(criar)
+        self.atualizadas += len(atualizar)
+
+    # -----------------------------------------------------------------
+
+    def _gravar_rejeitadas(self, caminho):
+        colunas = list(COLUNAS)
+        for _, _, registro in self.rejeitadas:
+            colunas.extend(c for c in registro if c not in colunas and c != "rowid")
+
+        with open(caminho, "w", newline="", encoding="utf-8") as arquivo:
+            escritor = csv.writer(arquivo, delimiter=";")
+            escritor.writerow(["linha", "motivo", *colunas])
+            for numero_linha, motivo, registro in self.rejeitadas:
+                escritor.writerow(
+                    [numero_linha, motivo, *(registro.get(c, "") for c in colunas)]
+                )
+        self.stdout.write(f"Linhas rejeitadas gravadas em {caminho}.")
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from www.pdf import reduzir_cache
+
+
+class Command(BaseCommand):
+    help = "Esvazia o cache de PDFs em disco (ou o reduz até um tamanho máximo)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ate-mb", type=int, default=0,
+            help="Mantém os PDFs usados mais recentemente até esse tamanho (padrão: 0, apaga tudo).",
+        )
+
+    def handle(self, *args, **options):
+        removidos, liberados = reduzir_cache(options["ate_mb"] * 1024 * 1024)
+        self.stdout.write(self.style.SUCCESS(
+            f"{removidos} PDF(s) removido(s), {liberados / (1024 * 1024):.1f} MB liberados."
+        ))
@@ -0,0 +1,98 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+
+class Command(BaseCommand):
+    help = (
+        "Manutenção do SQLite com o sistema no ar: PRAGMA optimize (estatísticas "
+        "do planejador), checkpoint do WAL e, se pedido, ANALYZE completo, "
+        "VACUUM e verificação de integridade."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--analyze", action="store_true",
+            help="ANALYZE completo de todas as tabelas (após cargas grandes).",
+        )
+        parser.add_argument(
+            "--vacuum", action="store_true",
+            help="VACUUM: reescreve o arquivo e devolve o espaço livre ao disco. "
+                 "As leituras continuam; as escritas esperam até o fim.",
+        )
+        parser.add_argument(
+            "--vacuum-into", metavar="ARQUIVO",
+            help="Grava uma cópia compactada do banco no arquivo (backup a quente), "
+                 "sem bloquear as escritas.",
+        )
+        parser.add_argument(
+            "--integridade", action="store_true",
+            help="PRAGMA quick_check; termina com erro se houver problema.",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("A manutenção foi escrita para o SQLite.")
+
+        with connection.cursor() as cursor:
+            if options["integridade"]:
+                self._integridade(cursor)
+
+            if options["analyze"]:
+                self._executar(cursor, "ANALYZE", "ANALYZE")
+            else:
+                # Amostragem limitada: o optimize só reanalisa o que mudou
+                cursor.execute("PRAGMA analysis_limit=1000")
+                self._executar(cursor, "PRAGMA optimize", "PRAGMA optimize")
+
+            if options["vacuum"]:
+                antes = self._tamanho(cursor)
+                self._executar(cursor, "VACUUM", "VACUUM")
+                self.stdout.write(
+                    f"      {antes / 1048576:.1f} MB -> {self._tamanho(cursor) / 1048576:.1f} MB"
+                )
+
+            if options["vacuum_into"]:
+                self._executar(cursor, "VACUUM INTO %s", "VACUUM INTO", [options["vacuum_into"]])
+
+            self._checkpoint(cursor)
+
+    # -----------------------------------------------------------------
+
+    def _executar(self, cursor, sql, nome, parametros=None):
+        inicio = time.perf_counter()
+        cursor.execute(sql, parametros)
+        self.stdout.write(self.style.SUCCESS(
+            f"✔ {nome} ({time.perf_counter() - inicio:.1f} s)"
+        ))
+
+    def _tamanho(self, cursor):
+        pagina = cursor.execute("PRAGMA page_size").fetchone()[0]
+        paginas = cursor.execute("PRAGMA page_count").fetchone()[0]
+        return pagina * paginas
+
+    def _integridade(self, cursor):
+        resultado = [linha[0] for linha in cursor.execute("PRAGMA quick_check").fetchall()]
+        if resultado != ["ok"]:
+            for linha in resultado:
+                self.stdout.write(self.style.ERROR(f"      {linha}"))
+            raise CommandError("O banco tem problemas de integridade.")
+        self.stdout.write(self.style.SUCCESS("✔ PRAGMA quick_check"))
+
+    def _checkpoint(self, cursor):
+        """Passa o WAL para o banco e trunca o arquivo -wal (se ninguém estiver lendo)."""
+        modo = cursor.execute("PRAGMA journal_mode").fetchone()[0]
+        if modo != "wal":
+            self.stdout.write(f"Journal '{modo}': sem checkpoint do WAL.")
+            return
+        ocupado, paginas, copiadas = cursor.execute(
+            "PRAGMA wal_checkpoint(TRUNCATE)"
+        ).fetchone()
+        if ocupado:
+            self.stdout.write(self.style.WARNING(
+                f"⚠ Checkpoint parcial ({copiadas}/{paginas} páginas): "
+                "havia leituras em andamento; o SQLite completa depois."
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS("✔ Checkpoint do WAL"))
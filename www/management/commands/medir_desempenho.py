@@ -0,0 +1,329 @@
+import json
+import math
+import platform
+import re
+import subprocess
+import tempfile
+import time
+from contextlib import ExitStack
+from datetime import datetime
+from statistics import mean, median
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils.timezone import now
+
+from www.indicadores import invalidar_indicadores
+from www.models import ParecerVencido, Proposicao, Reuniao, Tramitacao
+
+# "/Type /Page" conta as páginas; "/Type /Pages" é o nó raiz e fica de fora
+PAGINA_PDF = re.compile(rb"/Type\s*/Page(?![a-zA-Z])")
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede as telas principais, os relatórios e os PDFs pelo cliente de "
+        "teste do Django (latência p50/p90/p95/p99, consultas SQL, páginas "
+        "de PDF por segundo) e grava o resultado num JSON para comparar commits."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--saida",
+            help="Arquivo JSON do resultado (padrão: desempenho-<data>-<commit>.json).",
+        )
+        parser.add_argument(
+            "--comparar",
+            help="JSON de uma medição anterior: mostra a diferença de cada tela.",
+        )
+        parser.add_argument(
+            "--usuario",
+            help="Usuário logado nas requisições (padrão: o primeiro superusuário).",
+        )
+        parser.add_argument("--repeticoes", type=int, default=20)
+        parser.add_argument(
+            "--aquecimento", type=int, default=2,
+            help="Requisições descartadas antes de medir cada tela (padrão: 2).",
+        )
+        parser.add_argument(
+            "--repeticoes-pdf", type=int, default=5,
+            help="Repetições das telas que geram PDF (padrão: 5).",
+        )
+        parser.add_argument("--sem-pdf", action="store_true", help="Não mede os PDFs.")
+        parser.add_argument(
+            "--telas", nargs="*",
+            help="Só as telas com estes nomes (ver a saída de uma medição completa).",
+        )
+
+    def handle(self, *args, **options):
+        usuario = self._usuario(options["usuario"])
+        amostra = self._amostra(options)
+
+        cliente = Client()
+        cliente.force_login(usuario)
+
+        resultados = {}
+        # PDFs sempre na hora (sem fila) e num cache de disco vazio
+        with tempfile.TemporaryDirectory() as cache_pdf, override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],
+            PDF_ASSINCRONO=False,
+            PDF_CACHE_DIR=cache_pdf,
+        ):
+            for tela in self._telas(amostra):
+                if options["telas"] and tela["nome"] not in options["telas"]:
+                    continue
+                if tela.get("pdf") and options["sem_pdf"]:
+                    continue
+
+                repeticoes = options["repeticoes_pdf"] if tela.get("pdf") else options["repeticoes"]
+                resultado = self._medir(cliente, tela, options["aquecimento"], repeticoes)
+                resultados[tela["nome"]] = resultado
+                self._mostrar(tela["nome"], resultado)
+
+        relatorio = {
+            "gerado_em": now().isoformat(),
+            "commit": self._commit(),
+            "ambiente": {
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "banco": connection.vendor,
+                "debug": settings.DEBUG,
+            },
+            "volume": amostra["volume"],
+            "parametros": {
+                "repeticoes": options["repeticoes"],
+                "repeticoes_pdf": options["repeticoes_pdf"],
+                "aquecimento": options["aquecimento"],
+                "usuario": usuario.username,
+            },
+            "telas": resultados,
+        }
+
+        saida = options["saida"] or (
+            f"desempenho-{datetime.now():%Y%m%d-%H%M%S}-{relatorio['commit'] or 'sem-git'}.json"
+        )
+        with open(saida, "w", encoding="utf-8") as arquivo:
+            json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Resultado gravado em {saida}"))
+
+        if options["comparar"]:
+            self._comparar(options["comparar"], resultados)
+
+    # -----------------------------------------------------------------
+
+    def _usuario(self, username):
+        if username:
+            try:
+                return User.objects.get(username=username)
+            except User.DoesNotExist:
+                raise CommandError(f"Usuário '{username}' não encontrado.")
+        usuario = User.objects.filter(is_superuser=True, is_active=True).order_by("pk").first()
+        if usuario is None:
+            raise CommandError("Nenhum superusuário: informe --usuario.")
+        return usuario
+
+    def _amostra(self, options):
+        """Parâmetros reais do banco para as URLs (a comissão mais movimentada etc.)."""
+        comissao = (
+            Proposicao.objects
+            .filter(comissao_atual__isnull=False)
+            .values("comissao_atual")
+            .annotate(n=Count("pk"))
+            .order_by("-n")
+            .values_list("comissao_atual", flat=True)
+            .first()
+        )
+        if comissao is None:
+            raise CommandError(
+                "Banco sem tramitações. Gere uma massa de teste antes: "
+                "python manage.py gerar_dados_sinteticos"
+            )
+
+        ano = (
+            Reuniao.objects.filter(comissao_id=comissao, data__lte=now().date())
+            .order_by("-data").values_list("data", flat=True).first()
+        )
+
+        # Um PDF diferente por repetição: o cache de disco não interfere
+        quantidade = options["repeticoes_pdf"] + options["aquecimento"]
+        dossies = list(
+            Proposicao.objects.filter(tramitacao_atual__isnull=False)
+            .order_by("-data_publicacao")
+            .values_list("pk", flat=True)[:quantidade]
+        )
+        pareceres = list(
+            Tramitacao.objects.filter(relator__isnull=False)
+            .exclude(texto="")
+            .order_by("-pk")
+            .values_list("pk", flat=True)[:quantidade]
+        )
+
+        return {
+            "comissao": comissao,
+            "ano": ano.year if ano else now().year,
+            "dossies": dossies,
+            "pareceres": pareceres,
+            "volume": {
+                "proposicoes": Proposicao.objects.count(),
+                "tramitacoes": Tramitacao.objects.count(),
+                "reunioes": Reuniao.objects.count(),
+                "pareceres_vencidos": ParecerVencido.objects.count(),
+            },
+        }
+
+    def _telas(self, amostra):
+        """
+        Cada tela: nome, url (texto, ou função do nº da repetição), se é PDF
+        e 'preparar' (chamado antes de cada requisição, fora da medição).
+        """
+        comissao, ano = amostra["comissao"], amostra["ano"]
+        situacao = f"?comissao={comissao}"
+        pendencias = f"?comissao={comissao}&ano={ano}"
+        dossies, pareceres = amostra["dossies"], amostra["pareceres"]
+
+        yield {"nome": "dashboard", "url": reverse("dashboard")}
+        yield {"nome": "dashboard_sem_cache", "url": reverse("dashboard"),
+               "preparar": invalidar_indicadores}
+        yield {"nome": "proposicoes", "url": reverse("proposicao_list") + "?tipo=&comissao="}
+        yield {"nome": "proposicoes_ultima_pagina",
+               "url": reverse("proposicao_list") + "?tipo=&comissao=&ultima=1"}
+        yield {"nome": "proposicoes_busca",
+               "url": reverse("proposicao_list") + "?tipo=&comissao=&busca=dispõe"}
+        yield {"nome": "painel", "url": reverse("tramitacoes_painel") + "?comissao="}
+        yield {"nome": "painel_comissao",
+               "url": reverse("tramitacoes_painel") + f"?comissao={comissao}"}
+        yield {"nome": "reunioes", "url": reverse("reuniao_list") + f"?comissao={comissao}"}
+
+        # 📊 Relatórios (views_relatorios)
+        yield {"nome": "situacao_comissao",
+               "url": reverse("relatorio_situacao_comissao") + situacao}
+        yield {"nome": "situacao_comissao_csv",
+               "url": reverse("relatorio_situacao_comissao_exportar", args=["csv"]) + situacao}
+        yield {"nome": "pendencias_reunioes",
+               "url": reverse("relatorio_pendencias_reunioes") + pendencias}
+        yield {"nome": "pendencias_reunioes_todas_comissoes",
+               "url": reverse("relatorio_pendencias_reunioes") + f"?comissao=&ano={ano}&todas=1"}
+        yield {"nome": "pendencias_reunioes_csv",
+               "url": reverse("relatorio_pendencias_reunioes_exportar", args=["csv"]) + pendencias}
+        yield {"nome": "dossie_busca", "url": reverse("relatorio_dossie") + "?busca=dispõe"}
+
+        # 📄 PDFs
+        yield {"nome": "pdf_situacao_comissao", "pdf": True,
+               "url": reverse("relatorio_situacao_comissao_pdf") + situacao}
+        yield {"nome": "pdf_pendencias_reunioes", "pdf": True,
+               "url": reverse("relatorio_pendencias_reunioes_pdf") + pendencias}
+        if dossies:
+            yield {"nome": "pdf_dossie", "pdf": True,
+                   "url": lambda i: reverse("relatorio_dossie_pdf", args=[dossies[i % len(dossies)]])}
+            yield {"nome": "pdf_dossie_em_cache", "pdf": True,
+                   "url": reverse("relatorio_dossie_pdf", args=[dossies[0]])}
+        if pareceres:
+            yield {"nome": "pdf_parecer", "pdf": True,
+                   "url": lambda i: reverse("tramitacao_pdf", args=[pareceres[i % len(pareceres)]])}
+
+    def _medir(self, cliente, tela, aquecimento, repeticoes):
+        tempos, consultas, tamanhos = [], [], []
+        paginas = 0
+
+        for i in range(aquecimento + repeticoes):
+            if tela.get("preparar"):
+                tela["preparar"]()
+            url = tela["url"](i) if callable(tela["url"]) else tela["url"]
+
+            # Todas as conexões: relatórios, dashboard e exportações leem do
+            # banco "relatorios" (www/banco_relatorios.py)
+            with ExitStack() as pilha:
+                capturadas = [
+                    pilha.enter_context(CaptureQueriesContext(conexao))
+                    for conexao in connections.all()
+                ]
+                inicio = time.perf_counter()
+                resposta = cliente.get(url)
+                # respostas em fluxo só terminam quando o conteúdo é lido
+                corpo = (b"".join(resposta.streaming_content)
+                         if resposta.streaming else resposta.content)
+                decorrido = time.perf_counter() - inicio
+
+            if resposta.status_code != 200:
+                return {"url": url, "erro": f"HTTP {resposta.status_code}"}
+            if i < aquecimento:
+                continue
+
+            tempos.append(decorrido * 1000)
+            consultas.append(sum(len(captura) for captura in capturadas))
+            tamanhos.append(len(corpo))
+            if tela.get("pdf"):
+                paginas += len(PAGINA_PDF.findall(corpo))
+
+        resultado = {
+            "url": tela["url"](0) if callable(tela["url"]) else tela["url"],
+            "repeticoes": repeticoes,
+            "ms": {
+                "p50": round(_percentil(tempos, 50), 2),
+                "p90": round(_percentil(tempos, 90), 2),
+                "p95": round(_percentil(tempos, 95), 2),
+                "p99": round(_percentil(tempos, 99), 2),
+                "max": round(max(tempos), 2),
+                "media": round(mean(tempos), 2),
+            },
+            "consultas": {"mediana": median(consultas), "max": max(consultas)},
+            "bytes": round(mean(tamanhos)),
+        }
+        if tela.get("pdf"):
+            resultado["paginas_pdf"] = paginas
+            resultado["paginas_por_segundo"] = round(paginas / (sum(tempos) / 1000), 2)
+        return resultado
+
+    def _mostrar(self, nome, resultado):
+        if "erro" in resultado:
+            self.stdout.write(self.style.ERROR(f"✘ {nome}: {resultado['erro']} ({resultado['url']})"))
+            return
+        ms = resultado["ms"]
+        linha = (
+            f"{nome:<38} p50 {ms['p50']:>8.1f} ms   p95 {ms['p95']:>8.1f} ms   "
+            f"{resultado['consultas']['mediana']:>4} consultas"
+        )
+        if "paginas_por_segundo" in resultado:
+            linha += f"   {resultado['paginas_por_segundo']} pág/s"
+        self.stdout.write(linha)
+
+    def _comparar(self, arquivo, resultados):
+        with open(arquivo, encoding="utf-8") as entrada:
+            anterior = json.load(entrada)
+        self.stdout.write(f"\nComparação com {arquivo} (commit {anterior.get('commit')}):")
+
+        for nome, atual in resultados.items():
+            antes = anterior.get("telas", {}).get(nome)
+            if not antes or "erro" in antes or "erro" in atual:
+                continue
+            p50, p50_antes = atual["ms"]["p50"], antes["ms"]["p50"]
+            variacao = (p50 - p50_antes) / p50_antes * 100 if p50_antes else 0
+            estilo = (self.style.ERROR if variacao > 10
+                      else self.style.SUCCESS if variacao < -10 else str)
+            self.stdout.write(estilo(
+                f"{nome:<38} p50 {p50_antes:>8.1f} → {p50:>8.1f} ms ({variacao:+.0f}%)   "
+                f"consultas {antes['consultas']['mediana']} → {atual['consultas']['mediana']}"
+            ))
+
+    def _commit(self):
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+
+def _percentil(valores, p):
+    """Percentil pelo método do posto mais próximo (sem interpolação)."""
+    ordenados = sorted(valores)
+    posicao = max(0, math.ceil(p / 100 * len(ordenados)) - 1)
+    return ordenados[posicao]
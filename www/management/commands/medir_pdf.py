@@ -0,0 +1,107 @@
+import tempfile
+import time
+from pathlib import Path
+from statistics import mean, median
+
+from django.core.management.base import BaseCommand, CommandError
+from django.template.loader import render_to_string
+from django.test.utils import override_settings
+from weasyprint import HTML
+
+from www.models import Tramitacao
+from www.motor_pdf import escrever_pdf
+
+TEMPLATE = "www/tramitacoes/tramitacao_pdf.html"
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara o tempo por PDF do WeasyPrint 'cru' (HTML(...).write_pdf() a "
+        "cada documento) com o motor aquecido de www/motor_pdf.py, no parecer "
+        "de uma tramitação com imagens no texto."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeticoes", type=int, default=20)
+        parser.add_argument(
+            "--tramitacao", type=int,
+            help="Tramitação do parecer (padrão: a de maior texto).",
+        )
+        parser.add_argument(
+            "--imagens", type=int, default=3,
+            help="Imagens acrescentadas ao texto do parecer, servidas de /media/ (padrão: 3).",
+        )
+
+    def handle(self, *args, **options):
+        tramitacao = self._tramitacao(options["tramitacao"])
+        repeticoes = max(1, options["repeticoes"])
+
+        with tempfile.TemporaryDirectory() as midia, override_settings(MEDIA_ROOT=midia):
+            nomes = self._criar_imagens(Path(midia), options["imagens"])
+            tramitacao.texto += "".join(
+                f'<figure class="image"><img src="/media/{nome}"></figure>' for nome in nomes
+            )
+            html = render_to_string(TEMPLATE, {"tramitacao": tramitacao})
+
+            # O WeasyPrint cru não resolve "/media/": recebe o caminho file:// direto
+            html_cru = html.replace('src="/media/', f'src="{Path(midia).as_uri()}/')
+
+            self.stdout.write(
+                f"Parecer da tramitação {tramitacao.pk}: {len(html) / 1024:.0f} KB de HTML, "
+                f"{len(nomes)} imagem(ns), {repeticoes} repetições."
+            )
+            cru = self._medir(lambda: HTML(string=html_cru).write_pdf(), repeticoes)
+
+            inicio = time.perf_counter()
+            escrever_pdf(html)  # o primeiro PDF monta o contexto da thread
+            primeiro = (time.perf_counter() - inicio) * 1000
+            aquecido = self._medir(lambda: escrever_pdf(html), repeticoes)
+
+        self._mostrar("cru", cru)
+        self._mostrar("aquecido", aquecido)
+        self.stdout.write(f"  (primeiro PDF do motor, montando o contexto: {primeiro:.0f} ms)")
+        self.stdout.write(self.style.SUCCESS(
+            f"Ganho por PDF (mediana): {median(cru) / median(aquecido):.1f}x"
+        ))
+
+    # -----------------------------------------------------------------
+
+    def _tramitacao(self, pk):
+        tramitacoes = Tramitacao.objects.select_related(
+            "proposicao__tipo", "comissao", "relator"
+        ).prefetch_related("pareceres_vencidos__relator")
+        if pk:
+            tramitacao = tramitacoes.filter(pk=pk).first()
+        else:
+            tramitacao = tramitacoes.filter(texto_tamanho__gt=0).order_by("-texto_tamanho").first()
+        if tramitacao is None:
+            raise CommandError(
+                "Nenhuma tramitação com texto. Gere uma massa de teste antes: "
+                "python manage.py gerar_dados_sinteticos"
+            )
+        return tramitacao
+
+    def _criar_imagens(self, diretorio, quantidade):
+        from PIL import Image  # dependência do WeasyPrint
+
+        nomes = []
+        for i in range(quantidade):
+            nome = f"medir_pdf_{i}.jpg"
+            Image.effect_noise((1600, 1200), 64 + i).convert("RGB").save(diretorio / nome, quality=90)
+            nomes.append(nome)
+        return nomes
+
+    def _medir(self, gerar, repeticoes):
+        tempos = []
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            gerar()
+            tempos.append((time.perf_counter() - inicio) * 1000)
+        return sorted(tempos)
+
+    def _mostrar(self, nome, tempos):
+        p95 = tempos[min(len(tempos) - 1, int(len(tempos) * 0.95))]
+        self.stdout.write(
+            f"  {nome:<9} média {mean(tempos):7.0f} ms   p50 {median(tempos):7.0f} ms   "
+            f"p95 {p95:7.0f} ms"
+        )
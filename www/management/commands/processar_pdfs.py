@@ -0,0 +1,254 @@
+import multiprocessing
+import os
+import tempfile
+import time
+from datetime import timedelta
+from multiprocessing.connection import wait
+
+from django.core.files import File
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.utils.timezone import now
+
+from www.models import TarefaPDF
+from www.pdf import gerar_pdf_em_arquivo, guardar_em_cache
+
+
+def _trabalhar(conexao):
+    """
+    Laço do processo de trabalho: recebe (html, caminho) pela conexão,
+    grava o PDF e responde (ok, mensagem). None encerra. O processo vive
+    entre uma tarefa e outra, e o motor do WeasyPrint (www/motor_pdf.py)
+    continua aquecido: fontes, folhas de estilo e imagens já carregadas.
+    """
+    while True:
+        try:
+            pedido = conexao.recv()
+        except EOFError:
+            return
+        if pedido is None:
+            return
+        html, caminho = pedido
+        try:
+            gerar_pdf_em_arquivo(html, caminho)
+        except Exception as erro:
+            conexao.send((False, f"{type(erro).__name__}: {erro}"))
+        else:
+            conexao.send((True, ""))
+
+
+class Trabalhador:
+    """Um processo de trabalho e a tarefa que ele está gerando (se alguma)."""
+
+    def __init__(self):
+        self.conexao, lado_filho = multiprocessing.Pipe()
+        # O processo filho não usa o banco; fecha as conexões para não herdá-las
+        connections.close_all()
+        self.processo = multiprocessing.Process(
+            target=_trabalhar, args=(lado_filho,), daemon=True
+        )
+        self.processo.start()
+        lado_filho.close()
+        self.tarefa = None      # pk da tarefa em andamento
+        self.inicio = None
+        self.caminho = None
+
+    def enviar(self, tarefa):
+        descritor, self.caminho = tempfile.mkstemp(suffix=".pdf")
+        os.close(descritor)
+        self.conexao.send((tarefa.html, self.caminho))
+        self.tarefa = tarefa.pk
+        self.inicio = time.monotonic()
+
+    def resultado(self):
+        """(ok, mensagem) se a tarefa terminou; None se ainda está gerando."""
+        if not self.conexao.poll():
+            return None
+        try:
+            return self.conexao.recv()
+        except EOFError:
+            # Processo morreu no meio do PDF (sem memória, segfault...)
+            self.processo.join()
+            return False, f"Falha na geração (código {self.processo.exitcode})."
+
+    def liberar(self):
+        if self.caminho and os.path.exists(self.caminho):
+            os.remove(self.caminho)
+        self.tarefa = self.inicio = self.caminho = None
+
+    def matar(self):
+        self.processo.terminate()
+        self.processo.join()
+        self.conexao.close()
+        self.liberar()
+
+    def encerrar(self):
+        try:
+            self.conexao.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.processo.join(5)
+        if self.processo.is_alive():
+            self.processo.terminate()
+            self.processo.join()
+        self.conexao.close()
+
+
+class Command(BaseCommand):
+    help = (
+        "Processa a fila de PDFs (TarefaPDF) com um conjunto fixo de processos "
+        "de trabalho, que ficam vivos entre as tarefas; cada tarefa tem tempo "
+        "limite próprio."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processos", type=int, default=os.cpu_count() or 2,
+            help="Quantidade de PDFs gerados em paralelo (padrão: nº de CPUs).",
+        )
+        parser.add_argument(
+            "--timeout", type=int, default=120,
+            help="Tempo limite de cada PDF, em segundos (padrão: 120).",
+        )
+        parser.add_argument(
+            "--intervalo", type=float, default=1.0,
+            help="Espera entre consultas à fila vazia, em segundos (padrão: 1).",
+        )
+        parser.add_argument(
+            "--manter-dias", type=int, default=7,
+            help="Remove tarefas finalizadas há mais dias que isso (padrão: 7).",
+        )
+        parser.add_argument(
+            "--uma-vez", action="store_true",
+            help="Processa o que estiver na fila e termina.",
+        )
+
+    def handle(self, *args, **options):
+        self.processos = max(1, options["processos"])
+        self.timeout = options["timeout"]
+
+        self._recuperar_abandonadas()
+        self._limpar_antigas(options["manter_dias"])
+
+        self.stdout.write(
+            f"Processando PDFs com {self.processos} processo(s), "
+            f"timeout de {self.timeout}s."
+        )
+
+        self.trabalhadores = [Trabalhador() for _ in range(self.processos)]
+        try:
+            while True:
+                self._recolher()
+
+                livres = [t for t in self.trabalhadores if t.tarefa is None]
+                novas = self._reservar(len(livres)) if livres else []
+                for trabalhador, tarefa in zip(livres, novas):
+                    trabalhador.enviar(tarefa)
+
+                ocupados = len(self.trabalhadores) - len(livres) + len(novas)
+                if options["uma_vez"] and not ocupados:
+                    break
+                if not novas:
+                    self._esperar(options["intervalo"])
+        except KeyboardInterrupt:
+            em_andamento = [t.tarefa for t in self.trabalhadores if t.tarefa is not None]
+            for trabalhador in self.trabalhadores:
+                trabalhador.matar()
+            TarefaPDF.objects.filter(pk__in=em_andamento).update(
+                status=TarefaPDF.PENDENTE, iniciada_em=None
+            )
+        else:
+            for trabalhador in self.trabalhadores:
+                trabalhador.encerrar()
+
+    # -----------------------------------------------------------------
+
+    def _reservar(self, limite):
+        """Marca até 'limite' tarefas pendentes como nossas (seguro com vários workers)."""
+        reservadas = []
+        pendentes = (
+            TarefaPDF.objects
+            .filter(status=TarefaPDF.PENDENTE)
+            .order_by("criada_em")
+            .values_list("pk", flat=True)[:limite]
+        )
+        for pk in list(pendentes):
+            if TarefaPDF.objects.filter(pk=pk, status=TarefaPDF.PENDENTE).update(
+                status=TarefaPDF.PROCESSANDO, iniciada_em=now()
+            ):
+                reservadas.append(TarefaPDF.objects.get(pk=pk))
+        return reservadas
+
+    def _esperar(self, intervalo):
+        """Dorme até algum PDF terminar, ou por 'intervalo' segundos."""
+        conexoes = [t.conexao for t in self.trabalhadores if t.tarefa is not None]
+        if conexoes:
+            wait(conexoes, timeout=intervalo)
+        else:
+            time.sleep(intervalo)
+
+    def _recolher(self):
+        """
+        Finaliza as tarefas que terminaram ou estouraram o tempo. Processo
+        que estourou o tempo ou morreu é trocado por um novo (frio).
+        """
+        for i, trabalhador in enumerate(self.trabalhadores):
+            if trabalhador.tarefa is None:
+                continue
+            pk = trabalhador.tarefa
+
+            resultado = trabalhador.resultado()
+            if resultado is not None:
+                ok, mensagem = resultado
+                if ok:
+                    self._concluir(pk, trabalhador.caminho)
+                else:
+                    self._falhar(pk, mensagem)
+                trabalhador.liberar()
+            elif time.monotonic() - trabalhador.inicio > self.timeout:
+                trabalhador.matar()
+                self._falhar(pk, f"Tempo limite de {self.timeout}s excedido.")
+            else:
+                continue
+
+            if not trabalhador.processo.is_alive():
+                trabalhador.matar()
+                self.trabalhadores[i] = Trabalhador()
+
+    def _concluir(self, pk, caminho):
+        tarefa = TarefaPDF.objects.get(pk=pk)
+        with open(caminho, "rb") as arquivo:
+            tarefa.arquivo.save(tarefa.nome_arquivo, File(arquivo), save=False)
+        if tarefa.chave_cache:
+            # Próximos pedidos do mesmo PDF saem do cache em disco
+            with open(caminho, "rb") as arquivo:
+                guardar_em_cache(tarefa.chave_cache, arquivo.read())
+        tarefa.status = TarefaPDF.CONCLUIDA
+        tarefa.concluida_em = now()
+        tarefa.html = ""  # não precisamos mais guardar o HTML
+        tarefa.save(update_fields=["arquivo", "status", "concluida_em", "html"])
+        self.stdout.write(f"✔ {tarefa.nome_arquivo}")
+
+    def _falhar(self, pk, mensagem):
+        TarefaPDF.objects.filter(pk=pk).update(
+            status=TarefaPDF.ERRO, erro=mensagem, concluida_em=now()
+        )
+        self.stderr.write(f"✘ tarefa {pk}: {mensagem}")
+
+    def _recuperar_abandonadas(self):
+        """Devolve à fila tarefas presas em PROCESSANDO (worker derrubado)."""
+        limite = now() - timedelta(seconds=self.timeout * 2)
+        TarefaPDF.objects.filter(
+            status=TarefaPDF.PROCESSANDO, iniciada_em__lt=limite
+        ).update(status=TarefaPDF.PENDENTE, iniciada_em=None)
+
+    def _limpar_antigas(self, dias):
+        limite = now() - timedelta(days=dias)
+        antigas = TarefaPDF.objects.filter(
+            status__in=[TarefaPDF.CONCLUIDA, TarefaPDF.ERRO],
+            concluida_em__lt=limite,
+        )
+        for tarefa in antigas:
+            if tarefa.arquivo:
+                tarefa.arquivo.delete(save=False)
+            tarefa.delete()
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from www.models import Proposicao, recalcular_estado_proposicoes
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstrói o estado derivado das proposições "
+        "(tramitação, comissão e relator atuais, aguardando parecer)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "numeros",
+            nargs="*",
+            help="Números das proposições (padrão: todas).",
+        )
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        numeros = options["numeros"] or None
+        recalcular_estado_proposicoes(numeros)
+
+        qs = Proposicao.objects.all()
+        if numeros:
+            qs = qs.filter(pk__in=numeros)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Estado recalculado para {qs.count()} proposição(ões); "
+            f"{qs.filter(aguardando_parecer=True).count()} aguardando parecer."
+        ))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from www.busca import TABELA_FTS, fts_disponivel, reconstruir_indice
+from www.models import Proposicao
+
+
+class Command(BaseCommand):
+    help = f"Reconstrói o índice full-text das proposições ({TABELA_FTS})."
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        if not fts_disponivel():
+            raise CommandError("O índice full-text só existe no banco SQLite.")
+
+        reconstruir_indice()
+        self.stdout.write(self.style.SUCCESS(
+            f"Índice reconstruído com {Proposicao.objects.count()} proposição(ões)."
+        ))
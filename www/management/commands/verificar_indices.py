@@ -0,0 +1,179 @@
+import re
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count, F, Q
+
+from www.models import Comissao, Proposicao, Reuniao, Tramitacao
+
+
+class Command(BaseCommand):
+    help = (
+        "Mostra o EXPLAIN QUERY PLAN (e o tempo) das consultas mais usadas "
+        "pelas telas e aponta as que varrem a tabela inteira ou ordenam "
+        "num B-tree temporário, em vez de usar um índice."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--repeticoes", type=int, default=5,
+            help="Execuções de cada consulta; vale o melhor tempo (padrão: 5).",
+        )
+        parser.add_argument(
+            "--estrito", action="store_true",
+            help="Termina com erro se alguma consulta não usar índice.",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("A verificação dos planos foi escrita para o SQLite.")
+
+        amostra = self._amostra()
+        if amostra is None:
+            raise CommandError("Banco sem tramitações: não há o que medir.")
+
+        problemas = 0
+        for nome, qs, plano_aceito in self._consultas(*amostra):
+            plano = qs.explain()
+            tempo = self._medir(qs, options["repeticoes"])
+            alertas = [] if plano_aceito else self._alertas(plano)
+            problemas += bool(alertas)
+
+            estilo = self.style.WARNING if alertas else self.style.SUCCESS
+            self.stdout.write(estilo(f"{'✘' if alertas else '✔'} {nome}  ({tempo:.1f} ms)"))
+            for linha in plano.splitlines():
+                self.stdout.write(f"      {linha}")
+            for alerta in alertas:
+                self.stdout.write(self.style.WARNING(f"      ⚠ {alerta}"))
+
+        if problemas and options["estrito"]:
+            raise CommandError(f"{problemas} consulta(s) sem índice adequado.")
+        self.stdout.write(f"{problemas} consulta(s) com alerta.")
+
+    # -----------------------------------------------------------------
+
+    def _amostra(self):
+        """Valores reais do banco para montar as consultas."""
+        tramitacao = (
+            Tramitacao.objects.order_by("-pk")
+            .values("proposicao_id", "comissao_id", "data_entrada")
+            .first()
+        )
+        if tramitacao is None:
+            return None
+        proposicao = Proposicao.objects.get(pk=tramitacao["proposicao_id"])
+        comissao = Comissao.objects.get(pk=tramitacao["comissao_id"])
+        return proposicao, comissao, tramitacao["data_entrada"].year
+
+    def _consultas(self, proposicao, comissao, ano):
+        """
+        (nome, queryset, plano aceito). Os querysets repetem os das telas;
+        'plano aceito' marca as que varrem/ordenam de propósito (agregação
+        sobre todas as linhas, ordenação de poucas linhas por outra tabela).
+        """
+        meio = proposicao.data_publicacao
+
+        # 🔹 Estado derivado: a "última tramitação" (signals da Tramitacao)
+        yield "Última tramitação da proposição", (
+            Tramitacao.objects
+            .filter(proposicao=proposicao)
+            .order_by("-data_entrada", "-pk")
+            .values("pk")[:1]
+        ), False
+
+        yield "Tramitações da proposição (TramitacaoListView)", (
+            Tramitacao.objects
+            .filter(proposicao=proposicao)
+            .order_by("data_entrada")
+        ), False
+
+        # 🔹 Listagem de proposições (paginação por chave em numero)
+        yield "Proposições do tipo, página por chave (ProposicaoListView)", (
+            Proposicao.objects
+            .filter(tipo_id=proposicao.tipo_id, numero__gt=proposicao.numero)
+            .order_by("numero")[:21]
+        ), False
+
+        yield "Proposições da comissão, página por chave (ProposicaoListView)", (
+            Proposicao.objects
+            .filter(tipo_id=proposicao.tipo_id, numero__gt=proposicao.numero)
+            .filter(Q(comissao_atual=comissao) | Q(tramitacao_atual__isnull=True))
+            .order_by("numero")[:21]
+        ), False
+
+        # 🔹 Painel de tramitações (-data_publicacao, -numero)
+        yield "Painel, página por chave (TramitacoesPainelView)", (
+            Proposicao.objects
+            .filter(tramitacao_atual__isnull=False)
+            .filter(
+                Q(data_publicacao__lt=meio)
+                | Q(data_publicacao=meio, numero__lt=proposicao.numero)
+            )
+            .order_by("-data_publicacao", "-numero")[:26]
+        ), False
+
+        yield "Painel filtrado pela comissão (TramitacoesPainelView)", (
+            Proposicao.objects
+            .filter(tramitacao_atual__isnull=False)
+            .filter(numero__in=Tramitacao.objects.filter(comissao=comissao)
+                    .values("proposicao_id"))
+            .order_by("-data_publicacao", "-numero")[:26]
+        ), False
+
+        # 🔹 Reuniões (listagem, combos do painel e relatório de pendências)
+        yield "Reuniões da comissão no ano (ReuniaoListView)", (
+            Reuniao.objects
+            .filter(comissao=comissao, data__year=ano)
+            .order_by("-data", "-hora")[:10]
+        ), False
+
+        yield "Reuniões de todas as comissões (ReuniaoListView)", (
+            Reuniao.objects
+            .order_by("-data", "-hora")[:10]
+        ), False
+
+        # ordem pela sigla da comissão: sempre ordena, mas só as reuniões do ano
+        yield "Reuniões do ano (pendências / combo do painel)", (
+            Reuniao.objects
+            .filter(data__year=ano)
+            .select_related("comissao")
+            .order_by("comissao__sigla", "data")
+        ), True
+
+        # 🔹 Relatório de situação: últimas tramitações da comissão
+        yield "Situação da comissão (RelatorioSituacaoComissaoView)", (
+            Tramitacao.objects
+            .filter(comissao=comissao, proposicao__tramitacao_atual=F("pk"))
+            .select_related("proposicao", "proposicao__tipo", "relator", "reuniao")
+            .order_by("data_entrada")
+        ), False
+
+        # 🔹 Indicadores do dashboard (agregam todas as linhas)
+        yield "Entradas no período por comissão (indicadores)", (
+            Tramitacao.objects.order_by()
+            .filter(data_entrada__gte=meio)
+            .values("comissao")
+            .annotate(n=Count("pk"))
+        ), True
+
+    def _medir(self, qs, repeticoes):
+        melhor = None
+        for _ in range(max(1, repeticoes)):
+            inicio = time.perf_counter()
+            list(qs.all())
+            decorrido = (time.perf_counter() - inicio) * 1000
+            melhor = decorrido if melhor is None else min(melhor, decorrido)
+        return melhor
+
+    def _alertas(self, plano):
+        alertas = []
+        for linha in plano.splitlines():
+            # linhas do SQLite: "<id> <pai> <não usado> <detalhe>"
+            detalhe = re.sub(r"^[\s\d]+", "", linha)
+            # SCAN sem índice = tabela inteira (SCAN ... USING INDEX percorre o índice)
+            if detalhe.startswith("SCAN ") and " USING " not in detalhe:
+                alertas.append(f"varre a tabela inteira: {detalhe}")
+            elif "TEMP B-TREE" in detalhe:
+                alertas.append(f"ordena fora do índice: {detalhe}")
+        return alertas
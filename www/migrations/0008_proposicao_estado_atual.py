@@ -0,0 +1,61 @@
+# Generated by Django 6.0 on 2026-10-18 09:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Q, Subquery
+
+
+def preencher_estado_atual(apps, schema_editor):
+    Proposicao = apps.get_model("www", "Proposicao")
+    Tramitacao = apps.get_model("www", "Tramitacao")
+
+    ultima = (
+        Tramitacao.objects
+        .filter(proposicao=OuterRef("pk"))
+        .order_by("-data_entrada", "-pk")
+    )
+    Proposicao.objects.update(
+        tramitacao_atual=Subquery(ultima.values("pk")[:1]),
+        comissao_atual=Subquery(ultima.values("comissao")[:1]),
+        relator_atual=Subquery(ultima.values("relator")[:1]),
+        data_entrada_atual=Subquery(ultima.values("data_entrada")[:1]),
+    )
+    Proposicao.objects.update(
+        aguardando_parecer=Q(tramitacao_atual__isnull=False, relator_atual__isnull=True)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('www', '0007_tramitacao_alterada_em_tramitacao_usuario_alteracao_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='proposicao',
+            name='aguardando_parecer',
+            field=models.BooleanField(db_index=True, default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='proposicao',
+            name='comissao_atual',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='proposicoes_atuais', to='www.comissao'),
+        ),
+        migrations.AddField(
+            model_name='proposicao',
+            name='data_entrada_atual',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='proposicao',
+            name='relator_atual',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='www.autor'),
+        ),
+        migrations.AddField(
+            model_name='proposicao',
+            name='tramitacao_atual',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='www.tramitacao'),
+        ),
+        migrations.RunPython(preencher_estado_atual, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 6.0 on 2026-10-18 10:12
+
+from django.db import migrations
+
+# Índice FTS5 das proposições (somente SQLite).
+# unicode61 + remove_diacritics: busca sem acento e sem diferenciar maiúsculas;
+# prefix: acelera as buscas por prefixo ("educa"*) feitas enquanto se digita.
+# Os triggers localizam a linha antiga via MATCH na coluna numero (usa o índice;
+# um "WHERE numero = ..." sozinho varreria a tabela FTS inteira). Não usamos o
+# rowid: a www_proposicao tem PK texto e o VACUUM pode renumerar seus rowids.
+CRIAR = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS www_proposicao_fts USING fts5(
+        numero,
+        numero_formatado,
+        ementa,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3 4'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS www_proposicao_fts_ai
+    AFTER INSERT ON www_proposicao BEGIN
+        INSERT INTO www_proposicao_fts (numero, numero_formatado, ementa)
+        VALUES (new.numero, new.numero_formatado, new.ementa);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS www_proposicao_fts_ad
+    AFTER DELETE ON www_proposicao BEGIN
+        DELETE FROM www_proposicao_fts
+        WHERE www_proposicao_fts MATCH 'numero : "' || replace(old.numero, '"', '""') || '"'
+          AND numero = old.numero;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS www_proposicao_fts_au
+    AFTER UPDATE OF numero, numero_formatado, ementa ON www_proposicao BEGIN
+        DELETE FROM www_proposicao_fts
+        WHERE www_proposicao_fts MATCH 'numero : "' || replace(old.numero, '"', '""') || '"'
+          AND numero = old.numero;
+        INSERT INTO www_proposicao_fts (numero, numero_formatado, ementa)
+        VALUES (new.numero, new.numero_formatado, new.ementa);
+    END
+    """,
+    """
+    INSERT INTO www_proposicao_fts (numero, numero_formatado, ementa)
+    SELECT numero, numero_formatado, ementa FROM www_proposicao
+    """,
+]
+
+REMOVER = [
+    "DROP TRIGGER IF EXISTS www_proposicao_fts_au",
+    "DROP TRIGGER IF EXISTS www_proposicao_fts_ad",
+    "DROP TRIGGER IF EXISTS www_proposicao_fts_ai",
+    "DROP TABLE IF EXISTS www_proposicao_fts",
+]
+
+
+def _executar(comandos):
+    def executar(apps, schema_editor):
+        if schema_editor.connection.vendor != "sqlite":
+            return
+        for sql in comandos:
+            schema_editor.execute(sql)
+    return executar
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('www', '0008_proposicao_estado_atual'),
+    ]
+
+    operations = [
+        migrations.RunPython(_executar(CRIAR), _executar(REMOVER)),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 6.0 on 2026-10-18 09:13
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('www', '0009_proposicao_fts'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TarefaPDF',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chave', models.CharField(db_index=True, max_length=64)),
+                ('html', models.TextField()),
+                ('nome_arquivo', models.CharField(max_length=200)),
+                ('status', models.CharField(choices=[('PENDENTE', 'Pendente'), ('PROCESSANDO', 'Processando'), ('CONCLUIDA', 'Concluída'), ('ERRO', 'Erro')], db_index=True, default='PENDENTE', max_length=12)),
+                ('arquivo', models.FileField(blank=True, upload_to='pdf/tarefas/')),
+                ('erro', models.TextField(blank=True)),
+                ('criada_em', models.DateTimeField(auto_now_add=True)),
+                ('iniciada_em', models.DateTimeField(blank=True, null=True)),
+                ('concluida_em', models.DateTimeField(blank=True, null=True)),
+                ('solicitada_por', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='tarefas_pdf', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Tarefa de PDF',
+                'verbose_name_plural': 'Tarefas de PDF',
+                'ordering': ['criada_em'],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status__in', ['PENDENTE', 'PROCESSANDO'])), fields=('chave',), name='unique_tarefa_pdf_em_andamento')],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 6.0 on 2026-10-18 09:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('www', '0010_tarefapdf'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='proposicao',
+            index=models.Index(fields=['tipo', 'numero'], name='proposicao_tipo_numero_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='proposicao',
+            index=models.Index(fields=['data_publicacao', 'numero'], name='proposicao_publicacao_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reuniao',
+            index=models.Index(fields=['comissao', 'data', 'hora'], name='reuniao_comissao_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reuniao',
+            index=models.Index(fields=['data', 'hora'], name='reuniao_data_hora_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tramitacao',
+            index=models.Index(fields=['proposicao', 'data_entrada'], name='tramitacao_prop_entrada_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tramitacao',
+            index=models.Index(fields=['comissao', 'data_entrada'], name='tramitacao_com_entrada_idx'),
+        ),
+    ]
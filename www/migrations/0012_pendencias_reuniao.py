@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-18 10:07
+
+import django.db.models.expressions
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('www', '0011_indices_consultas'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reuniao',
+            name='pendencias',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.Value(0), '+', models.Case(models.When(tem_edital_assinado=True, then=models.Value(0)), default=models.Value(1))), '+', models.Case(models.When(tem_presenca_assinada=True, then=models.Value(0)), default=models.Value(2))), '+', models.Case(models.When(tem_ata_assinada=True, then=models.Value(0)), default=models.Value(4))), '+', models.Case(models.When(tem_parecer_assinado=True, then=models.Value(0)), default=models.Value(8))), '+', models.Case(models.When(tem_deliberacao_assinada=True, then=models.Value(0)), default=models.Value(16))), '+', models.Case(models.When(tem_conclusao_assinada=True, then=models.Value(0)), default=models.Value(32))), output_field=models.PositiveSmallIntegerField(), verbose_name='Pendências'),
+        ),
+        migrations.AddIndex(
+            model_name='reuniao',
+            index=models.Index(condition=models.Q(('pendencias__gt', 0)), fields=['data', 'comissao'], name='reuniao_pendente_idx'),
+        ),
+    ]
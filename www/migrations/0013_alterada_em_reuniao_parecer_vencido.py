@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-18 10:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('www', '0012_pendencias_reuniao'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='parecervencido',
+            name='alterada_em',
+            field=models.DateTimeField(auto_now=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='reuniao',
+            name='alterada_em',
+            field=models.DateTimeField(auto_now=True, null=True),
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 6.0 on 2026-10-18 10:21
+
+import re
+from html import unescape
+
+from django.db import migrations, models
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+LOTE = 2000
+
+# Cópia de www.models.resumir_texto na data desta migração: a migração não
+# pode mudar de comportamento se a função do model mudar depois
+TAMANHO_RESUMO_TEXTO = 300
+_FIM_DE_BLOCO = re.compile(r"</?(?:p|div|li|h[1-6]|td|th|blockquote|br)\b", re.IGNORECASE)
+
+
+def resumir_texto(html):
+    """(nº de caracteres do texto sem HTML, começo do texto sem HTML)."""
+    html = _FIM_DE_BLOCO.sub(r" \g<0>", html or "")
+    texto = " ".join(unescape(strip_tags(html)).split())
+    return len(texto), Truncator(texto).chars(TAMANHO_RESUMO_TEXTO)
+
+
+def preencher_resumos(apps, schema_editor):
+    # executemany em vez de bulk_update: o CASE de um bulk_update grande é
+    # lento no SQLite, e as tabelas podem ter centenas de milhares de linhas
+    for nome in ("Tramitacao", "ParecerVencido"):
+        model = apps.get_model("www", nome)
+        sql = (
+            f"UPDATE {model._meta.db_table} SET texto_tamanho = %s, texto_resumo = %s "
+            f"WHERE {model._meta.pk.column} = %s"
+        )
+        textos = model.objects.values_list("pk", "texto").order_by("pk")
+        ultimo = 0
+        while True:
+            lote = list(textos.filter(pk__gt=ultimo)[:LOTE])
+            if not lote:
+                break
+            with schema_editor.connection.cursor() as cursor:
+                cursor.executemany(sql, [(*resumir_texto(texto), pk) for pk, texto in lote])
+            ultimo = lote[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('www', '0013_alterada_em_reuniao_parecer_vencido'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='parecervencido',
+            name='texto_resumo',
+            field=models.CharField(editable=False, max_length=300, null=True),
+        ),
+        migrations.AddField(
+            model_name='parecervencido',
+            name='texto_tamanho',
+            field=models.PositiveIntegerField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='tramitacao',
+            name='texto_resumo',
+            field=models.CharField(editable=False, max_length=300, null=True),
+        ),
+        migrations.AddField(
+            model_name='tramitacao',
+            name='texto_tamanho',
+            field=models.PositiveIntegerField(editable=False, null=True),
+        ),
+        migrations.RunPython(preencher_resumos, migrations.RunPython.noop),
+    ]
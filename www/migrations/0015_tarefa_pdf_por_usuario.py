@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-18 10:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('www', '0014_resumo_textos'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='tarefapdf',
+            name='unique_tarefa_pdf_em_andamento',
+        ),
+        migrations.AddConstraint(
+            model_name='tarefapdf',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['PENDENTE', 'PROCESSANDO'])), fields=('chave', 'solicitada_por'), name='unique_tarefa_pdf_em_andamento'),
+        ),
+    ]
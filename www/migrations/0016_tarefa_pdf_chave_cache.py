@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-18 10:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('www', '0015_tarefa_pdf_por_usuario'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tarefapdf',
+            name='chave_cache',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+    ]
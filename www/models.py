@@ -1,10 +1,15 @@
+import re
+from html import unescape
 from pickle import TRUE
 
 from django.db import models
+from django.db.models import OuterRef, Q, Subquery
 from django.conf import settings
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
 from django_ckeditor_5.fields import CKEditor5Field
 #-- cria o perfil do usuário
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 from minhas_libs import math_utils
@@ -117,6 +122,38 @@ class Proposicao(models.Model):
     autores = models.ManyToManyField(Autor, related_name="proposicoes_autoria")
     link_proposicao = models.CharField(max_length=400, blank=True, null=True)
 
+    # =========================
+    # 🔹 ESTADO DERIVADO (desnormalizado a partir da ÚLTIMA tramitação)
+    # Mantido pelos signals da Tramitacao; para reconstruir:
+    #   python manage.py recalcular_estado_proposicoes
+    # =========================
+    tramitacao_atual = models.ForeignKey(
+        "Tramitacao",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="+",
+    )
+    comissao_atual = models.ForeignKey(
+        Comissao,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="proposicoes_atuais",
+    )
+    relator_atual = models.ForeignKey(
+        Autor,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="+",
+    )
+    data_entrada_atual = models.DateField(null=True, blank=True, editable=False)
+    aguardando_parecer = models.BooleanField(default=False, editable=False, db_index=True)
+
     class Meta:
         constraints = [
             models.UniqueConstraint(
@@ -124,26 +161,44 @@ class Proposicao(models.Model):
                 name="unique_numero_formatado_por_tipo"
             )
         ]
+        indexes = [
+            # Listagem: filtro por tipo + ordem/chave por numero
+            models.Index(fields=["tipo", "numero"], name="proposicao_tipo_numero_idx"),
+            # Painel de tramitações: ordem/chave (-data_publicacao, -numero)
+            models.Index(fields=["data_publicacao", "numero"], name="proposicao_publicacao_idx"),
+        ]
 
     def __str__(self):
         return f"{self.tipo} {self.numero_formatado}"
 
-    # =========================
-    # 🔹 ESTADO DERIVADO
-    # =========================
 
-    @property
-    def comissao_atual(self):
-        ultima = self.tramitacoes.order_by("-data_entrada").first()
-        return ultima.comissao if ultima else None
+#########################################################################################
 
-    @property
-    def relator_atual(self):
-        ultima = self.tramitacoes.order_by("-data_entrada").first()
-        return ultima.relator_atual if ultima else None
+# 🔹 Documentos da reunião que precisam estar assinados: (campo, rótulo, bit)
+DOCUMENTOS_REUNIAO = [
+    ("tem_edital_assinado", "Edital assinado", 1),
+    ("tem_presenca_assinada", "Presença assinada", 2),
+    ("tem_ata_assinada", "Ata assinada", 4),
+    ("tem_parecer_assinado", "Parecer assinado", 8),
+    ("tem_deliberacao_assinada", "Deliberação assinada", 16),
+    ("tem_conclusao_assinada", "Conclusão assinada", 32),
+]
+
+
+def _expressao_pendencias():
+    """
+    Soma dos bits dos documentos não marcados como assinados (False ou
+    vazio). 0 = reunião sem pendências.
+    """
+    soma = models.Value(0)
+    for campo, _, bit in DOCUMENTOS_REUNIAO:
+        soma = soma + models.Case(
+            models.When(**{campo: True}, then=models.Value(0)),
+            default=models.Value(bit),
+        )
+    return soma
 
 
-#########################################################################################
 class Reuniao(models.Model):
 
     TIPO_CHOICES = [
@@ -187,6 +242,16 @@ class Reuniao(models.Model):
     tem_conclusao = models.BooleanField(null=True, blank=True, verbose_name="Tem Conclusão")
     tem_conclusao_assinada = models.BooleanField(null=True, blank=True, verbose_name="Conclusão Assinada")
 
+    alterada_em = models.DateTimeField(auto_now=True, null=True)
+
+    # 🔹 Máscara das pendências (bits de DOCUMENTOS_REUNIAO), calculada pelo banco
+    pendencias = models.GeneratedField(
+        expression=_expressao_pendencias(),
+        output_field=models.PositiveSmallIntegerField(),
+        db_persist=True,
+        verbose_name="Pendências",
+    )
+
     @property
     def ano(self):
         """Ano da reunião, derivado da própria data."""
@@ -207,12 +272,54 @@ class Reuniao(models.Model):
             f"({self.comissao.sigla} {self.data.strftime('%d/%m/%Y')})"
         )
 
+    class Meta:
+        indexes = [
+            # Listagem por comissão + ano, em ordem (-data, -hora)
+            models.Index(fields=["comissao", "data", "hora"], name="reuniao_comissao_data_idx"),
+            # Todas as comissões: ano e ordem só pela data
+            models.Index(fields=["data", "hora"], name="reuniao_data_hora_idx"),
+            # Relatório de pendências: só as reuniões com algum documento pendente
+            models.Index(
+                fields=["data", "comissao"],
+                condition=Q(pendencias__gt=0),
+                name="reuniao_pendente_idx",
+            ),
+        ]
+
+    @property
+    def rotulos_pendencias(self):
+        """Rótulos dos documentos pendentes, na ordem de DOCUMENTOS_REUNIAO."""
+        return [rotulo for _, rotulo, bit in DOCUMENTOS_REUNIAO if self.pendencias & bit]
+
     def __str__(self):
         return self.descricao
 
 #########################################################################################
 
-class Tramitacao(models.Model):
+# 🔹 Prévia dos textos do CKEditor (parecer e votos vencidos): as listagens
+# mostram o resumo e o tamanho, sem carregar o HTML inteiro (defer("texto"))
+TAMANHO_RESUMO_TEXTO = 300
+# Fim de bloco vira espaço: "<p>a</p><p>b</p>" -> "a b", não "ab"
+_FIM_DE_BLOCO = re.compile(r"</?(?:p|div|li|h[1-6]|td|th|blockquote|br)\b", re.IGNORECASE)
+
+
+def resumir_texto(html):
+    """(nº de caracteres do texto sem HTML, começo do texto sem HTML)."""
+    html = _FIM_DE_BLOCO.sub(r" \g<0>", html or "")
+    texto = " ".join(unescape(strip_tags(html)).split())
+    return len(texto), Truncator(texto).chars(TAMANHO_RESUMO_TEXTO)
+
+
+class ResumoTextoMixin:
+    """Mantém texto_tamanho/texto_resumo em dia com o texto, a cada save()."""
+
+    def atualizar_resumo(self):
+        # Objeto lido com defer("texto"): o texto não mudou, nada a refazer
+        if "texto" not in self.get_deferred_fields():
+            self.texto_tamanho, self.texto_resumo = resumir_texto(self.texto)
+
+
+class Tramitacao(ResumoTextoMixin, models.Model):
     proposicao = models.ForeignKey(Proposicao, on_delete=models.CASCADE, related_name="tramitacoes")
     comissao = models.ForeignKey(Comissao, on_delete=models.PROTECT)
     data_entrada = models.DateField()
@@ -239,6 +346,8 @@ class Tramitacao(models.Model):
     )
     parecer = models.CharField(max_length=200, blank=True)
     texto = CKEditor5Field(blank=True)
+    texto_tamanho = models.PositiveIntegerField(null=True, editable=False)
+    texto_resumo = models.CharField(max_length=TAMANHO_RESUMO_TEXTO, null=True, editable=False)
 
     # 🔹 Indica que a proposição terá parecer(es) em separado (vencido),
     # pois algum membro pediu vista do processo.
@@ -272,6 +381,12 @@ class Tramitacao(models.Model):
 
     class Meta:
         ordering = ["data_entrada"]
+        indexes = [
+            # "Última tramitação" (-data_entrada, -pk) e histórico da proposição
+            models.Index(fields=["proposicao", "data_entrada"], name="tramitacao_prop_entrada_idx"),
+            # Relatórios e indicadores por comissão, por data de entrada
+            models.Index(fields=["comissao", "data_entrada"], name="tramitacao_com_entrada_idx"),
+        ]
 
     def __str__(self):
         return (
@@ -290,13 +405,14 @@ class Tramitacao(models.Model):
     def save(self, *args, **kwargs):
         if self.parecer:
             self.parecer = self.parecer.upper()
+        self.atualizar_resumo()
 
         super().save(*args, **kwargs)
 
 
 #########################################################################################
 
-class ParecerVencido(models.Model):
+class ParecerVencido(ResumoTextoMixin, models.Model):
     tramitacao = models.ForeignKey(
         Tramitacao,
         on_delete=models.CASCADE,
@@ -309,7 +425,10 @@ class ParecerVencido(models.Model):
     relator = models.ForeignKey(Autor, on_delete=models.PROTECT)
     parecer = models.CharField(max_length=200)
     texto = CKEditor5Field()
+    texto_tamanho = models.PositiveIntegerField(null=True, editable=False)
+    texto_resumo = models.CharField(max_length=TAMANHO_RESUMO_TEXTO, null=True, editable=False)
     data_apresentacao = models.DateField()
+    alterada_em = models.DateTimeField(auto_now=True, null=True)
 
     class Meta:
         verbose_name = "Parecer Vencido"
@@ -322,8 +441,105 @@ class ParecerVencido(models.Model):
     def save(self, *args, **kwargs):
         if self.parecer:
             self.parecer = self.parecer.upper()
+        self.atualizar_resumo()
         super().save(*args, **kwargs)
 
 
 #########################################################################################
 
+class TarefaPDF(models.Model):
+    """
+    PDF a gerar em segundo plano (fila no banco, processada pelo comando
+    processar_pdfs). O HTML já vem renderizado da requisição; só o WeasyPrint
+    roda fora do servidor web.
+    """
+
+    PENDENTE = "PENDENTE"
+    PROCESSANDO = "PROCESSANDO"
+    CONCLUIDA = "CONCLUIDA"
+    ERRO = "ERRO"
+    STATUS_CHOICES = [
+        (PENDENTE, "Pendente"),
+        (PROCESSANDO, "Processando"),
+        (CONCLUIDA, "Concluída"),
+        (ERRO, "Erro"),
+    ]
+    EM_ANDAMENTO = [PENDENTE, PROCESSANDO]
+
+    # sha256 do HTML: pedidos idênticos em andamento do mesmo usuário viram a
+    # mesma tarefa (a tarefa só é visível para quem a pediu)
+    chave = models.CharField(max_length=64, db_index=True)
+    html = models.TextField()
+    nome_arquivo = models.CharField(max_length=200)
+    # Impressão digital do cache de PDFs em disco (www/pdf.py), se houver:
+    # o PDF pronto também vai para lá
+    chave_cache = models.CharField(max_length=64, blank=True)
+    status = models.CharField(max_length=12, choices=STATUS_CHOICES, default=PENDENTE, db_index=True)
+    arquivo = models.FileField(upload_to="pdf/tarefas/", blank=True)
+    erro = models.TextField(blank=True)
+
+    solicitada_por = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="tarefas_pdf",
+    )
+    criada_em = models.DateTimeField(auto_now_add=True)
+    iniciada_em = models.DateTimeField(null=True, blank=True)
+    concluida_em = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Tarefa de PDF"
+        verbose_name_plural = "Tarefas de PDF"
+        ordering = ["criada_em"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["chave", "solicitada_por"],
+                condition=Q(status__in=["PENDENTE", "PROCESSANDO"]),
+                name="unique_tarefa_pdf_em_andamento",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.nome_arquivo} ({self.get_status_display()})"
+
+    @property
+    def em_andamento(self):
+        return self.status in self.EM_ANDAMENTO
+
+
+#########################################################################################
+
+def recalcular_estado_proposicoes(proposicoes=None):
+    """
+    Recalcula o estado derivado (última tramitação, comissão/relator atuais,
+    data de entrada e 'aguardando parecer') direto no banco, sem carregar linhas.
+    proposicoes=None -> todas; senão, um iterável de pks.
+    """
+    ultima = (
+        Tramitacao.objects
+        .filter(proposicao=OuterRef("pk"))
+        .order_by("-data_entrada", "-pk")
+    )
+
+    qs = Proposicao.objects.all()
+    if proposicoes is not None:
+        qs = qs.filter(pk__in=proposicoes)
+
+    qs.update(
+        tramitacao_atual=Subquery(ultima.values("pk")[:1]),
+        comissao_atual=Subquery(ultima.values("comissao")[:1]),
+        relator_atual=Subquery(ultima.values("relator")[:1]),
+        data_entrada_atual=Subquery(ultima.values("data_entrada")[:1]),
+    )
+    # Aguardando parecer = está em alguma comissão e a tramitação atual ainda não tem relator
+    qs.update(
+        aguardando_parecer=Q(tramitacao_atual__isnull=False, relator_atual__isnull=True)
+    )
+
+
+@receiver(post_save, sender=Tramitacao)
+@receiver(post_delete, sender=Tramitacao)
+def atualizar_estado_proposicao(sender, instance, **kwargs):
+    recalcular_estado_proposicoes([instance.proposicao_id])
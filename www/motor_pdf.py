@@ -0,0 +1,158 @@
+"""
+Motor do WeasyPrint, aquecido por thread/processo de trabalho.
+
+Um HTML(string=...).write_pdf() "cru" recomeça do zero a cada PDF: monta
+uma FontConfiguration nova (o fontconfig varre as fontes do sistema),
+lê e interpreta as folhas de estilo e decodifica de novo cada imagem. E,
+sem base_url, as imagens que o CKEditor grava como "/media/..." não se
+resolvem: o PDF sai sem elas.
+
+Aqui cada thread (e cada processo do ProcessPoolExecutor dos dossiês)
+guarda, entre um PDF e outro:
+    - a FontConfiguration;
+    - as folhas de estilo comuns (www/static/www/pdf.css), já
+      interpretadas — as <style> de cada template continuam no HTML;
+    - o BuscadorLocal: /media/ e /static/ lidos direto do disco, sem HTTP;
+    - o cache de imagens decodificadas (esvaziado entre dois PDFs quando
+      passa de settings.PDF_CACHE_IMAGENS entradas).
+O estado é por thread porque FontConfiguration, o buscador e o cache de
+imagens não são seguros para uso simultâneo.
+
+Para medir: python manage.py medir_pdf
+"""
+
+import mimetypes
+import threading
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+from django.apps import apps
+from django.conf import settings
+from weasyprint import CSS, HTML
+from weasyprint.text.fonts import FontConfiguration
+from weasyprint.urls import URLFetcher, URLFetcherResponse
+
+# Endereço-base dos HTMLs: "/media/x.png" vira ORIGEM_LOCAL + "media/x.png",
+# que o BuscadorLocal reconhece e lê do disco
+ORIGEM_LOCAL = "http://sistema-legislativo.local/"
+
+FOLHAS_COMUNS = [Path(__file__).resolve().parent / "static" / "www" / "pdf.css"]
+
+_local = threading.local()
+
+
+def _prefixo(url):
+    """MEDIA_URL/STATIC_URL como caminho absoluto ("static/" -> "/static/")."""
+    caminho = urlsplit(url or "").path
+    return "/" + caminho.strip("/") + "/"
+
+
+def _dentro(raiz, relativo):
+    """Arquivo 'relativo' sob 'raiz', ou None (inclusive para "../")."""
+    if not raiz:
+        return None
+    raiz = Path(raiz).resolve()
+    caminho = (raiz / relativo).resolve()
+    if caminho != raiz and raiz in caminho.parents and caminho.is_file():
+        return caminho
+    return None
+
+
+class BuscadorLocal(URLFetcher):
+    """
+    url_fetcher do WeasyPrint: arquivos de /media/ e /static/ (da origem
+    local ou de um host de ALLOWED_HOSTS) saem do disco; outros endereços
+    seguem pelo buscador padrão, com timeout curto. file:// fica de fora:
+    o HTML dos pareceres vem do usuário.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("timeout", 5)
+        kwargs.setdefault("allowed_protocols", ("http", "https", "data"))
+        super().__init__(**kwargs)
+        self.hosts = {urlsplit(ORIGEM_LOCAL).hostname}
+        self.hosts.update(
+            host.lstrip(".") for host in settings.ALLOWED_HOSTS if host != "*"
+        )
+
+    def arquivo_local(self, url):
+        """Caminho no disco para a URL, ou None se ela não é local."""
+        partes = urlsplit(url)
+        if partes.scheme not in ("http", "https") or partes.hostname not in self.hosts:
+            return None
+
+        caminho = unquote(partes.path)
+        midia = _prefixo(settings.MEDIA_URL)
+        estaticos = _prefixo(settings.STATIC_URL)
+        if caminho.startswith(midia):
+            return _dentro(settings.MEDIA_ROOT, caminho[len(midia):])
+        if caminho.startswith(estaticos):
+            relativo = caminho[len(estaticos):]
+            encontrado = _dentro(getattr(settings, "STATIC_ROOT", None), relativo)
+            if encontrado is None and apps.ready:
+                from django.contrib.staticfiles import finders
+
+                achado = finders.find(relativo)
+                encontrado = Path(achado) if achado else None
+            return encontrado
+        return None
+
+    def fetch(self, url, headers=None):
+        partes = urlsplit(url)
+        if partes.hostname in self.hosts and partes.scheme in ("http", "https"):
+            caminho = self.arquivo_local(url)
+            if caminho is None:
+                # Nada de HTTP para a origem local: o WeasyPrint avisa e segue
+                raise ValueError(f"Arquivo local não encontrado: {url}")
+            tipo = mimetypes.guess_type(caminho.name)[0] or "application/octet-stream"
+            return URLFetcherResponse(url, caminho.read_bytes(), {"Content-Type": tipo})
+        return super().fetch(url, headers)
+
+
+def _contexto():
+    """Estado aquecido da thread atual (criado no primeiro PDF)."""
+    contexto = getattr(_local, "contexto", None)
+    if contexto is None:
+        fontes = FontConfiguration()
+        buscador = BuscadorLocal()
+        contexto = _local.contexto = {
+            "fontes": fontes,
+            "buscador": buscador,
+            "folhas": [
+                CSS(
+                    string=folha.read_text(encoding="utf-8"),
+                    base_url=ORIGEM_LOCAL + "static/www/",
+                    font_config=fontes,
+                    url_fetcher=buscador,
+                )
+                for folha in FOLHAS_COMUNS
+            ],
+            "imagens": {},
+        }
+    return contexto
+
+
+def _limite_imagens():
+    return getattr(settings, "PDF_CACHE_IMAGENS", 200)
+
+
+def escrever_pdf(html_string, destino=None):
+    """
+    HTML -> PDF com o contexto aquecido. Sem destino, devolve os bytes;
+    com destino (caminho ou arquivo), grava nele.
+    """
+    contexto = _contexto()
+
+    # Só entre dois PDFs: o WeasyPrint consulta o cache durante a escrita
+    if len(contexto["imagens"]) > _limite_imagens():
+        contexto["imagens"].clear()
+
+    documento = HTML(
+        string=html_string, base_url=ORIGEM_LOCAL, url_fetcher=contexto["buscador"]
+    )
+    return documento.write_pdf(
+        destino,
+        font_config=contexto["fontes"],
+        stylesheets=contexto["folhas"],
+        cache=contexto["imagens"],
+    )
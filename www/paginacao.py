@@ -0,0 +1,198 @@
+"""
+Paginação por chave (keyset) para as listagens grandes.
+
+Em vez de OFFSET + COUNT, cada página guarda os valores da ordenação da
+primeira e da última linha num token assinado ("apos" / "antes"); a página
+seguinte é um WHERE sobre essas colunas, que o índice resolve direto.
+A página 4000 custa o mesmo que a página 1, e nenhuma página faz COUNT.
+
+A ordenação precisa terminar num campo único (ex.: ("-data_publicacao",
+"-numero")), senão linhas com o mesmo valor poderiam ser puladas.
+"""
+
+from django.core import signing
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+SALT = "www.paginacao"
+
+
+def _campos(ordenacao):
+    """("-data_publicacao", "numero") -> [("data_publicacao", True), ("numero", False)]"""
+    return [(campo.lstrip("-"), campo.startswith("-")) for campo in ordenacao]
+
+
+def _condicao(campos, valores, para_tras):
+    """
+    Linhas depois (ou antes) da chave 'valores' na ordenação 'campos':
+        a > x  OR  (a = x AND b > y)  OR ...
+    O sentido de cada comparação segue o asc/desc do campo.
+    """
+    condicao = Q()
+    iguais = {}
+    for (campo, desc), valor in zip(campos, valores):
+        operador = "lt" if desc != para_tras else "gt"
+        condicao |= Q(**iguais, **{f"{campo}__{operador}": valor})
+        iguais[campo] = valor
+    return condicao
+
+
+def _valores(model, campos, objeto):
+    return [
+        model._meta.get_field(campo).value_to_string(objeto)
+        for campo, _desc in campos
+    ]
+
+
+def _ler_token(model, campos, token):
+    """Token inválido/adulterado -> None (volta para a primeira página)."""
+    try:
+        dados = signing.loads(token, salt=SALT)
+        valores = [
+            model._meta.get_field(campo).to_python(valor)
+            for (campo, _desc), valor in zip(campos, dados["v"], strict=True)
+        ]
+        numero = dados["n"]
+        return valores, (int(numero) if numero is not None else None)
+    except (signing.BadSignature, KeyError, TypeError, ValueError, ValidationError):
+        return None
+
+
+def _token(model, campos, objeto, numero):
+    return signing.dumps({"v": _valores(model, campos, objeto), "n": numero},
+                         salt=SALT, compress=True)
+
+
+class PaginaPorChave:
+    """
+    Página da paginação por chave, com a mesma cara do Page do Django
+    onde os templates usam (object_list, number, has_next, has_previous).
+    """
+
+    def __init__(self, object_list, number, has_next, has_previous,
+                 token_proxima=None, token_anterior=None):
+        self.object_list = object_list
+        self.number = number           # None a partir da "Última": não sabemos sem COUNT
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.token_proxima = token_proxima
+        self.token_anterior = token_anterior
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+
+def paginar_por_chave(qs, ordenacao, tamanho, apos=None, antes=None, ultima=False):
+    """
+    Uma página de 'qs' na 'ordenacao', a partir dos tokens da página vizinha.
+
+    apos   -> página seguinte à que gerou o token
+    antes  -> página anterior à que gerou o token
+    ultima -> última página (ordenação invertida, sem COUNT)
+    sem nada (ou token inválido) -> primeira página
+    """
+    model = qs.model
+    campos = _campos(ordenacao)
+    invertida = [("-" + campo if not desc else campo) for campo, desc in campos]
+
+    numero = 1            # None = desconhecido (contando a partir da "Última")
+    para_tras = False
+    chave = None
+
+    if apos and (lido := _ler_token(model, campos, apos)):
+        chave, numero = lido[0], _somar(lido[1], 1)
+    elif antes and (lido := _ler_token(model, campos, antes)):
+        chave, numero = lido[0], _somar(lido[1], -1)
+        para_tras = True
+    elif ultima:
+        para_tras = True
+        numero = None
+
+    if chave is not None:
+        qs = qs.filter(_condicao(campos, chave, para_tras))
+    qs = qs.order_by(*(invertida if para_tras else ordenacao))
+
+    # Uma linha a mais só para saber se existe outra página nesse sentido
+    linhas = list(qs[: tamanho + 1])
+    tem_mais = len(linhas) > tamanho
+    linhas = linhas[:tamanho]
+
+    if para_tras:
+        linhas.reverse()
+        has_previous, has_next = tem_mais, chave is not None
+        if not tem_mais:
+            numero = 1          # voltou até o começo
+        elif numero == 1:
+            numero = None       # entrou coisa antes desde o token: número incerto
+    else:
+        has_previous, has_next = chave is not None, tem_mais
+
+    if not linhas:
+        return PaginaPorChave([], numero, False, False)
+
+    return PaginaPorChave(
+        linhas,
+        numero,
+        has_next,
+        has_previous,
+        token_proxima=_token(model, campos, linhas[-1], numero) if has_next else None,
+        token_anterior=_token(model, campos, linhas[0], numero) if has_previous else None,
+    )
+
+
+def _somar(numero, passo):
+    return numero + passo if numero is not None else None
+
+
+class PaginacaoPorChaveMixin:
+    """
+    ListView paginada por chave. A view define 'ordenacao_chave' (a mesma
+    ordenação do get_queryset, terminando num campo único).
+
+    page_obj / is_paginated vão para o contexto como no ListView;
+    querystring_sem_pagina() dá os filtros do GET para montar os links.
+    """
+
+    ordenacao_chave = ("pk",)
+    PARAMETROS_PAGINA = ("page", "apos", "antes", "ultima")
+
+    def paginate_queryset(self, queryset, page_size):
+        get = self.request.GET
+        pagina = paginar_por_chave(
+            queryset,
+            self.ordenacao_chave,
+            page_size,
+            apos=get.get("apos"),
+            antes=get.get("antes"),
+            ultima=get.get("ultima") == "1",
+        )
+        return None, pagina, pagina.object_list, pagina.has_other_pages()
+
+    def querystring_sem_pagina(self):
+        params = self.request.GET.copy()
+        for parametro in self.PARAMETROS_PAGINA:
+            params.pop(parametro, None)
+        return params.urlencode()
+
+
+def janela_de_paginas(page_obj, raio=3):
+    """
+    Links numerados em volta da página atual (paginação com OFFSET), sem
+    percorrer o page_range inteiro: get_elided_page_range só gera o trecho
+    visível. Vem com '…' (Paginator.ELLIPSIS) nas pontas cortadas.
+    """
+    return page_obj.paginator.get_elided_page_range(
+        page_obj.number, on_each_side=raio, on_ends=0
+    )
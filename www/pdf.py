@@ -0,0 +1,219 @@
+"""
+Geração de PDF (WeasyPrint) e resposta HTTP.
+
+Por padrão o PDF é gerado dentro da requisição. No modo por tarefa
+(settings.PDF_ASSINCRONO = True, ou ?assincrono=1 na URL) a requisição só
+renderiza o HTML, enfileira uma TarefaPDF e redireciona para a tela de
+acompanhamento; o WeasyPrint roda nos processos do comando processar_pdfs.
+
+PDFs que dependem só de dados conhecidos (parecer, dossiê) ficam num cache
+em disco endereçado pelo conteúdo: o nome do arquivo é a impressão digital
+dos dados usados + versão dos templates. Mudou algum dado, muda a chave.
+
+O WeasyPrint em si roda em www/motor_pdf.py (fontes, estilos comuns e
+imagens reaproveitados entre os PDFs; /media/ e /static/ lidos do disco).
+"""
+
+import hashlib
+import os
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.http import FileResponse, HttpResponse
+from django.shortcuts import redirect
+from django.template.loader import get_template
+
+from www.motor_pdf import escrever_pdf
+
+
+def gerar_pdf(html_string):
+    """Converte o HTML em PDF (bytes)."""
+    return escrever_pdf(html_string)
+
+
+def gerar_pdf_em_arquivo(html_string, caminho):
+    """
+    Versão usada pelos processos de trabalho: grava direto no arquivo.
+    Não toca no banco, por isso pode rodar num processo filho.
+    """
+    escrever_pdf(html_string, caminho)
+
+
+def modo_assincrono(request):
+    if request.GET.get("assincrono") == "1":
+        return True
+    return getattr(settings, "PDF_ASSINCRONO", False)
+
+
+def resposta_pdf(request, html_string, filename, chave_cache=""):
+    """
+    Resposta PDF síncrona, ou redirecionamento para a tarefa enfileirada.
+    chave_cache: impressão digital do cache em disco, onde a tarefa guarda
+    o PDF quando ficar pronto (ver resposta_pdf_em_cache).
+    """
+    if modo_assincrono(request):
+        tarefa = enfileirar_pdf(html_string, filename, request.user, chave_cache)
+        return redirect("tarefa_pdf_detail", pk=tarefa.pk)
+
+    pdf = gerar_pdf(html_string)
+
+    response = HttpResponse(pdf, content_type="application/pdf")
+    response["Content-Disposition"] = f'inline; filename="{filename}"'
+    return response
+
+
+def enfileirar_pdf(html_string, filename, usuario=None, chave_cache=""):
+    """
+    Cria a TarefaPDF — ou devolve a que o mesmo usuário já tem em andamento
+    para o mesmo HTML (duplo clique, recarga da página enquanto o PDF ainda
+    não saiu). Outro usuário com o mesmo HTML ganha a sua própria tarefa:
+    a tela da tarefa só abre para quem a pediu.
+    """
+    from www.models import TarefaPDF
+
+    chave = hashlib.sha256(html_string.encode("utf-8")).hexdigest()
+    solicitante = usuario if usuario and usuario.is_authenticated else None
+    em_andamento = TarefaPDF.objects.filter(
+        chave=chave, solicitada_por=solicitante, status__in=TarefaPDF.EM_ANDAMENTO
+    )
+
+    existente = em_andamento.first()
+    if existente:
+        return existente
+
+    try:
+        with transaction.atomic():
+            return TarefaPDF.objects.create(
+                chave=chave,
+                html=html_string,
+                nome_arquivo=filename,
+                chave_cache=chave_cache,
+                solicitada_por=solicitante,
+            )
+    except IntegrityError:
+        # outro pedido idêntico foi enfileirado entre a consulta e o insert
+        return em_andamento.get()
+
+
+# =========================================================================
+# 🔹 Cache de PDFs em disco (endereçado pelo conteúdo)
+# =========================================================================
+
+def _diretorio_cache():
+    return Path(getattr(settings, "PDF_CACHE_DIR", settings.BASE_DIR / "cache" / "pdf"))
+
+
+def _limite_cache_bytes():
+    return getattr(settings, "PDF_CACHE_MAX_MB", 500) * 1024 * 1024
+
+
+@lru_cache(maxsize=None)
+def versao_templates(*nomes):
+    """Hash do fonte dos templates: editar o layout invalida os PDFs antigos."""
+    digest = hashlib.sha256()
+    for nome in nomes:
+        digest.update(get_template(nome).template.source.encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def impressao_digital(*partes):
+    """Chave do cache a partir de tudo que influencia o PDF."""
+    return hashlib.sha256(repr(partes).encode("utf-8")).hexdigest()
+
+
+def resumo_texto(texto):
+    """Hash curto de um texto grande (CKEditor), para compor a impressão digital."""
+    return hashlib.sha1((texto or "").encode("utf-8")).hexdigest()
+
+
+def _caminho(chave):
+    return _diretorio_cache() / f"{chave}.pdf"
+
+
+def pdf_em_cache(chave):
+    """Caminho do PDF já gerado para a chave, ou None."""
+    caminho = _caminho(chave)
+    try:
+        os.utime(caminho)  # marca o uso recente (despejo por LRU)
+    except FileNotFoundError:
+        return None
+    return caminho
+
+
+def guardar_em_cache(chave, pdf):
+    diretorio = _diretorio_cache()
+    diretorio.mkdir(parents=True, exist_ok=True)
+
+    # escrita atômica: ninguém lê um PDF pela metade
+    descritor, temporario = tempfile.mkstemp(dir=diretorio, suffix=".tmp")
+    with os.fdopen(descritor, "wb") as arquivo:
+        arquivo.write(pdf)
+    os.replace(temporario, _caminho(chave))
+
+    reduzir_cache(_limite_cache_bytes())
+
+
+def reduzir_cache(limite_bytes):
+    """
+    Remove os PDFs usados há mais tempo até o cache caber no limite
+    (com folga de 10%, para não despejar a cada gravação).
+    Retorna (arquivos removidos, bytes liberados).
+    """
+    diretorio = _diretorio_cache()
+    if not diretorio.exists():
+        return 0, 0
+
+    arquivos = []
+    total = 0
+    for entrada in os.scandir(diretorio):
+        if entrada.is_file() and entrada.name.endswith(".pdf"):
+            info = entrada.stat()
+            arquivos.append((info.st_mtime, info.st_size, entrada.path))
+            total += info.st_size
+
+    if total <= limite_bytes:
+        return 0, 0
+
+    alvo = limite_bytes * 0.9
+    removidos = liberados = 0
+    for _, tamanho, caminho in sorted(arquivos):
+        if total <= alvo:
+            break
+        try:
+            os.remove(caminho)
+        except FileNotFoundError:
+            continue
+        total -= tamanho
+        removidos += 1
+        liberados += tamanho
+    return removidos, liberados
+
+
+def resposta_pdf_em_cache(request, chave, filename, renderizar_html):
+    """
+    Serve o PDF do cache; se não houver, renderiza o HTML (renderizar_html
+    é chamado só nesse caso), gera o PDF e guarda. No modo por tarefa, a falta
+    no cache vira uma TarefaPDF, como em resposta_pdf.
+    """
+    caminho = pdf_em_cache(chave)
+    if caminho:
+        return FileResponse(
+            open(caminho, "rb"),
+            content_type="application/pdf",
+            filename=filename,
+            as_attachment=False,
+        )
+
+    html_string = renderizar_html()
+    if modo_assincrono(request):
+        return resposta_pdf(request, html_string, filename, chave_cache=chave)
+
+    pdf = gerar_pdf(html_string)
+    guardar_em_cache(chave, pdf)
+
+    response = HttpResponse(pdf, content_type="application/pdf")
+    response["Content-Disposition"] = f'inline; filename="{filename}"'
+    return response
@@ -0,0 +1,109 @@
+"""
+Perfil do usuário por requisição e permissão de escrita por comissão.
+
+O ContextoUsuarioMiddleware deixa em request.contexto_usuario o perfil e
+a comissão padrão do usuário, carregados uma única vez (e só se alguém
+usar) com select_related. O perfil também fica no cache da relação
+user.perfil, então o código antigo que lê user.perfil.comissao_padrao não
+consulta o banco de novo.
+
+A regra de escrita é uma só, comparando ids:
+    superusuário -> pode tudo
+    demais       -> só o que pertence à sua comissão padrão
+Como as views já têm o comissao_id do objeto, a verificação não custa
+nenhuma consulta.
+"""
+
+from django.contrib.auth import get_user_model
+from django.http import Http404
+from django.utils.functional import SimpleLazyObject, cached_property
+
+from www.models import PerfilUsuario
+
+
+class ContextoUsuario:
+    """Usuário da requisição + perfil + comissão padrão (somente leitura)."""
+
+    def __init__(self, user):
+        self.user = user
+
+    @property
+    def is_superuser(self):
+        return bool(getattr(self.user, "is_superuser", False))
+
+    @cached_property
+    def perfil(self):
+        if not getattr(self.user, "is_authenticated", False):
+            return None
+        perfil = (
+            PerfilUsuario.objects
+            .select_related("comissao_padrao")
+            .filter(user_id=self.user.pk)
+            .first()
+        )
+        # Preenche user.perfil: quem ainda lê pelo usuário também não consulta
+        get_user_model().perfil.related.set_cached_value(self.user, perfil)
+        return perfil
+
+    @property
+    def comissao(self):
+        """Comissão padrão do usuário (ou None)."""
+        return self.perfil.comissao_padrao if self.perfil else None
+
+    @property
+    def comissao_id(self):
+        return self.perfil.comissao_padrao_id if self.perfil else None
+
+    def pode_alterar(self, comissao_id):
+        """Escrita em tramitação/voto vencido da comissão 'comissao_id'."""
+        if self.is_superuser:
+            return True
+        return comissao_id is not None and comissao_id == self.comissao_id
+
+    def exigir(self, comissao_id):
+        """🔒 Http404 (como as views sempre fizeram) se não puder alterar."""
+        if not self.pode_alterar(comissao_id):
+            raise Http404("Acesso negado")
+
+
+def contexto_usuario(request):
+    """O ContextoUsuario da requisição (criado aqui se o middleware não rodou)."""
+    contexto = getattr(request, "contexto_usuario", None)
+    if contexto is None:
+        contexto = request.contexto_usuario = ContextoUsuario(request.user)
+    return contexto
+
+
+class ContextoUsuarioMiddleware:
+    """Vem depois do AuthenticationMiddleware."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.contexto_usuario = SimpleLazyObject(lambda: ContextoUsuario(request.user))
+        return self.get_response(request)
+
+
+class ContextoUsuarioMixin:
+    """
+    Views: self.contexto_usuario, a comissão selecionada no filtro e a
+    verificação de escrita por comissão.
+    """
+
+    @property
+    def contexto_usuario(self):
+        return contexto_usuario(self.request)
+
+    def exigir_permissao_comissao(self, comissao_id):
+        self.contexto_usuario.exigir(comissao_id)
+
+    def _comissao_selecionada(self):
+        """
+        Comissão escolhida no filtro (id em texto); sem o parâmetro, a
+        comissão do usuário. Valor explicitamente vazio = "Todas".
+        """
+        comissao = self.request.GET.get("comissao")
+        if comissao is None and self.contexto_usuario.comissao_id:
+            comissao = str(self.contexto_usuario.comissao_id)
+        return comissao
@@ -0,0 +1,118 @@
+/*
+ * Busca remota das combos (BuscaRemotaSelect, em www/forms.py).
+ *
+ * O <select data-busca-url="..."> chega só com a opção escolhida; um campo
+ * de busca acima dele consulta o endpoint JSON (www/views_combos.py) e
+ * troca as opções pelos resultados. O valor enviado continua sendo o do
+ * <select>, validado no servidor como antes.
+ *
+ *   data-busca-filtros="comissao=id_comissao"  valor de outro campo enviado
+ *                                              na busca (e que, ao mudar,
+ *                                              refaz a busca)
+ *   data-busca-fixos="comissao=3"              parâmetros sempre enviados
+ */
+(function () {
+    "use strict";
+
+    const ESPERA_MS = 250;
+
+    function pares(texto) {
+        return (texto || "").split(",").filter(Boolean).map(function (par) {
+            const i = par.indexOf("=");
+            return [par.slice(0, i), par.slice(i + 1)];
+        });
+    }
+
+    function preparar(select) {
+        if (select.dataset.buscaPronta) return;
+        select.dataset.buscaPronta = "1";
+
+        const filtros = pares(select.dataset.buscaFiltros);
+        const fixos = pares(select.dataset.buscaFixos);
+
+        const campo = document.createElement("input");
+        campo.type = "search";
+        campo.className = "form-control form-control-sm mb-1";
+        campo.placeholder = "Digite para buscar…";
+        campo.autocomplete = "off";
+        select.parentNode.insertBefore(campo, select);
+
+        let espera = null;
+        let pedido = 0;
+        let carregado = false;
+
+        function buscar() {
+            const url = new URL(select.dataset.buscaUrl, window.location.href);
+            url.searchParams.set("q", campo.value.trim());
+            fixos.forEach(function ([parametro, valor]) {
+                url.searchParams.set(parametro, valor);
+            });
+            filtros.forEach(function ([parametro, id]) {
+                const origem = document.getElementById(id);
+                if (origem && origem.value) url.searchParams.set(parametro, origem.value);
+            });
+
+            const este = ++pedido;
+            fetch(url, { headers: { "Accept": "application/json" }, credentials: "same-origin" })
+                .then(function (resposta) { return resposta.ok ? resposta.json() : null; })
+                .then(function (dados) {
+                    // resposta de uma busca antiga (o usuário continuou digitando)
+                    if (dados && este === pedido) preencher(dados);
+                })
+                .catch(function () { /* mantém as opções atuais */ });
+            carregado = true;
+        }
+
+        function preencher(dados) {
+            const atual = select.selectedOptions[0];
+            const manter = Array.from(select.options).filter(function (opt) {
+                return !opt.value || opt === atual;
+            });
+
+            select.replaceChildren.apply(select, manter);
+            dados.resultados.forEach(function (item) {
+                if (atual && atual.value === String(item.id)) return;
+                const opt = new Option(item.texto, item.id);
+                if (item.comissao !== undefined) opt.dataset.comissao = item.comissao;
+                select.add(opt);
+            });
+            if (dados.mais) {
+                const aviso = new Option("… há mais resultados: refine a busca", "");
+                aviso.disabled = true;
+                select.add(aviso);
+            }
+        }
+
+        campo.addEventListener("input", function () {
+            clearTimeout(espera);
+            espera = setTimeout(buscar, ESPERA_MS);
+        });
+        // Primeira lista (sem texto) só quando o usuário vai usar a combo
+        campo.addEventListener("focus", function () { if (!carregado) buscar(); });
+        select.addEventListener("focus", function () { if (!carregado) buscar(); });
+
+        filtros.forEach(function ([parametro, id]) {
+            const origem = document.getElementById(id);
+            if (!origem) return;
+            origem.addEventListener("change", function () {
+                // limpa a seleção que deixou de valer (ex.: reunião de outra comissão)
+                const atual = select.selectedOptions[0];
+                const valorAtual = atual && atual.dataset[parametro];
+                if (valorAtual !== undefined && origem.value && valorAtual !== origem.value) {
+                    select.value = "";
+                }
+                buscar();
+            });
+        });
+    }
+
+    function iniciar() {
+        document.querySelectorAll("select[data-busca-url]").forEach(preparar);
+    }
+
+    if (document.readyState === "loading") {
+        document.addEventListener("DOMContentLoaded", iniciar);
+    } else {
+        iniciar();
+    }
+})();
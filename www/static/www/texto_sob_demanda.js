@@ -0,0 +1,33 @@
+/*
+ * Texto completo sob demanda (pareceres e votos vencidos nas listagens).
+ *
+ * As listagens trazem só o resumo do texto (texto_resumo/texto_tamanho);
+ * o HTML do CKEditor vem do endpoint na primeira vez que o usuário abre o
+ * <details data-texto-url="...">, para dentro do [data-texto-conteudo].
+ */
+(function () {
+    "use strict";
+
+    function carregar(detalhes) {
+        if (!detalhes.open || detalhes.dataset.textoCarregado) return;
+        detalhes.dataset.textoCarregado = "1";
+
+        const destino = detalhes.querySelector("[data-texto-conteudo]");
+        fetch(detalhes.dataset.textoUrl, { headers: { "Accept": "text/html" }, credentials: "same-origin" })
+            .then(function (resposta) {
+                if (!resposta.ok) throw new Error(resposta.status);
+                return resposta.text();
+            })
+            .then(function (html) { destino.innerHTML = html; })
+            .catch(function () {
+                destino.textContent = "Não foi possível carregar o texto.";
+                delete detalhes.dataset.textoCarregado;  // tenta de novo ao reabrir
+            });
+    }
+
+    // "toggle" não sobe pelo DOM: escuta na captura
+    document.addEventListener("toggle", function (evento) {
+        const alvo = evento.target;
+        if (alvo.matches && alvo.matches("details[data-texto-url]")) carregar(alvo);
+    }, true);
+})();
@@ -0,0 +1,142 @@
+"""
+Cache local (por processo) das tabelas pequenas usadas em quase toda tela:
+comissões ativas, tipos de proposição e anos com reunião.
+
+Cada worker guarda a sua cópia em memória; a validade vem de um número
+de versão por tabela no cache compartilhado (settings.CACHES), que os
+signals incrementam a cada save/delete. Uma tela comum só lê a versão —
+nenhuma consulta ao banco — e, quando um worker altera uma comissão, os
+demais recarregam na próxima leitura.
+
+Escritas que não disparam signals (bulk_create, update(), SQL direto)
+devem chamar invalidar_tabelas() ao final.
+
+Os objetos são compartilhados entre requisições: somente leitura.
+"""
+
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from www.banco_relatorios import usar_banco_principal
+from www.models import Comissao, Reuniao, TipoProposicao
+
+COMISSOES = "comissoes"
+TIPOS = "tipos"
+ANOS_REUNIOES = "anos_reunioes"
+
+_locais = {}                # tabela -> (versao, valor)
+_trava = threading.Lock()
+
+
+def _chave_versao(tabela):
+    return f"tabelas:versao:{tabela}"
+
+
+def _versao_inicial():
+    # Cache limpo/expulso: recomeça de um valor que nenhum worker tem guardado
+    return time.time_ns()
+
+
+def _versao(tabela):
+    chave = _chave_versao(tabela)
+    versao = cache.get(chave)
+    if versao is None:
+        cache.add(chave, _versao_inicial(), None)
+        versao = cache.get(chave)
+    return versao
+
+
+def _obter(tabela, carregar):
+    versao = _versao(tabela)
+    local = _locais.get(tabela)
+    if local is not None and local[0] == versao:
+        return local[1]
+
+    with _trava:
+        local = _locais.get(tabela)
+        if local is None or local[0] != versao:
+            # Sempre do principal: o snapshot pode não ter a alteração que mudou a versão
+            with usar_banco_principal():
+                local = (versao, carregar())
+            _locais[tabela] = local
+    return local[1]
+
+
+def invalidar_tabelas(*tabelas):
+    """Nova versão das tabelas informadas (todas, se nenhuma) em todos os workers."""
+    for tabela in tabelas or (COMISSOES, TIPOS, ANOS_REUNIOES):
+        _locais.pop(tabela, None)
+        chave = _chave_versao(tabela)
+        cache.add(chave, _versao_inicial(), None)
+        try:
+            cache.incr(chave)
+        except ValueError:  # expulsa do cache entre o add e o incr
+            cache.set(chave, _versao_inicial(), None)
+
+
+# =========================================================================
+# 🔹 Consultas
+# =========================================================================
+
+def comissoes_ativas():
+    """Comissões ativas, na ordem do modelo (nome)."""
+    return _obter(COMISSOES, lambda: tuple(Comissao.objects.filter(ativa=True)))
+
+
+def _tipos():
+    tipos = tuple(TipoProposicao.objects.all())
+    return {
+        "ativos": tuple(t for t in tipos if t.ativo),
+        "por_sigla": {t.sigla: t for t in tipos},
+    }
+
+
+def tipos_ativos():
+    """Tipos de proposição ativos, na ordem do modelo (nome)."""
+    return _obter(TIPOS, _tipos)["ativos"]
+
+
+def tipo_por_sigla(sigla):
+    """TipoProposicao da sigla (ativo ou não), ou None."""
+    return _obter(TIPOS, _tipos)["por_sigla"].get(sigla)
+
+
+def anos_com_reunioes():
+    """Anos com alguma reunião, do mais recente ao mais antigo (inteiros)."""
+    return _obter(ANOS_REUNIOES, lambda: tuple(
+        data.year for data in Reuniao.objects.dates("data", "year", order="DESC")
+    ))
+
+
+# =========================================================================
+# 🔹 Invalidação por eventos
+# =========================================================================
+# A versão só muda depois do commit: antes dele, outro worker que
+# recarregasse ainda leria os dados antigos e os guardaria na versão nova.
+
+def _invalidar_apos_commit(tabela):
+    transaction.on_commit(lambda: invalidar_tabelas(tabela))
+
+
+@receiver(post_save, sender=Comissao)
+@receiver(post_delete, sender=Comissao)
+def invalidar_comissoes(sender, **kwargs):
+    _invalidar_apos_commit(COMISSOES)
+
+
+@receiver(post_save, sender=TipoProposicao)
+@receiver(post_delete, sender=TipoProposicao)
+def invalidar_tipos(sender, **kwargs):
+    _invalidar_apos_commit(TIPOS)
+
+
+@receiver(post_save, sender=Reuniao)
+@receiver(post_delete, sender=Reuniao)
+def invalidar_anos_reunioes(sender, **kwargs):
+    # A data anterior não está à mão aqui: qualquer escrita renova
+    _invalidar_apos_commit(ANOS_REUNIOES)
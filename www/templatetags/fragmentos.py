@@ -0,0 +1,11 @@
+from django import template
+
+from www.fragmentos import versao_fragmento
+
+register = template.Library()
+
+
+@register.filter
+def versao(objeto):
+    """Versão do objeto para a chave do {% cache %} (ver www/fragmentos.py)."""
+    return versao_fragmento(objeto)
@@ -0,0 +1,76 @@
+"""
+Consultas "em uma data": onde cada proposição estava num dia passado.
+
+O estado atual (Proposicao.tramitacao_atual) vem da ÚLTIMA tramitação.
+Para uma data D, a tramitação vigente de uma proposição é a última com
+data_entrada <= D (desempate pelo pk, como em recalcular_estado_proposicoes),
+desde que ainda não tivesse saído: data_saida vazia ou posterior a D.
+A situação atual (tramitacoes_atuais) é a do resto do sistema — painel,
+Proposicao.comissao_atual, filtros das listas: a ÚLTIMA tramitação, com
+ou sem data_saida. Só a consulta em data passada olha a saída; as telas
+avisam o usuário dessa diferença.
+
+Tudo sai numa única consulta: as tramitações candidatas (entrada até D,
+sem saída até D) menos as que têm outra tramitação da mesma proposição
+entrando depois delas e ainda até D (NOT EXISTS). O NOT EXISTS anda pelo
+índice (proposicao, data_entrada); restrito a uma comissão, as
+candidatas vêm do índice (comissao, data_entrada).
+
+O relator e o parecer são os do cadastro da tramitação: o sistema não
+guarda a data da designação do relator.
+"""
+
+from django.db.models import Exists, F, OuterRef, Q
+from django.utils.dateparse import parse_date
+from django.utils.timezone import localdate
+
+from www.models import Tramitacao
+
+
+def ler_data(valor):
+    """
+    'aaaa-mm-dd' do GET -> date. Vazio, inválido, hoje ou futuro -> None
+    (vale a situação atual).
+    """
+    try:
+        data = parse_date(valor or "")
+    except ValueError:
+        return None
+    if data is None or data >= localdate():
+        return None
+    return data
+
+
+def tramitacoes_vigentes_em(data, comissao=None):
+    """
+    Tramitações vigentes na data (no máximo uma por proposição),
+    opcionalmente só as da comissão.
+    """
+    posterior = (
+        Tramitacao.objects
+        .filter(proposicao_id=OuterRef("proposicao_id"), data_entrada__lte=data)
+        .filter(
+            Q(data_entrada__gt=OuterRef("data_entrada"))
+            | Q(data_entrada=OuterRef("data_entrada"), pk__gt=OuterRef("pk"))
+        )
+    )
+
+    qs = Tramitacao.objects.filter(data_entrada__lte=data)
+    if comissao is not None:
+        qs = qs.filter(comissao=comissao)
+    return (
+        qs
+        .filter(Q(data_saida__isnull=True) | Q(data_saida__gt=data))
+        .filter(~Exists(posterior))
+    )
+
+
+def tramitacoes_atuais(comissao=None):
+    """
+    A tramitação atual de cada proposição (Proposicao.tramitacao_atual),
+    opcionalmente só as da comissão: a mesma regra do painel.
+    """
+    qs = Tramitacao.objects.filter(proposicao__tramitacao_atual=F("pk"))
+    if comissao is not None:
+        qs = qs.filter(comissao=comissao)
+    return qs
@@ -0,0 +1,79 @@
+"""Base dos testes: dados mínimos e caches em memória."""
+
+import datetime
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import connections
+from django.test import TestCase, override_settings
+
+from www.models import (
+    Comissao,
+    PerfilUsuario,
+    Proposicao,
+    TipoProposicao,
+    Tramitacao,
+)
+
+# Caches em memória: os testes não usam nem sujam o cache em disco do projeto
+CACHES_TESTE = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "testes"},
+    "template_fragments": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "testes-fragmentos",
+    },
+}
+
+
+@override_settings(CACHES=CACHES_TESTE, PDF_CACHE_DIR=tempfile.gettempdir() + "/testes_pdf")
+class BaseTeste(TestCase):
+    # Relatórios, dashboards e PDFs leem do alias "relatorios"
+    databases = {"default", "relatorios"}
+
+    @classmethod
+    def setUpClass(cls):
+        # O espelho "relatorios" abriria outra conexão ao SQLite em memória,
+        # fora da transação do teste (e travada por ela): usa a do default
+        cls._conexao_relatorios = connections["relatorios"]
+        connections["relatorios"] = connections["default"]
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections["relatorios"] = cls._conexao_relatorios
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.hoje = datetime.date.today()
+        cls.tipo = TipoProposicao.objects.create(sigla="PL", nome="Projeto de Lei")
+        cls.ccj = Comissao.objects.create(sigla="CCJ", nome="Constituição e Justiça")
+        cls.cfo = Comissao.objects.create(sigla="CFO", nome="Orçamento")
+        cls.proposicao = cls.criar_proposicao(1)
+        cls.tramitacao = Tramitacao.objects.create(
+            proposicao=cls.proposicao, comissao=cls.ccj, data_entrada=cls.hoje,
+        )
+
+    @classmethod
+    def criar_proposicao(cls, i):
+        return Proposicao.objects.create(
+            tipo=cls.tipo,
+            numero=f"2025{i:07d}",
+            numero_formatado=f"{i}/2025",
+            ementa=f"Ementa {i}",
+            data_publicacao=cls.hoje,
+        )
+
+    @classmethod
+    def criar_usuario(cls, username, comissao=None, superusuario=False):
+        criar = User.objects.create_superuser if superusuario else User.objects.create_user
+        user = criar(username, f"{username}@teste", "x")
+        PerfilUsuario.objects.filter(user=user).update(comissao_padrao=comissao)
+        return user
+
+    def setUp(self):
+        for alias in CACHES_TESTE:
+            caches[alias].clear()
+        shutil.rmtree(settings.PDF_CACHE_DIR, ignore_errors=True)
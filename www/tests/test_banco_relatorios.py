@@ -0,0 +1,86 @@
+"""Testes do roteamento para o banco dos relatórios (www/banco_relatorios.py)."""
+
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import RequestFactory
+from django.urls import reverse
+
+from www.banco_relatorios import (
+    CHAVE_SESSAO,
+    RoteadorRelatorios,
+    _escreveu_ha_pouco,
+    em_banco_relatorios,
+    usar_banco_principal,
+    usar_banco_relatorios,
+    validade_cache,
+)
+from www.models import PerfilUsuario, Proposicao, TarefaPDF, Tramitacao
+from www.tests.base import BaseTeste
+
+
+class RoteadorRelatoriosTests(BaseTeste):
+
+    def test_leituras_marcadas_vao_para_os_relatorios(self):
+        self.assertEqual(Proposicao.objects.all().db, "default")
+
+        with usar_banco_relatorios():
+            self.assertEqual(Proposicao.objects.all().db, "relatorios")
+            self.assertEqual(Tramitacao.objects.all().db, "relatorios")
+            # Usuários, perfil e fila de PDFs ficam no principal
+            self.assertEqual(User.objects.all().db, "default")
+            self.assertEqual(PerfilUsuario.objects.all().db, "default")
+            self.assertEqual(TarefaPDF.objects.all().db, "default")
+
+            with usar_banco_principal():
+                self.assertEqual(Proposicao.objects.all().db, "default")
+            self.assertEqual(Proposicao.objects.all().db, "relatorios")
+
+        self.assertEqual(Proposicao.objects.all().db, "default")
+
+    def test_escritas_sempre_no_principal(self):
+        roteador = RoteadorRelatorios()
+        with usar_banco_relatorios():
+            proposicao = Proposicao.objects.get(pk=self.proposicao.pk)
+            self.assertEqual(roteador.db_for_write(Proposicao, instance=proposicao), "default")
+        self.assertFalse(roteador.allow_migrate("relatorios", "www"))
+        self.assertIsNone(roteador.allow_migrate("default", "www"))
+
+    def test_fluxo_le_dos_relatorios_a_cada_item(self):
+        def bancos():
+            for _ in range(2):
+                yield Proposicao.objects.all().db
+
+        self.assertEqual(list(em_banco_relatorios(bancos())), ["relatorios", "relatorios"])
+        self.assertEqual(Proposicao.objects.all().db, "default")
+
+    def test_copia_defasada_encurta_o_cache(self):
+        with usar_banco_relatorios():
+            self.assertEqual(validade_cache(86400), 86400)  # o próprio arquivo principal
+            with mock.patch.dict(settings.DATABASES["relatorios"], NAME="/tmp/snapshot.sqlite3"):
+                self.assertEqual(
+                    validade_cache(86400), settings.BANCO_RELATORIOS_PRINCIPAL_APOS_ESCRITA
+                )
+
+    def test_quem_acabou_de_gravar_le_do_principal(self):
+        request = RequestFactory().get("/")
+        request.session = {}
+        self.assertFalse(_escreveu_ha_pouco(request))
+        agora = int(time.time())
+        request.session[CHAVE_SESSAO] = agora
+        self.assertTrue(_escreveu_ha_pouco(request))
+        request.session[CHAVE_SESSAO] = agora - settings.BANCO_RELATORIOS_PRINCIPAL_APOS_ESCRITA - 1
+        self.assertFalse(_escreveu_ha_pouco(request))
+
+    def test_post_marca_a_ultima_escrita_na_sessao(self):
+        usuario = self.criar_usuario("usuario", comissao=self.ccj)
+        self.client.force_login(usuario)
+        self.assertNotIn(CHAVE_SESSAO, self.client.session)
+
+        resposta = self.client.post(
+            reverse("tramitacao_delete", args=[self.proposicao.pk, self.tramitacao.pk])
+        )
+        self.assertEqual(resposta.status_code, 302)
+        self.assertIn(CHAVE_SESSAO, self.client.session)
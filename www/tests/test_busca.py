@@ -0,0 +1,50 @@
+"""Testes da busca textual das proposições (www/busca.py)."""
+
+from django.db import connection
+
+from www.busca import TABELA_FTS, buscar_proposicoes, filtrar_proposicoes, reconstruir_indice
+from www.models import Proposicao
+from www.tests.base import BaseTeste
+
+
+class BuscaFTSTests(BaseTeste):
+
+    def numeros(self, busca):
+        return [p.numero for p in buscar_proposicoes(busca)]
+
+    def test_triggers_acompanham_as_escritas(self):
+        proposicao = self.criar_proposicao(2)
+        proposicao.ementa = "Dispõe sobre a educação ambiental"
+        proposicao.save()
+        self.assertEqual(self.numeros("educacao"), [proposicao.numero])
+
+        # update() sem sinais: quem atualiza o índice é o trigger
+        Proposicao.objects.filter(pk=proposicao.pk).update(ementa="Institui o dia do ciclista")
+        self.assertEqual(self.numeros("educacao"), [])
+        self.assertEqual(self.numeros("ciclis"), [proposicao.numero])
+
+        proposicao.delete()
+        self.assertEqual(self.numeros("ciclista"), [])
+
+    def test_trecho_destacado_e_escapado(self):
+        proposicao = self.criar_proposicao(2)
+        Proposicao.objects.filter(pk=proposicao.pk).update(ementa="Altera a <b>Lei</b> de saúde")
+
+        [resultado] = buscar_proposicoes("saude")
+        self.assertIn("<mark>saúde</mark>", resultado.trecho)
+        self.assertIn("&lt;b&gt;", resultado.trecho)
+
+    def test_filtro_no_queryset(self):
+        proposicao = self.criar_proposicao(2)
+        Proposicao.objects.filter(pk=proposicao.pk).update(ementa="Cria o programa Saúde na Escola")
+        qs = filtrar_proposicoes(Proposicao.objects.all(), "saude escol")
+        self.assertEqual([p.numero for p in qs], [proposicao.numero])
+        self.assertFalse(filtrar_proposicoes(Proposicao.objects.all(), "!!").exists())
+
+    def test_reconstruir_indice(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {TABELA_FTS}")
+        self.assertEqual(self.numeros("ementa"), [])
+
+        reconstruir_indice()
+        self.assertEqual(self.numeros("ementa"), [self.proposicao.numero])
@@ -0,0 +1,54 @@
+"""Testes do cache de PDFs em disco (www/pdf.py)."""
+
+import os
+import time
+from unittest import mock
+
+from django.urls import reverse
+
+from www.models import Tramitacao
+from www.pdf import _caminho, guardar_em_cache, pdf_em_cache, reduzir_cache
+from www.tests.base import BaseTeste
+
+
+class CacheDePDFTests(BaseTeste):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.usuario = cls.criar_usuario("usuario", comissao=cls.ccj)
+
+    def baixar(self):
+        self.client.force_login(self.usuario)
+        resposta = self.client.get(reverse("tramitacao_pdf", args=[self.tramitacao.pk]))
+        self.assertEqual(resposta.status_code, 200)
+        return resposta
+
+    def test_segundo_pedido_sai_do_cache(self):
+        with mock.patch("www.pdf.gerar_pdf", return_value=b"%PDF-1") as gerar:
+            self.baixar()
+            resposta = self.baixar()
+        self.assertEqual(gerar.call_count, 1)
+        self.assertEqual(b"".join(resposta.streaming_content), b"%PDF-1")
+
+    def test_editar_a_tramitacao_muda_a_chave(self):
+        with mock.patch("www.pdf.gerar_pdf", return_value=b"%PDF-1") as gerar:
+            self.baixar()
+            with self.captureOnCommitCallbacks(execute=True):
+                tramitacao = Tramitacao.objects.get(pk=self.tramitacao.pk)
+                tramitacao.parecer = "Favorável"
+                tramitacao.save()
+            self.baixar()
+        self.assertEqual(gerar.call_count, 2)
+
+    def test_reduzir_cache_remove_os_usados_ha_mais_tempo(self):
+        for i, chave in enumerate(("a", "b", "c")):
+            guardar_em_cache(chave, b"x" * 100)
+            os.utime(_caminho(chave), (time.time() - 100 + i, time.time() - 100 + i))
+        pdf_em_cache("a")  # uso recente: passa à frente
+
+        # 300 bytes com limite de 250: desce até 90% do limite
+        self.assertEqual(reduzir_cache(250), (1, 100))
+        self.assertIsNone(pdf_em_cache("b"))
+        self.assertIsNotNone(pdf_em_cache("a"))
+        self.assertIsNotNone(pdf_em_cache("c"))
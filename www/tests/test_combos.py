@@ -0,0 +1,78 @@
+"""Testes da busca remota das combos (www/views_combos.py e BuscaRemotaSelect)."""
+
+import datetime
+
+from django.urls import reverse
+
+from www.forms import TramitacaoForm
+from www.models import Autor, Reuniao
+from www.tests.base import BaseTeste
+
+
+class BuscaCombosTests(BaseTeste):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.usuario = cls.criar_usuario("usuario", comissao=cls.ccj)
+        cls.maria = Autor.objects.create(nome="Maria da Silva", sexo="F")
+        cls.joao = Autor.objects.create(nome="João Silveira", sexo="M")
+        Autor.objects.create(nome="Silvio Antigo", sexo="M", ativo=False)
+        for i in range(1, 4):
+            Reuniao.objects.create(
+                comissao=cls.ccj, tipo="ORDINÁRIA", numero=i,
+                data=datetime.date(2024, 3, i), hora=datetime.time(10),
+            )
+        cls.extra = Reuniao.objects.create(
+            comissao=cls.cfo, tipo="EXTRAORDINÁRIA", numero=1,
+            data=datetime.date(2025, 5, 2), hora=datetime.time(9),
+        )
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.usuario)
+
+    def buscar(self, nome, **params):
+        resposta = self.client.get(reverse(nome), params)
+        self.assertEqual(resposta.status_code, 200)
+        return resposta.json()
+
+    def autores(self, **params):
+        return [item["texto"] for item in self.buscar("busca_autores", **params)["resultados"]]
+
+    def test_autores_por_prefixo_de_nome_ou_sobrenome(self):
+        self.assertEqual(self.autores(q="silv"), ["João Silveira", "Maria da Silva"])
+        self.assertEqual(self.autores(q="ma sil"), ["Maria da Silva"])
+        self.assertEqual(self.autores(q="silvio"), [])
+        self.assertEqual(self.autores(q="silvio", inativos=1), ["Silvio Antigo"])
+
+    def test_reunioes_por_comissao_ordem_e_ano(self):
+        dados = self.buscar("busca_reunioes", comissao=self.ccj.pk)
+        self.assertEqual([item["texto"][:2] for item in dados["resultados"]], ["3ª", "2ª", "1ª"])
+        self.assertEqual({item["comissao"] for item in dados["resultados"]}, {self.ccj.pk})
+
+        dados = self.buscar("busca_reunioes", q="extra 2025")
+        self.assertEqual([item["id"] for item in dados["resultados"]], [self.extra.pk])
+        self.assertEqual(len(self.buscar("busca_reunioes", q="2ª 2024")["resultados"]), 1)
+
+    def test_limite_e_mais(self):
+        dados = self.buscar("busca_reunioes", limite=2)
+        self.assertEqual(len(dados["resultados"]), 2)
+        self.assertTrue(dados["mais"])
+        self.assertFalse(self.buscar("busca_reunioes", limite=1000)["mais"])
+        self.assertEqual(len(self.buscar("busca_reunioes", limite="x")["resultados"]), 4)
+
+    def test_exige_login(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse("busca_autores")).status_code, 302)
+
+    def test_formulario_so_renderiza_a_opcao_escolhida(self):
+        form = TramitacaoForm(instance=self.tramitacao)
+        self.assertEqual(str(form["relator"]).count("<option"), 1)
+
+        self.tramitacao.relator = self.maria
+        html = str(TramitacaoForm(instance=self.tramitacao)["relator"])
+        self.assertEqual(html.count("<option"), 2)
+        self.assertIn("Maria da Silva", html)
+        self.assertNotIn("João Silveira", html)
+        self.assertIn(f'data-busca-url="{reverse("busca_autores")}"', html)
@@ -0,0 +1,58 @@
+"""Testes do GET condicional (www/condicional.py)."""
+
+import datetime
+from unittest import mock
+
+from django.conf import settings
+from django.test import RequestFactory
+from django.urls import reverse
+
+from www.tests.base import BaseTeste
+from www.views_relatorios import RelatorioDossiePDFView
+
+
+class GetCondicionalTests(BaseTeste):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.usuario = cls.criar_usuario("usuario", comissao=cls.ccj)
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.usuario)
+        self.url = reverse("tramitacao_detail", args=[self.proposicao.pk, self.tramitacao.pk])
+
+    def test_304_vira_200_depois_de_editar(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # A invalidação das versões roda no commit da transação
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tramitacao.parecer = "Favorável"
+            self.tramitacao.save()
+
+        resposta = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertNotEqual(resposta["ETag"], etag)
+
+    def test_novo_segredo_csrf_muda_o_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        # Sem o cookie antigo (ex.: novo login), o formulário do "sair" muda
+        del self.client.cookies[settings.CSRF_COOKIE_NAME]
+        resposta = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertNotEqual(resposta["ETag"], etag)
+
+    def test_etag_do_dossie_muda_com_o_dia(self):
+        request = RequestFactory().get("/")
+        request.user = self.usuario
+        view = RelatorioDossiePDFView()
+
+        with mock.patch("www.views_relatorios.localdate", return_value=self.hoje):
+            hoje, _ = view.versao_condicional(request, self.proposicao.pk)
+        amanha_data = self.hoje + datetime.timedelta(days=1)
+        with mock.patch("www.views_relatorios.localdate", return_value=amanha_data):
+            amanha, _ = view.versao_condicional(request, self.proposicao.pk)
+        self.assertNotEqual(hoje, amanha)
@@ -0,0 +1,60 @@
+"""Testes da massa sintética e da medição das telas."""
+
+import io
+import json
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from www.models import ParecerVencido, Proposicao, Reuniao, Tramitacao
+from www.tests.base import BaseTeste
+
+
+class DadosSinteticosTests(BaseTeste):
+
+    def gerar(self, *args):
+        call_command(
+            "gerar_dados_sinteticos",
+            "--proposicoes", "30", "--tramitacoes", "60", "--reunioes", "12",
+            "--pareceres-vencidos", "5", "--autores", "8", "--comissoes", "3",
+            "--anos", "2", "--tamanho-texto", "300", *args,
+            stdout=io.StringIO(),
+        )
+
+    def test_recusa_banco_com_dados(self):
+        with self.assertRaisesMessage(CommandError, "O banco já tem proposições"):
+            self.gerar()
+
+    def test_gera_e_mede(self):
+        self.gerar("--acrescentar")
+        self.assertEqual(Proposicao.objects.count(), 31)
+        self.assertEqual(Tramitacao.objects.count(), 61)
+        self.assertEqual(Reuniao.objects.count(), 12)
+        self.assertEqual(ParecerVencido.objects.count(), 5)
+        # Estado derivado recalculado no fim
+        self.assertFalse(
+            Proposicao.objects
+            .filter(tramitacoes__isnull=False, tramitacao_atual__isnull=True)
+            .exists()
+        )
+
+        # Medição das telas (sem PDFs) sobre a massa gerada
+        self.criar_usuario("admin", superusuario=True)
+        descritor, saida = tempfile.mkstemp(suffix=".json")
+        os.close(descritor)
+        self.addCleanup(os.remove, saida)
+        call_command(
+            "medir_desempenho", "--sem-pdf", "--repeticoes", "2", "--aquecimento", "0",
+            "--saida", saida, stdout=io.StringIO(),
+        )
+        with open(saida, encoding="utf-8") as arquivo:
+            relatorio = json.load(arquivo)
+
+        self.assertEqual(relatorio["volume"]["proposicoes"], 31)
+        telas = relatorio["telas"]
+        self.assertIn("dashboard", telas)
+        self.assertFalse([nome for nome, tela in telas.items() if "erro" in tela])
+        self.assertFalse([nome for nome in telas if nome.startswith("pdf_")])
+        self.assertEqual(telas["proposicoes"]["repeticoes"], 2)
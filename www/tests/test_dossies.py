@@ -0,0 +1,104 @@
+"""Testes da exportação de dossiês em lote (www/dossies.py)."""
+
+import datetime
+import io
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.urls import reverse
+
+from www.dossies import (
+    arquivos_do_lote,
+    dossies_queryset,
+    gerar_dossies,
+    impressao_digital_dossie,
+    zip_em_fluxo,
+)
+from www.models import Proposicao
+from www.tests.base import BaseTeste
+
+
+def pdf_falso(html):
+    if "Ementa 3" in html:
+        raise ValueError("falhou")
+    return b"%PDF-" + html[-20:].encode("utf-8")
+
+
+# O pool de processos (spawn) vira um pool de threads: a orquestração é a
+# mesma, e o gerar_pdf trocado vale para as threads
+@mock.patch("www.dossies._novo_pool", lambda processos: ThreadPoolExecutor(processos))
+@mock.patch("www.dossies.gerar_pdf", side_effect=pdf_falso)
+class GerarDossiesTests(BaseTeste):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for i in range(2, 6):
+            cls.criar_proposicao(i)
+        cls.usuario = cls.criar_usuario("admin", superusuario=True)
+
+    def gerar(self, **kwargs):
+        return list(gerar_dossies(Proposicao.objects.order_by("numero"), processos=2, **kwargs))
+
+    def test_ordem_falhas_e_cache(self, gerar_pdf):
+        resultado = self.gerar()
+        self.assertEqual([p.pk for p, *_ in resultado], [f"2025{i:07d}" for i in range(1, 6)])
+        self.assertEqual(gerar_pdf.call_count, 5)
+
+        erros = {p.pk: erro for p, _, _, erro in resultado if erro}
+        self.assertEqual(erros, {"20250000003": "ValueError: falhou"})
+
+        # Segunda vez: só a que falhou volta ao WeasyPrint
+        gerar_pdf.reset_mock()
+        segundo = self.gerar()
+        self.assertEqual(gerar_pdf.call_count, 1)
+        self.assertEqual([pdf for *_, pdf, _ in segundo], [pdf for *_, pdf, _ in resultado])
+
+    def test_ignorar_pula_as_ja_recebidas(self, gerar_pdf):
+        resultado = self.gerar(ignorar={"20250000001", "20250000002"})
+        self.assertEqual([p.pk for p, *_ in resultado], ["20250000003", "20250000004", "20250000005"])
+
+    def test_zip_com_erros_no_fim(self, gerar_pdf):
+        conteudo = b"".join(zip_em_fluxo(arquivos_do_lote(self.gerar())))
+        with zipfile.ZipFile(io.BytesIO(conteudo)) as zf:
+            self.assertEqual(zf.namelist(), [
+                "dossie_20250000001.pdf", "dossie_20250000002.pdf",
+                "dossie_20250000004.pdf", "dossie_20250000005.pdf", "ERROS.txt",
+            ])
+            self.assertEqual(zf.read("ERROS.txt"), b"20250000003\tValueError: falhou\n")
+
+    def test_download_na_tela_continua_apos_o_ultimo(self, gerar_pdf):
+        self.client.force_login(self.usuario)
+        with mock.patch("www.dossies.pool_web", return_value=ThreadPoolExecutor(2)):
+            resposta = self.client.get(
+                reverse("proposicao_dossies_zip"), {"comissao": "", "apos": "20250000003"}
+            )
+            conteudo = b"".join(resposta.streaming_content)
+
+        self.assertEqual(resposta["X-Total-Dossies"], "2")
+        self.assertEqual(
+            resposta["Content-Disposition"], 'attachment; filename="dossies_apos_20250000003.zip"'
+        )
+        with zipfile.ZipFile(io.BytesIO(conteudo)) as zf:
+            self.assertEqual(zf.namelist(), ["dossie_20250000004.pdf", "dossie_20250000005.pdf"])
+
+
+class ImpressaoDigitalDossieTests(BaseTeste):
+
+    def test_chave_muda_com_usuario_dia_e_dados(self):
+        usuario = self.criar_usuario("usuario", comissao=self.ccj)
+        outro = self.criar_usuario("outro", comissao=self.ccj)
+
+        def chave(quem=usuario, dia=self.hoje):
+            proposicao = dossies_queryset().get(pk=self.proposicao.pk)
+            with mock.patch("www.dossies.localdate", return_value=dia):
+                return impressao_digital_dossie(proposicao, quem)
+
+        inicial = chave()
+        self.assertEqual(chave(), inicial)
+        self.assertNotEqual(chave(quem=outro), inicial)
+        self.assertNotEqual(chave(dia=self.hoje + datetime.timedelta(days=1)), inicial)
+
+        Proposicao.objects.filter(pk=self.proposicao.pk).update(ementa="Nova ementa")
+        self.assertNotEqual(chave(), inicial)
@@ -0,0 +1,58 @@
+"""Testes do estado atual persistido na proposição (www/models.py)."""
+
+import datetime
+import io
+
+from django.core.management import call_command
+
+from www.models import Autor, Proposicao, Tramitacao
+from www.tests.base import BaseTeste
+
+
+class EstadoAtualTests(BaseTeste):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.relator = Autor.objects.create(nome="Relator", sexo="M")
+
+    def estado(self):
+        return Proposicao.objects.values(
+            "tramitacao_atual", "comissao_atual", "relator_atual",
+            "data_entrada_atual", "aguardando_parecer",
+        ).get(pk=self.proposicao.pk)
+
+    def test_nova_tramitacao_vira_a_atual(self):
+        self.assertEqual(self.estado()["comissao_atual"], self.ccj.pk)
+        self.assertTrue(self.estado()["aguardando_parecer"])
+
+        nova = Tramitacao.objects.create(
+            proposicao=self.proposicao, comissao=self.cfo,
+            data_entrada=self.hoje + datetime.timedelta(days=1), relator=self.relator,
+        )
+        estado = self.estado()
+        self.assertEqual(estado["tramitacao_atual"], nova.pk)
+        self.assertEqual(estado["comissao_atual"], self.cfo.pk)
+        self.assertEqual(estado["relator_atual"], self.relator.pk)
+        self.assertEqual(estado["data_entrada_atual"], nova.data_entrada)
+        self.assertFalse(estado["aguardando_parecer"])
+
+        nova.delete()
+        estado = self.estado()
+        self.assertEqual(estado["tramitacao_atual"], self.tramitacao.pk)
+        self.assertEqual(estado["comissao_atual"], self.ccj.pk)
+
+    def test_sem_tramitacao_nao_aguarda_parecer(self):
+        self.tramitacao.delete()
+        estado = self.estado()
+        self.assertIsNone(estado["tramitacao_atual"])
+        self.assertIsNone(estado["comissao_atual"])
+        self.assertFalse(estado["aguardando_parecer"])
+
+    def test_comando_reconstroi_o_estado(self):
+        # update() não dispara os sinais: o estado fica velho até o comando
+        Tramitacao.objects.filter(pk=self.tramitacao.pk).update(comissao=self.cfo)
+        self.assertEqual(self.estado()["comissao_atual"], self.ccj.pk)
+
+        call_command("recalcular_estado_proposicoes", stdout=io.StringIO())
+        self.assertEqual(self.estado()["comissao_atual"], self.cfo.pk)
@@ -0,0 +1,68 @@
+"""Testes da exportação em CSV/XLSX (www/exportacao.py)."""
+
+import datetime
+import io
+
+from django.urls import reverse
+from openpyxl import load_workbook
+
+from www.exportacao import linhas_csv, pedacos_xlsx
+from www.models import Proposicao
+from www.tests.base import BaseTeste
+
+
+class ExportacaoTests(BaseTeste):
+
+    def test_csv(self):
+        conteudo = "".join(linhas_csv(
+            ("Número", "Ementa", "Data", "Aguardando"),
+            [("1/2025", "Texto; com separador", datetime.date(2025, 3, 10), True)],
+        ))
+        self.assertEqual(
+            conteudo,
+            '\ufeffNúmero;Ementa;Data;Aguardando\r\n1/2025;"Texto; com separador";10/03/2025;Sim\r\n',
+        )
+
+    def test_texto_que_seria_formula_ganha_apostrofo(self):
+        linhas = [("=HYPERLINK(\"x\")",), ("+1",), ("-2",), ("@SOMA(A1)",), ("Normal",)]
+        esperado = ["'=HYPERLINK(\"x\")", "'+1", "'-2", "'@SOMA(A1)", "Normal"]
+
+        csv = "".join(linhas_csv(("Texto",), linhas)).splitlines()[1:]
+        self.assertEqual([linha.replace('""', '"').strip('"') for linha in csv], esperado)
+
+        folha = load_workbook(io.BytesIO(b"".join(pedacos_xlsx(("Texto",), linhas)))).active
+        self.assertEqual([c.value for (c,) in folha.iter_rows(min_row=2)], esperado)
+        self.assertFalse(any(c.data_type == "f" for (c,) in folha.iter_rows()))
+
+    def test_xlsx(self):
+        agora = datetime.datetime(2025, 3, 10, 14, 30)
+        conteudo = b"".join(pedacos_xlsx(
+            ("Número", "Quando", "Texto"),
+            [("1/2025", agora, "com \x07 controle")],
+            titulo="Proposições: lista",
+        ))
+        folha = load_workbook(io.BytesIO(conteudo)).active
+        self.assertEqual(folha.title, "Proposições  lista")
+        self.assertEqual(folha.freeze_panes, "A2")
+        self.assertTrue(folha["A1"].font.bold)
+        self.assertEqual(folha["B2"].value, agora)
+        self.assertEqual(folha["C2"].value, "com  controle")
+
+    def test_tela_exporta_com_os_filtros(self):
+        self.criar_proposicao(2)
+        Proposicao.objects.filter(pk="20250000002").update(ementa="=1+1")
+        self.client.force_login(self.criar_usuario("admin", superusuario=True))
+        url = reverse("proposicao_exportar", args=["csv"])
+
+        resposta = self.client.get(url, {"comissao": ""})
+        self.assertEqual(resposta["Content-Disposition"], 'attachment; filename="proposicoes.csv"')
+        linhas = b"".join(resposta.streaming_content).decode("utf-8-sig").splitlines()
+        self.assertEqual(len(linhas), 3)
+        self.assertTrue(linhas[2].startswith("20250000002;2/2025;Projeto de Lei;'=1+1;"))
+
+        # Filtro da tela: na CFO só entra a proposição ainda sem tramitação
+        resposta = self.client.get(url, {"comissao": self.cfo.pk})
+        linhas = b"".join(resposta.streaming_content).decode("utf-8-sig").splitlines()
+        self.assertEqual([linha.split(";")[0] for linha in linhas[1:]], ["20250000002"])
+
+        self.assertEqual(self.client.get(reverse("proposicao_exportar", args=["pdf"])).status_code, 404)
@@ -0,0 +1,66 @@
+"""Testes das versões do cache de fragmentos (www/fragmentos.py)."""
+
+import datetime
+
+from django.core.cache import caches
+from django.urls import reverse
+
+from www.fragmentos import CADASTROS, invalidar_fragmentos, versao_fragmento
+from www.models import Autor, ParecerVencido, Reuniao, Tramitacao
+from www.tests.base import BaseTeste
+
+
+class VersoesDeFragmentoTests(BaseTeste):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.relator = Autor.objects.create(nome="Relatora", sexo="F")
+        cls.reuniao = Reuniao.objects.create(
+            comissao=cls.ccj, tipo="ORDINÁRIA", numero=1,
+            data=cls.hoje, hora=datetime.time(10),
+        )
+
+    def versao(self):
+        return versao_fragmento(Tramitacao.objects.get(pk=self.tramitacao.pk))
+
+    def assertMudaDepoisDoCommit(self, escrever):
+        antes = self.versao()
+        with self.captureOnCommitCallbacks(execute=True):
+            escrever()
+        self.assertNotEqual(self.versao(), antes)
+
+    def test_o_que_muda_a_versao_da_tramitacao(self):
+        self.assertEqual(self.versao(), self.versao())
+
+        # A reunião citada pela tramitação
+        Tramitacao.objects.filter(pk=self.tramitacao.pk).update(reuniao=self.reuniao)
+        self.assertMudaDepoisDoCommit(lambda: Reuniao.objects.get(pk=self.reuniao.pk).save())
+
+        # Um voto vencido dela
+        self.assertMudaDepoisDoCommit(lambda: ParecerVencido.objects.create(
+            tramitacao=self.tramitacao, reuniao=self.reuniao, relator=self.relator,
+            parecer="contrário", data_apresentacao=self.hoje,
+        ))
+
+        # Qualquer autor ou comissão (contador geral)
+        self.assertMudaDepoisDoCommit(lambda: self.relator.save())
+
+    def test_contadores_no_cache_dos_fragmentos(self):
+        self.versao()
+        self.assertTrue(caches["template_fragments"].get(f"fragmentos:versao:{CADASTROS}"))
+        self.assertIsNone(caches["default"].get(f"fragmentos:versao:{CADASTROS}"))
+
+    def test_pagina_usa_o_bloco_guardado_ate_a_invalidacao(self):
+        self.client.force_login(self.criar_usuario("usuario", comissao=self.ccj))
+        url = reverse("tramitacao_detail", args=[self.proposicao.pk, self.tramitacao.pk])
+        Tramitacao.objects.filter(pk=self.tramitacao.pk).update(relator=self.relator)
+        invalidar_fragmentos(f"www.tramitacao:{self.tramitacao.pk}")
+        self.assertContains(self.client.get(url), "Relatora")
+
+        # update() não dispara signals nem muda alterada_em: o bloco continua o guardado
+        Autor.objects.filter(pk=self.relator.pk).update(nome="Outra Relatora")
+        self.assertNotContains(self.client.get(url), "Outra Relatora")
+
+        invalidar_fragmentos(CADASTROS)
+        self.assertContains(self.client.get(url), "Outra Relatora")
@@ -0,0 +1,69 @@
+"""Testes do comando importar_proposicoes."""
+
+import io
+import os
+import tempfile
+
+from django.core.management import call_command
+
+from www.models import Autor, Proposicao
+from www.tests.base import BaseTeste
+
+PLANILHA = """numero;numero_formatado;ementa;data_publicacao;link;tipo;autor
+20250000101;101/2025;Institui a semana da leitura;10/03/2025;;PL;Fulano de Tal
+20250000101;101/2025;Institui a semana da leitura;10/03/2025;;PL;Beltrana
+20250000102;102/2025;Cria o programa de hortas;2025-03-11;;PL;fulano  de tal
+20250000103;103/2025;Tipo inexistente;10/03/2025;;XYZ;Fulano de Tal
+20250000104;104/2025;Sem data;;;PL;Beltrana
+"""
+
+
+class ImportarProposicoesTests(BaseTeste):
+
+    def setUp(self):
+        super().setUp()
+        descritor, self.arquivo = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(descritor, "w", encoding="utf-8") as arquivo:
+            arquivo.write(PLANILHA)
+        self.addCleanup(os.remove, self.arquivo)
+
+    def importar(self, *args):
+        saida = io.StringIO()
+        call_command("importar_proposicoes", self.arquivo, *args, stdout=saida)
+        return saida.getvalue()
+
+    def test_importa_e_rejeita_com_motivo(self):
+        saida = self.importar()
+        self.assertIn("2 proposição(ões) criada(s)", saida)
+        self.assertIn("tipo desconhecido: 'XYZ'", saida)
+        self.assertIn("sem data de publicação", saida)
+
+        proposicao = Proposicao.objects.get(pk="20250000101")
+        self.assertEqual(
+            sorted(proposicao.autores.values_list("nome", flat=True)),
+            ["Beltrana", "Fulano de Tal"],
+        )
+        # "fulano  de tal" é o mesmo autor
+        self.assertEqual(Autor.objects.count(), 2)
+
+    def test_segunda_importacao_nao_muda_nada(self):
+        self.importar()
+        estado = list(Proposicao.objects.order_by("pk").values_list())
+        vinculos = Proposicao.autores.through.objects.count()
+
+        saida = self.importar()
+        self.assertIn("0 proposição(ões) criada(s), 0 atualizada(s), 0 autor(es) novo(s), "
+                      "0 vínculo(s) de autoria novo(s)", saida)
+        self.assertEqual(list(Proposicao.objects.order_by("pk").values_list()), estado)
+        self.assertEqual(Proposicao.autores.through.objects.count(), vinculos)
+
+    def test_data_padrao_e_atualizacao(self):
+        self.importar()
+        Proposicao.objects.filter(pk="20250000102").update(ementa="Ementa antiga")
+
+        saida = self.importar("--data-padrao", "01/01/2025")
+        self.assertIn("1 proposição(ões) criada(s), 1 atualizada(s)", saida)
+        self.assertEqual(
+            Proposicao.objects.get(pk="20250000104").data_publicacao.isoformat(), "2025-01-01"
+        )
+        self.assertEqual(Proposicao.objects.get(pk="20250000102").ementa, "Cria o programa de hortas")
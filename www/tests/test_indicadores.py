@@ -0,0 +1,96 @@
+"""Testes dos indicadores do dashboard (www/indicadores.py)."""
+
+import datetime
+
+from django.core.cache import cache
+
+from www.indicadores import (
+    calcular_indicadores,
+    calcular_indicadores_por_comissao,
+    obter_indicadores,
+)
+from www.models import Autor, Tramitacao
+from www.tests.base import BaseTeste
+
+
+class IndicadoresEmCacheTests(BaseTeste):
+
+    def nova_tramitacao(self, comissao):
+        proposicao = self.criar_proposicao(Tramitacao.objects.count() + 100)
+        return Tramitacao.objects.create(
+            proposicao=proposicao, comissao=comissao, data_entrada=self.hoje,
+        )
+
+    def test_invalida_depois_do_commit(self):
+        self.assertEqual(obter_indicadores(self.ccj)["total"], 1)
+        self.assertEqual(obter_indicadores()["total"], 1)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.nova_tramitacao(self.ccj)
+        # Antes do commit, o cache ainda responde com a versão anterior
+        self.assertEqual(obter_indicadores(self.ccj)["total"], 1)
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(obter_indicadores(self.ccj)["total"], 2)
+        self.assertEqual(obter_indicadores()["total"], 2)
+
+    def test_mover_tramitacao_invalida_as_duas_comissoes(self):
+        self.assertEqual(obter_indicadores(self.ccj)["total"], 1)
+        self.assertEqual(obter_indicadores(self.cfo)["total"], 0)
+
+        tramitacao = Tramitacao.objects.get(pk=self.tramitacao.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            tramitacao.comissao = self.cfo
+            tramitacao.save()
+
+        self.assertEqual(obter_indicadores(self.ccj)["total"], 0)
+        self.assertEqual(obter_indicadores(self.cfo)["total"], 1)
+
+    def test_versao_expulsa_nao_volta_a_indicadores_antigos(self):
+        obter_indicadores(self.ccj)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.nova_tramitacao(self.ccj)
+        self.assertEqual(obter_indicadores(self.ccj)["total"], 2)
+
+        # Só os contadores somem: as entradas de indicadores continuam lá
+        cache.delete_many(["dashboard:versao:global", f"dashboard:versao:comissao-{self.ccj.pk}"])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.nova_tramitacao(self.ccj)
+        self.assertEqual(obter_indicadores(self.ccj)["total"], 3)
+
+
+class MotorDeIndicadoresTests(BaseTeste):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        relator = Autor.objects.create(nome="Relator", sexo="F")
+        antes = cls.hoje - datetime.timedelta(days=40)
+        for i, comissao, data_entrada, com_relator in (
+            (2, cls.ccj, antes, True),
+            (3, cls.cfo, cls.hoje - datetime.timedelta(days=3), False),
+            (4, cls.cfo, antes, True),
+        ):
+            Tramitacao.objects.create(
+                proposicao=cls.criar_proposicao(i), comissao=comissao,
+                data_entrada=data_entrada, relator=relator if com_relator else None,
+            )
+        cls.criar_proposicao(5)  # sem tramitação: só entra na visão global
+
+    def test_uma_passada_igual_ao_calculo_por_comissao(self):
+        todas = calcular_indicadores_por_comissao()
+        self.assertEqual(todas[None], calcular_indicadores())
+        self.assertEqual(todas[self.ccj.pk], calcular_indicadores(self.ccj))
+        self.assertEqual(todas[self.cfo.pk], calcular_indicadores(self.cfo))
+
+    def test_valores(self):
+        ccj = calcular_indicadores(self.ccj)
+        self.assertEqual(ccj["total"], 2)
+        self.assertEqual(ccj["aguardando_parecer"], 1)
+        self.assertEqual(ccj["entradas_periodo"], 1)
+        self.assertEqual(ccj["tempo_medio"], 20.0)
+
+        globais = calcular_indicadores()
+        self.assertEqual(globais["total"], 5)
+        self.assertEqual(globais["aguardando_parecer"], 2)
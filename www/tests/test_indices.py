@@ -0,0 +1,47 @@
+"""Testes dos índices das consultas das telas (comando verificar_indices)."""
+
+import datetime
+import io
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from www.models import Reuniao
+from www.tests.base import BaseTeste
+
+
+class VerificarIndicesTests(BaseTeste):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        Reuniao.objects.create(
+            comissao=cls.ccj, tipo="ORDINÁRIA", numero=1,
+            data=cls.hoje, hora=datetime.time(10),
+        )
+
+    def test_consultas_quentes_usam_indice(self):
+        saida = io.StringIO()
+        call_command("verificar_indices", "--repeticoes", "1", stdout=saida)
+        resultado = {
+            linha[2:linha.rindex("  (")]: linha[0]
+            for linha in saida.getvalue().splitlines()
+            if linha[:1] in ("✔", "✘")
+        }
+        # O plano das demais depende das estatísticas (ANALYZE) do banco real
+        for nome in (
+            "Última tramitação da proposição",
+            "Tramitações da proposição (TramitacaoListView)",
+            "Proposições do tipo, página por chave (ProposicaoListView)",
+            "Reuniões da comissão no ano (ReuniaoListView)",
+            "Situação da comissão (RelatorioSituacaoComissaoView)",
+        ):
+            self.assertEqual(resultado[nome], "✔", nome)
+
+
+class VerificarIndicesSemDadosTests(TestCase):
+
+    def test_banco_sem_tramitacoes(self):
+        with self.assertRaisesMessage(CommandError, "Banco sem tramitações"):
+            call_command("verificar_indices", stdout=io.StringIO())
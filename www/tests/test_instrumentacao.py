@@ -0,0 +1,52 @@
+"""Testes da instrumentação das consultas por requisição (www/instrumentacao.py)."""
+
+from django.db import connection
+from django.test import override_settings
+from django.urls import reverse
+
+from www.instrumentacao import RegistroConsultas, impressao_digital_sql
+from www.models import Tramitacao
+from www.tests.base import BaseTeste
+
+
+class InstrumentacaoTests(BaseTeste):
+
+    def test_formato_sem_valores(self):
+        sql = "SELECT * FROM t WHERE a = 12 AND b = 'x''y' AND c IN (%s, %s, %s)"
+        self.assertEqual(
+            impressao_digital_sql(sql), "SELECT * FROM t WHERE a = ? AND b = ? AND c IN (...)"
+        )
+
+    def test_consulta_por_item_aparece_como_repetida(self):
+        for i in range(2, 5):
+            Tramitacao.objects.create(
+                proposicao=self.criar_proposicao(i), comissao=self.ccj, data_entrada=self.hoje,
+            )
+
+        registro = RegistroConsultas()
+        with connection.execute_wrapper(registro):
+            for tramitacao in Tramitacao.objects.all():
+                tramitacao.proposicao  # sem select_related: uma consulta por tramitação
+
+        self.assertEqual(registro.quantidade, 5)
+        [(formato, vezes, origem)] = registro.repetidas(3)
+        self.assertEqual(vezes, 4)
+        self.assertIn('FROM "www_proposicao"', formato)
+        self.assertIn("www/tests/test_instrumentacao.py", origem)
+
+    def test_desligada_nao_mede(self):
+        self.client.force_login(self.criar_usuario("usuario", comissao=self.ccj))
+        resposta = self.client.get(reverse("proposicao_list"))
+        self.assertNotIn("X-Consultas-SQL", resposta)
+
+    @override_settings(INSTRUMENTACAO_CONSULTAS=True)
+    def test_cabecalhos_da_resposta(self):
+        self.client.force_login(self.criar_usuario("usuario", comissao=self.ccj))
+        with self.assertLogs("www.instrumentacao", "INFO") as logs:
+            resposta = self.client.get(reverse("proposicao_list"))
+
+        self.assertGreater(int(resposta["X-Consultas-SQL"]), 0)
+        self.assertEqual(resposta["X-Consultas-N-Mais-1"], "0")
+        self.assertIn("X-Template-Tempo-ms", resposta)
+        self.assertTrue(resposta["Server-Timing"].startswith("sql;dur="))
+        self.assertIn("GET /", logs.output[0])
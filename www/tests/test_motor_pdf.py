@@ -0,0 +1,87 @@
+"""Testes do motor do WeasyPrint aquecido (www/motor_pdf.py)."""
+
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from www import motor_pdf
+from www.motor_pdf import ORIGEM_LOCAL, BuscadorLocal, escrever_pdf
+
+
+class BuscadorLocalTests(SimpleTestCase):
+
+    def setUp(self):
+        pasta = tempfile.TemporaryDirectory()
+        self.addCleanup(pasta.cleanup)
+        self.midia = Path(pasta.name)
+        (self.midia / "uploads").mkdir()
+        (self.midia / "uploads" / "brasão 1.png").write_bytes(b"png")
+        configuracao = override_settings(
+            MEDIA_ROOT=str(self.midia), MEDIA_URL="/media/", ALLOWED_HOSTS=[".camara.leg.br"],
+        )
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+        self.buscador = BuscadorLocal()
+
+    def test_media_sai_do_disco(self):
+        self.assertEqual(
+            self.buscador.arquivo_local(ORIGEM_LOCAL + "media/uploads/bras%C3%A3o%201.png"),
+            (self.midia / "uploads" / "brasão 1.png").resolve(),
+        )
+        # Host de ALLOWED_HOSTS também é local
+        self.assertIsNotNone(
+            self.buscador.arquivo_local("https://camara.leg.br/media/uploads/bras%C3%A3o%201.png")
+        )
+
+    def test_static_pelos_finders(self):
+        caminho = self.buscador.arquivo_local(ORIGEM_LOCAL + "static/www/pdf.css")
+        self.assertEqual(caminho, motor_pdf.FOLHAS_COMUNS[0])
+
+    def test_fora_da_raiz_ou_de_outro_host(self):
+        (self.midia.parent / "segredo.txt").touch()
+        self.addCleanup((self.midia.parent / "segredo.txt").unlink)
+        self.assertIsNone(self.buscador.arquivo_local(ORIGEM_LOCAL + "media/../segredo.txt"))
+        self.assertIsNone(self.buscador.arquivo_local(ORIGEM_LOCAL + "media/uploads/"))
+        self.assertIsNone(self.buscador.arquivo_local("https://exemplo.com/media/uploads/x.png"))
+        self.assertIsNone(self.buscador.arquivo_local("file:///etc/passwd"))
+
+    def test_fetch_local_sem_http(self):
+        with mock.patch.object(motor_pdf, "URLFetcherResponse") as resposta:
+            self.buscador.fetch(ORIGEM_LOCAL + "media/uploads/bras%C3%A3o%201.png")
+        resposta.assert_called_once_with(
+            ORIGEM_LOCAL + "media/uploads/bras%C3%A3o%201.png", b"png", {"Content-Type": "image/png"},
+        )
+        with self.assertRaises(ValueError):
+            self.buscador.fetch(ORIGEM_LOCAL + "media/uploads/nao-existe.png")
+
+
+class MotorAquecidoTests(SimpleTestCase):
+
+    def setUp(self):
+        motor_pdf._local.__dict__.pop("contexto", None)
+        self.addCleanup(motor_pdf._local.__dict__.pop, "contexto", None)
+
+    def test_contexto_reaproveitado_entre_pdfs(self):
+        with mock.patch.object(motor_pdf, "FontConfiguration") as fontes:
+            escrever_pdf("<p>1</p>")
+            escrever_pdf("<p>2</p>")
+        fontes.assert_called_once_with()
+
+    @override_settings(PDF_CACHE_IMAGENS=1)
+    def test_cache_de_imagens_esvaziado_entre_pdfs(self):
+        escrever_pdf("<p>1</p>")
+        imagens = motor_pdf._local.contexto["imagens"]
+        imagens.update({"a": 1, "b": 2})
+        with mock.patch.object(motor_pdf, "HTML") as html:
+            escrever_pdf("<p>2</p>")
+        self.assertEqual(imagens, {})
+        html.return_value.write_pdf.assert_called_once()
+        self.assertIs(html.return_value.write_pdf.call_args.kwargs["cache"], imagens)
+
+    def test_destino_em_arquivo(self):
+        with tempfile.TemporaryDirectory() as pasta:
+            destino = Path(pasta) / "saida.pdf"
+            self.assertIsNone(escrever_pdf("<p>x</p>", destino))
+            self.assertTrue(destino.read_bytes().startswith(b"%PDF"))
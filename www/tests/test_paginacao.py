@@ -0,0 +1,51 @@
+"""Testes da paginação por chave (www/paginacao.py)."""
+
+from django.urls import reverse
+
+from www.tests.base import BaseTeste
+
+
+class PaginacaoPorChaveTests(BaseTeste):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for i in range(2, 26):
+            cls.criar_proposicao(i)
+        # Superusuário: vê todas as proposições, sem a restrição por comissão
+        cls.usuario = cls.criar_usuario("admin", superusuario=True)
+
+    def pagina(self, **params):
+        self.client.force_login(self.usuario)
+        resposta = self.client.get(reverse("proposicao_list"), {"comissao": "", **params})
+        self.assertEqual(resposta.status_code, 200)
+        return resposta.context["page_obj"]
+
+    def numeros(self, pagina):
+        return [p.numero for p in pagina.object_list]
+
+    def test_token_vai_e_volta(self):
+        primeira = self.pagina()
+        self.assertEqual(len(primeira), 20)
+        self.assertTrue(primeira.has_next())
+
+        segunda = self.pagina(apos=primeira.token_proxima)
+        self.assertEqual(segunda.number, 2)
+        self.assertEqual(len(segunda), 5)
+        self.assertFalse(segunda.has_next())
+        self.assertFalse(set(self.numeros(primeira)) & set(self.numeros(segunda)))
+
+        de_volta = self.pagina(antes=segunda.token_anterior)
+        self.assertEqual(de_volta.number, 1)
+        self.assertEqual(self.numeros(de_volta), self.numeros(primeira))
+
+    def test_token_adulterado_volta_para_a_primeira_pagina(self):
+        primeira = self.pagina()
+        token = primeira.token_proxima
+        adulterado = token[:-1] + ("A" if token[-1] != "A" else "B")
+
+        pagina = self.pagina(apos=adulterado)
+        self.assertEqual(pagina.number, 1)
+        self.assertEqual(self.numeros(pagina), self.numeros(primeira))
+
+
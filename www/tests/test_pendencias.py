@@ -0,0 +1,72 @@
+"""Testes das pendências documentais das reuniões (Reuniao.pendencias)."""
+
+import datetime
+
+from django.urls import reverse
+
+from www.models import Reuniao
+from www.tests.base import BaseTeste
+from www.views_relatorios import pendencias_por_comissao
+
+TODOS_ASSINADOS = {
+    "tem_edital_assinado": True,
+    "tem_presenca_assinada": True,
+    "tem_ata_assinada": True,
+    "tem_parecer_assinado": True,
+    "tem_deliberacao_assinada": True,
+    "tem_conclusao_assinada": True,
+}
+
+
+class PendenciasTests(BaseTeste):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.ano = datetime.date.today().year
+        cls.completa = cls.criar_reuniao(cls.ccj, 1)
+        cls.sem_ata = cls.criar_reuniao(cls.ccj, 2, tem_ata_assinada=False)
+        cls.sem_edital = cls.criar_reuniao(cls.cfo, 1, tem_edital_assinado=None, tem_ata_assinada=None)
+
+    @classmethod
+    def criar_reuniao(cls, comissao, numero, **documentos):
+        return Reuniao.objects.create(
+            comissao=comissao, tipo="ORDINÁRIA", numero=numero,
+            data=datetime.date(cls.ano, 1, numero), hora=datetime.time(10),
+            **{**TODOS_ASSINADOS, **documentos},
+        )
+
+    def test_mascara_calculada_pelo_banco(self):
+        mascaras = dict(Reuniao.objects.values_list("pk", "pendencias"))
+        self.assertEqual(mascaras[self.completa.pk], 0)
+        self.assertEqual(mascaras[self.sem_ata.pk], 4)
+        self.assertEqual(mascaras[self.sem_edital.pk], 1 | 4)
+
+        reuniao = Reuniao.objects.get(pk=self.sem_edital.pk)
+        self.assertEqual(reuniao.rotulos_pendencias, ["Edital assinado", "Ata assinada"])
+
+        # Assinar o documento zera o bit na gravação
+        reuniao.tem_edital_assinado = True
+        reuniao.save()
+        reuniao.refresh_from_db()
+        self.assertEqual(reuniao.pendencias, 4)
+
+    def test_matriz_comissao_por_documento(self):
+        matriz = pendencias_por_comissao(Reuniao.objects.all())
+        self.assertEqual(matriz, [
+            {"sigla": "CCJ", "total": 2, "pendentes": 1, "documentos": [0, 0, 1, 0, 0, 0]},
+            {"sigla": "CFO", "total": 1, "pendentes": 1, "documentos": [1, 0, 1, 0, 0, 0]},
+        ])
+
+    def test_relatorio_filtra_pelo_documento(self):
+        self.client.force_login(self.criar_usuario("usuario", comissao=self.ccj))
+        url = reverse("relatorio_pendencias_reunioes")
+
+        def reunioes(**params):
+            resposta = self.client.get(url, {"comissao": "", "ano": self.ano, **params})
+            return [linha["reuniao"].pk for linha in resposta.context["linhas"]]
+
+        self.assertEqual(reunioes(), [self.sem_ata.pk, self.sem_edital.pk])
+        self.assertEqual(reunioes(documento="tem_edital_assinado"), [self.sem_edital.pk])
+        self.assertEqual(reunioes(todas="1"), [self.completa.pk, self.sem_ata.pk, self.sem_edital.pk])
+        self.assertEqual(reunioes(ano=self.ano - 1), [])
@@ -0,0 +1,66 @@
+"""Testes do perfil de produção do SQLite (settings.DATABASES)."""
+
+import datetime
+import io
+import re
+from unittest import mock
+
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.db import connection
+from django.test import TransactionTestCase
+
+from www.models import Comissao, Proposicao, TipoProposicao, Tramitacao
+from www.tests.base import BaseTeste
+
+
+class PerfilSQLiteTests(BaseTeste):
+
+    def pragma(self, nome):
+        with connection.cursor() as cursor:
+            return cursor.execute(f"PRAGMA {nome}").fetchone()[0]
+
+    def test_pragmas_da_conexao(self):
+        self.assertEqual(self.pragma("synchronous"), 1)  # NORMAL
+        self.assertEqual(self.pragma("cache_size"), -65536)
+        self.assertEqual(self.pragma("temp_store"), 2)  # MEMORY
+        self.assertEqual(connection.transaction_mode, "IMMEDIATE")
+
+    def test_login_nao_grava_sessao_no_banco(self):
+        usuario = self.criar_usuario("usuario", comissao=self.ccj)
+        self.assertTrue(self.client.login(username=usuario.username, password="x"))
+        self.assertEqual(Session.objects.count(), 0)
+        self.assertEqual(self.client.get("/").status_code, 200)
+
+    def test_manutencao(self):
+        saida = io.StringIO()
+        call_command("manutencao_banco", "--integridade", stdout=saida)
+        self.assertIn("✔ PRAGMA quick_check", saida.getvalue())
+        self.assertIn("✔ PRAGMA optimize", saida.getvalue())
+
+
+class EstresseTests(TransactionTestCase):
+    # VACUUM INTO (a cópia do banco) não roda dentro da transação do TestCase
+
+    def setUp(self):
+        tipo = TipoProposicao.objects.create(sigla="PL", nome="Projeto de Lei")
+        comissao = Comissao.objects.create(sigla="CCJ", nome="Constituição e Justiça")
+        for i in range(1, 11):
+            Tramitacao.objects.create(
+                proposicao=Proposicao.objects.create(
+                    tipo=tipo, numero=f"2025{i:07d}", numero_formatado=f"{i}/2025",
+                    ementa=f"Ementa {i}", data_publicacao=datetime.date(2025, 1, 1),
+                ),
+                comissao=comissao, data_entrada=datetime.date(2025, 1, 2),
+            )
+
+    def test_perfil_de_producao_sem_database_is_locked(self):
+        saida = io.StringIO()
+        # O comando cria o alias da cópia (estresse_<perfil>) durante a execução
+        with mock.patch.object(type(self), "databases", {"default", "estresse_producao"}):
+            call_command(
+                "estressar_banco", "--perfil", "producao", "--segundos", "1",
+                "--escritores", "3", "--leitores", "2", stdout=saida,
+            )
+        self.assertRegex(saida.getvalue(), r"escrita\s+[\d.]+ op/s")
+        self.assertEqual(re.findall(r"'database is locked': (\d+)", saida.getvalue()), ["0"])
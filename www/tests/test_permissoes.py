@@ -0,0 +1,52 @@
+from django.urls import reverse
+
+from www.models import PerfilUsuario, Tramitacao
+from www.tests.base import BaseTeste
+
+
+# =========================================================================
+# 🔹 Escrita por comissão (www/permissoes.py)
+# =========================================================================
+
+class PermissaoComissaoTests(BaseTeste):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.superusuario = cls.criar_usuario("admin", superusuario=True)
+        cls.da_comissao = cls.criar_usuario("ccj", comissao=cls.ccj)
+        cls.de_outra = cls.criar_usuario("cfo", comissao=cls.cfo)
+        cls.sem_perfil = cls.criar_usuario("sem_perfil")
+        PerfilUsuario.objects.filter(user=cls.sem_perfil).delete()
+
+    def urls_de_escrita(self):
+        p, t = self.proposicao.pk, self.tramitacao.pk
+        return [
+            reverse("tramitacao_update", args=[p, t]),
+            reverse("tramitacao_delete", args=[p, t]),
+            reverse("parecer_vencido_create", args=[t]),
+        ]
+
+    def verificar(self, user, status):
+        self.client.force_login(user)
+        for url in self.urls_de_escrita():
+            with self.subTest(user=user.username, url=url):
+                self.assertEqual(self.client.get(url).status_code, status)
+
+    def test_superusuario_pode_alterar(self):
+        self.verificar(self.superusuario, 200)
+
+    def test_usuario_da_comissao_pode_alterar(self):
+        self.verificar(self.da_comissao, 200)
+
+    def test_usuario_de_outra_comissao_recebe_404(self):
+        self.verificar(self.de_outra, 404)
+
+    def test_usuario_sem_perfil_recebe_404(self):
+        self.verificar(self.sem_perfil, 404)
+
+    def test_exclusao_de_outra_comissao_nao_apaga(self):
+        self.client.force_login(self.de_outra)
+        resposta = self.client.post(self.urls_de_escrita()[1])
+        self.assertEqual(resposta.status_code, 404)
+        self.assertTrue(Tramitacao.objects.filter(pk=self.tramitacao.pk).exists())
@@ -0,0 +1,65 @@
+"""Testes do cache local das tabelas pequenas (www/tabelas.py)."""
+
+import datetime
+
+from django.core.cache import cache
+
+from www.models import Comissao, Reuniao, TipoProposicao
+from www.tabelas import (
+    COMISSOES,
+    _chave_versao,
+    anos_com_reunioes,
+    comissoes_ativas,
+    invalidar_tabelas,
+    tipo_por_sigla,
+    tipos_ativos,
+)
+from www.tests.base import BaseTeste
+
+
+class TabelasEmCacheTests(BaseTeste):
+
+    def siglas(self):
+        return [c.sigla for c in comissoes_ativas()]
+
+    def test_segunda_leitura_sem_consulta(self):
+        self.assertEqual(self.siglas(), ["CCJ", "CFO"])
+        self.assertEqual(tipo_por_sigla("PL"), self.tipo)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.siglas(), ["CCJ", "CFO"])
+            self.assertEqual(tipo_por_sigla("PL"), self.tipo)
+            self.assertEqual(tipo_por_sigla("XYZ"), None)
+
+    def test_signal_invalida_depois_do_commit(self):
+        self.assertEqual(self.siglas(), ["CCJ", "CFO"])
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            Comissao.objects.create(sigla="CAL", nome="Assuntos Locais")
+        self.assertEqual(self.siglas(), ["CCJ", "CFO"])
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.siglas(), ["CAL", "CCJ", "CFO"])
+
+    def test_versao_nova_de_outro_processo(self):
+        self.assertEqual(self.siglas(), ["CCJ", "CFO"])
+        Comissao.objects.filter(sigla="CFO").update(ativa=False)
+
+        # update() não dispara signals; outro processo incrementou a versão
+        cache.incr(_chave_versao(COMISSOES))
+        self.assertEqual(self.siglas(), ["CCJ"])
+
+    def test_invalidar_tabelas_depois_de_escrita_sem_signals(self):
+        self.assertEqual([t.sigla for t in tipos_ativos()], ["PL"])
+        self.assertEqual(anos_com_reunioes(), ())
+
+        TipoProposicao.objects.bulk_create([TipoProposicao(sigla="PR", nome="Resolução")])
+        Reuniao.objects.bulk_create([Reuniao(
+            comissao=self.ccj, tipo="ORDINÁRIA", numero=1,
+            data=datetime.date(2023, 4, 1), hora=datetime.time(10),
+        )])
+        self.assertEqual([t.sigla for t in tipos_ativos()], ["PL"])
+
+        invalidar_tabelas()
+        self.assertEqual([t.sigla for t in tipos_ativos()], ["PL", "PR"])
+        self.assertEqual(anos_com_reunioes(), (2023,))
@@ -0,0 +1,69 @@
+"""Testes da fila de PDFs (TarefaPDF e o comando processar_pdfs)."""
+
+import io
+import tempfile
+
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+
+from www.models import TarefaPDF
+from www.pdf import enfileirar_pdf, pdf_em_cache
+from www.tests.base import BaseTeste
+
+HTML = "<html><body><p>Teste</p></body></html>"
+
+
+class FilaDePDFTests(BaseTeste):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.usuario = cls.criar_usuario("usuario", comissao=cls.ccj)
+        cls.outro = cls.criar_usuario("outro", comissao=cls.cfo)
+
+    def test_pedido_repetido_do_mesmo_usuario_vira_a_mesma_tarefa(self):
+        tarefa = enfileirar_pdf(HTML, "a.pdf", self.usuario)
+        self.assertEqual(enfileirar_pdf(HTML, "a.pdf", self.usuario), tarefa)
+
+        # Outro usuário ganha a sua; HTML diferente também
+        self.assertNotEqual(enfileirar_pdf(HTML, "a.pdf", self.outro), tarefa)
+        self.assertNotEqual(enfileirar_pdf(HTML + " ", "a.pdf", self.usuario), tarefa)
+
+        # Tarefa finalizada não é reaproveitada
+        TarefaPDF.objects.filter(pk=tarefa.pk).update(status=TarefaPDF.CONCLUIDA)
+        self.assertNotEqual(enfileirar_pdf(HTML, "a.pdf", self.usuario), tarefa)
+
+    def test_tarefa_so_abre_para_quem_pediu(self):
+        tarefa = enfileirar_pdf(HTML, "a.pdf", self.usuario)
+        url = reverse("tarefa_pdf_status", args=[tarefa.pk])
+
+        self.client.force_login(self.outro)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+        self.client.force_login(self.usuario)
+        resposta = self.client.get(url)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.json()["status"], TarefaPDF.PENDENTE)
+
+    @override_settings(MEDIA_ROOT=tempfile.gettempdir() + "/testes_media")
+    def test_processar_pdfs_conclui_a_fila(self):
+        tarefas = [enfileirar_pdf(f"{HTML}<!-- {i} -->", f"{i}.pdf", self.usuario) for i in range(3)]
+        chave = "f" * 64
+        tarefas.append(enfileirar_pdf(HTML, "cache.pdf", self.usuario, chave_cache=chave))
+
+        call_command(
+            "processar_pdfs", "--uma-vez", "--processos", "2", "--intervalo", "0.05",
+            stdout=io.StringIO(), stderr=io.StringIO(),
+        )
+
+        for tarefa in tarefas:
+            tarefa.refresh_from_db()
+            self.assertEqual(tarefa.status, TarefaPDF.CONCLUIDA, tarefa.erro)
+            self.assertEqual(tarefa.html, "")
+            with tarefa.arquivo.open("rb") as arquivo:
+                self.assertTrue(arquivo.read().startswith(b"%PDF"))
+            tarefa.arquivo.delete(save=False)
+
+        # Com chave_cache, o PDF pronto também vai para o cache em disco
+        self.assertIsNotNone(pdf_em_cache(chave))
@@ -0,0 +1,73 @@
+"""Testes das consultas em uma data (www/temporal.py)."""
+
+import datetime
+
+from django.urls import reverse
+
+from www.models import Tramitacao
+from www.temporal import ler_data, tramitacoes_atuais, tramitacoes_vigentes_em
+from www.tests.base import BaseTeste
+
+
+def dias(n):
+    return datetime.date.today() - datetime.timedelta(days=n)
+
+
+class ConsultaEmDataTests(BaseTeste):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        # Proposição 1: CCJ há 30 dias, CFO desde 10 dias atrás
+        Tramitacao.objects.filter(pk=cls.tramitacao.pk).update(data_entrada=dias(30))
+        cls.na_cfo = Tramitacao.objects.create(
+            proposicao=cls.proposicao, comissao=cls.cfo, data_entrada=dias(10),
+        )
+        # Proposição 2: CCJ há 20 dias, saiu há 5 (sem tramitação seguinte)
+        cls.saida = Tramitacao.objects.create(
+            proposicao=cls.criar_proposicao(2), comissao=cls.ccj,
+            data_entrada=dias(20), data_saida=dias(5),
+        )
+
+    def pks(self, qs):
+        return set(qs.values_list("pk", flat=True))
+
+    def test_vigentes_em_cada_data(self):
+        self.assertEqual(self.pks(tramitacoes_vigentes_em(dias(40))), set())
+        self.assertEqual(self.pks(tramitacoes_vigentes_em(dias(15))), {self.tramitacao.pk, self.saida.pk})
+        self.assertEqual(self.pks(tramitacoes_vigentes_em(dias(3))), {self.na_cfo.pk})
+        self.assertEqual(self.pks(tramitacoes_vigentes_em(dias(15), self.cfo)), set())
+        self.assertEqual(self.pks(tramitacoes_vigentes_em(dias(3), self.cfo)), {self.na_cfo.pk})
+
+    def test_mesma_data_de_entrada_desempata_pelo_pk(self):
+        mesma_data = Tramitacao.objects.create(
+            proposicao=self.proposicao, comissao=self.ccj, data_entrada=dias(10),
+        )
+        self.assertEqual(self.pks(tramitacoes_vigentes_em(dias(3))), {mesma_data.pk})
+
+    def test_situacao_atual_e_a_ultima_tramitacao(self):
+        # Sem data: a regra do painel, que não olha a data de saída
+        self.assertEqual(self.pks(tramitacoes_atuais(self.ccj)), {self.saida.pk})
+        self.assertEqual(self.pks(tramitacoes_atuais()), {self.na_cfo.pk, self.saida.pk})
+
+    def test_ler_data(self):
+        self.assertEqual(ler_data(dias(1).isoformat()), dias(1))
+        for valor in (None, "", "31/12/2024", "2024-02-30", dias(0).isoformat(), dias(-1).isoformat()):
+            self.assertIsNone(ler_data(valor))
+
+    def test_relatorio_na_data(self):
+        self.client.force_login(self.criar_usuario("usuario", comissao=self.ccj))
+        url = reverse("relatorio_situacao_comissao")
+
+        resposta = self.client.get(url, {"comissao": self.ccj.pk, "as_of": dias(15).isoformat()})
+        self.assertEqual(resposta.context["as_of"], dias(15))
+        self.assertEqual(resposta.context["total"], 2)
+        self.assertEqual(
+            sorted(item["dias"] for item in resposta.context["aguardando"]), [5, 15]
+        )
+
+        resposta = self.client.get(url, {"comissao": self.ccj.pk})
+        self.assertIsNone(resposta.context["as_of"])
+        self.assertEqual(
+            [item["tramitacao"].pk for item in resposta.context["aguardando"]], [self.saida.pk]
+        )
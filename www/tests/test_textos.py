@@ -0,0 +1,60 @@
+"""Testes dos textos do CKEditor sob demanda (resumo nas listagens)."""
+
+from django.urls import reverse
+
+from www.models import TAMANHO_RESUMO_TEXTO, Tramitacao, resumir_texto
+from www.tests.base import BaseTeste
+
+
+class TextoSobDemandaTests(BaseTeste):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.tramitacao.texto = "<p>Voto pela <strong>aprovação</strong></p><p>da matéria &amp; emendas.</p>"
+        cls.tramitacao.save()
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.criar_usuario("leitor", superusuario=True))
+
+    def test_resumo_sem_html_e_com_espaco_entre_blocos(self):
+        self.assertEqual(
+            resumir_texto("<p>a</p><p>b&nbsp;c</p>"), (5, "a b c"),
+        )
+        self.assertEqual(resumir_texto(None), (0, ""))
+        tamanho, resumo = resumir_texto("<p>" + "x" * 1000 + "</p>")
+        self.assertEqual(tamanho, 1000)
+        self.assertEqual(len(resumo), TAMANHO_RESUMO_TEXTO)
+
+    def test_save_atualiza_resumo(self):
+        self.tramitacao.refresh_from_db()
+        self.assertEqual(self.tramitacao.texto_resumo, "Voto pela aprovação da matéria & emendas.")
+        self.assertEqual(self.tramitacao.texto_tamanho, len(self.tramitacao.texto_resumo))
+
+    def test_save_com_texto_adiado_mantem_resumo(self):
+        t = Tramitacao.objects.defer("texto").get(pk=self.tramitacao.pk)
+        t.observacao = "Sem mudar o texto"
+        t.save()
+        t = Tramitacao.objects.get(pk=self.tramitacao.pk)
+        self.assertEqual(t.texto_resumo, "Voto pela aprovação da matéria & emendas.")
+        self.assertIn("<strong>", t.texto)
+
+    def test_listagem_mostra_resumo_sem_o_html(self):
+        r = self.client.get(reverse("tramitacao_list", args=[self.proposicao.pk]))
+        self.assertContains(r, "Voto pela aprovação")
+        self.assertNotContains(r, "<strong>aprovação</strong>")
+        self.assertContains(r, reverse("tramitacao_texto", args=[self.proposicao.pk, self.tramitacao.pk]))
+
+    def test_texto_completo_sob_demanda(self):
+        url = reverse("tramitacao_texto", args=[self.proposicao.pk, self.tramitacao.pk])
+        r = self.client.get(url)
+        self.assertContains(r, "<strong>aprovação</strong>")
+        outra = self.criar_proposicao(2)
+        r = self.client.get(reverse("tramitacao_texto", args=[outra.pk, self.tramitacao.pk]))
+        self.assertEqual(r.status_code, 404)
+
+    def test_texto_exige_login(self):
+        self.client.logout()
+        url = reverse("tramitacao_texto", args=[self.proposicao.pk, self.tramitacao.pk])
+        self.assertEqual(self.client.get(url).status_code, 302)
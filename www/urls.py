@@ -1,6 +1,6 @@
 from django.urls import path
 from www.views import *
-from www import views_relatorios
+from www import views_combos, views_relatorios
 from django.conf import settings
 from django.conf.urls.static import static
 
@@ -16,12 +16,18 @@ urlpatterns = [
     path("relatorios/situacao-comissao/pdf/",
          views_relatorios.RelatorioSituacaoComissaoPDFView.as_view(),
          name="relatorio_situacao_comissao_pdf"),
+    path("relatorios/situacao-comissao/exportar/<str:formato>/",
+         views_relatorios.RelatorioSituacaoComissaoExportView.as_view(),
+         name="relatorio_situacao_comissao_exportar"),
     path("relatorios/pendencias-reunioes/",
          views_relatorios.RelatorioPendenciasReunioesView.as_view(),
          name="relatorio_pendencias_reunioes"),
     path("relatorios/pendencias-reunioes/pdf/",
          views_relatorios.RelatorioPendenciasReunioesPDFView.as_view(),
          name="relatorio_pendencias_reunioes_pdf"),
+    path("relatorios/pendencias-reunioes/exportar/<str:formato>/",
+         views_relatorios.RelatorioPendenciasReunioesExportView.as_view(),
+         name="relatorio_pendencias_reunioes_exportar"),
     path("relatorios/dossie/",
          views_relatorios.RelatorioDossieView.as_view(),
          name="relatorio_dossie"),
@@ -29,8 +35,26 @@ urlpatterns = [
          views_relatorios.RelatorioDossiePDFView.as_view(),
          name="relatorio_dossie_pdf"),
 
+    # 📄 PDFs gerados em segundo plano (modo por tarefa)
+    path("relatorios/tarefas/<int:pk>/",
+         views_relatorios.TarefaPDFDetailView.as_view(),
+         name="tarefa_pdf_detail"),
+    path("relatorios/tarefas/<int:pk>/status/",
+         views_relatorios.TarefaPDFStatusView.as_view(),
+         name="tarefa_pdf_status"),
+    path("relatorios/tarefas/<int:pk>/arquivo/",
+         views_relatorios.TarefaPDFArquivoView.as_view(),
+         name="tarefa_pdf_arquivo"),
+
+
+    # 🔎 Busca remota das combos (JSON)
+    path("busca/reunioes/", views_combos.BuscaReunioesView.as_view(), name="busca_reunioes"),
+    path("busca/autores/", views_combos.BuscaAutoresView.as_view(), name="busca_autores"),
+
 
     path("proposicao/", ProposicaoListView.as_view(), name="proposicao_list"),
+    path("proposicao/exportar/<str:formato>/", ProposicaoExportView.as_view(), name="proposicao_exportar"),
+    path("proposicao/dossies.zip", ProposicaoDossiesZipView.as_view(), name="proposicao_dossies_zip"),
 
 
     path("proposicao/<int:proposicao_id>/tramitacoes/", TramitacaoListView.as_view(), name="tramitacao_list"),
@@ -40,12 +64,14 @@ urlpatterns = [
     path("proposicao/<int:proposicao_id>/tramitacoes/<int:t>/", TramitacaoDetailView.as_view(), name="tramitacao_detail"),
     path("proposicao/<int:proposicao_id>/tramitacoes/<int:t>/editar/", TramitacaoUpdateView.as_view(), name="tramitacao_update"),
     path("proposicao/<int:proposicao_id>/tramitacoes/<int:t>/excluir/", TramitacaoDeleteView.as_view(), name="tramitacao_delete"),
+    path("proposicao/<int:proposicao_id>/tramitacoes/<int:t>/texto/", TramitacaoTextoView.as_view(), name="tramitacao_texto"),
     path("tramitacao/<int:pk>/pdf/", TramitacaoPDFView.as_view(), name="tramitacao_pdf"),
 
     # 👉 Votos vencidos: telas próprias, ligadas a uma tramitação já salva
     path("tramitacao/<int:tramitacao_id>/votos-vencidos/novo/", ParecerVencidoCreateView.as_view(), name="parecer_vencido_create"),
     path("tramitacao/<int:tramitacao_id>/votos-vencidos/<int:pk>/editar/", ParecerVencidoUpdateView.as_view(), name="parecer_vencido_update"),
     path("tramitacao/<int:tramitacao_id>/votos-vencidos/<int:pk>/excluir/", ParecerVencidoDeleteView.as_view(), name="parecer_vencido_delete"),
+    path("tramitacao/<int:tramitacao_id>/votos-vencidos/<int:pk>/texto/", ParecerVencidoTextoView.as_view(), name="parecer_vencido_texto"),
 
     path("autores/", AutorListView.as_view(), name="autor_list"),
     path("autores/novo/", AutorCreateView.as_view(), name="autor_create"),
@@ -54,6 +80,7 @@ urlpatterns = [
 
 
     path("reuniao/", ReuniaoListView.as_view(), name="reuniao_list"),
+    path("reuniao/exportar/<str:formato>/", ReuniaoExportView.as_view(), name="reuniao_exportar"),
     path("reuniao/nova/", ReuniaoCreateView.as_view(), name="reuniao_create"),
     path("reuniao/<int:pk>/editar/", ReuniaoUpdateView.as_view(), name="reuniao_update"),
     path("reuniao/<int:pk>/", ReuniaoDetailView.as_view(), name="reuniao_detail"),
@@ -1,4 +1,4 @@
-from django.http import Http404, HttpResponse
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.db import transaction
 from django.shortcuts import redirect, render
 from django.contrib.auth.mixins import LoginRequiredMixin
@@ -7,16 +7,34 @@ from django.db.models import Q
 from django.views.generic import ListView, DetailView, CreateView, TemplateView, UpdateView, DeleteView
 from django.urls import reverse_lazy
 from django.template.loader import render_to_string
-from weasyprint import HTML
 from django.forms import formset_factory
 #from django.forms import modelformset_factory
 #from django.forms import inlineformset_factory
 from django.shortcuts import get_object_or_404
 from django.utils.timezone import now
-from datetime import timedelta
 #-----
 from www.models import *
 from www.forms import *
+from www.banco_relatorios import BancoRelatoriosMixin
+from www.condicional import GetCondicionalMixin, ultima_alteracao
+from www.dossies import arquivos_do_lote, gerar_dossies, zip_em_fluxo
+from www.exportacao import ExportacaoMixin
+from www.filtros import filtrar_lista_proposicoes
+from www.fragmentos import versoes
+from www.paginacao import PaginacaoPorChaveMixin, janela_de_paginas
+from www.permissoes import ContextoUsuarioMixin
+from www.tabelas import anos_com_reunioes, comissoes_ativas, tipo_por_sigla, tipos_ativos
+from www.pdf import (
+    impressao_digital,
+    resposta_pdf_em_cache,
+    resumo_texto,
+    versao_templates,
+)
+from www.indicadores import (
+    indicadores_zerados,
+    obter_indicadores,
+    obter_indicadores_por_comissao,
+)
 
 
 
@@ -27,10 +45,11 @@ def teste_ckeditor(request):
 
 ###################################################################################
 
-class ProposicaoListView(LoginRequiredMixin, ListView):
+class ProposicaoListView(LoginRequiredMixin, ContextoUsuarioMixin, PaginacaoPorChaveMixin, ListView):
     model = Proposicao
     template_name = "www/proposicao_list.html"
     paginate_by = 20
+    ordenacao_chave = ("numero",)
 
     def _tipo_selecionado(self):
         """Tipo escolhido no filtro; por padrão, 'Projeto Lei' (PL)."""
@@ -39,213 +58,147 @@ class ProposicaoListView(LoginRequiredMixin, ListView):
 
         tipo = self.request.GET.get("tipo")
         if tipo is None:
-            tipo_pl = TipoProposicao.objects.filter(sigla="PL").first()
+            tipo_pl = tipo_por_sigla("PL")
             tipo = str(tipo_pl.id) if tipo_pl else None
 
         self._tipo_cache = tipo
         return tipo
 
-    def _comissao_selecionada(self):
-        """Comissão escolhida no filtro; por padrão, a comissão do usuário."""
-        if hasattr(self, "_comissao_cache"):
-            return self._comissao_cache
-
-        comissao = self.request.GET.get("comissao")
-        if comissao is None:
-            user = self.request.user
-            if getattr(user, "perfil", None) and user.perfil.comissao_padrao_id:
-                comissao = str(user.perfil.comissao_padrao_id)
-
-        self._comissao_cache = comissao
-        return comissao
-
     def get_queryset(self):
+        # Comissão/relator atuais são colunas desnormalizadas da Proposicao:
+        # select_related evita 2 consultas por linha na listagem.
         qs = (
             Proposicao.objects
-            .annotate(
-                ultima_data=models.Max("tramitacoes__data_entrada")
-            )
-            .select_related("tipo")
-            .prefetch_related(
-                "autores",
-                "tramitacoes",
-                "tramitacoes__relator",
-                "tramitacoes__reuniao",
-                "tramitacoes__pareceres_vencidos",
-            )
+            .select_related("tipo", "comissao_atual", "relator_atual")
         )
 
-        user = self.request.user
-
-        # 🔒 Restrição por comissão (baseada na ÚLTIMA tramitação).
-        # Proposições SEM nenhuma tramitação também ficam visíveis,
-        # senão ninguém conseguiria registrar a primeira tramitação.
-        if not user.is_superuser:
-            try:
-                comissao_usuario = user.perfil.comissao_padrao
-                qs = qs.filter(
-                    Q(
-                        tramitacoes__data_entrada=models.F("ultima_data"),
-                        tramitacoes__comissao=comissao_usuario,
-                    )
-                    | Q(tramitacoes__isnull=True)
-                )
-            except Exception:
-                return qs.none()
-
-        # 🔍 Filtros da tela
-        tipo = self._tipo_selecionado()
-        numero = self.request.GET.get("numero")
-        autor = self.request.GET.get("autor")
-        comissao_filtro = self._comissao_selecionada()
-        aguardando_parecer = self.request.GET.get("aguardando_parecer")
-
-        if tipo:
-            qs = qs.filter(tipo_id=tipo)
-
-        if numero:
-            termo = numero.strip()
-            inicio_livre = termo.startswith("*")   # * no começo -> não ancora no início
-            fim_livre = termo.endswith("*")        # * no fim -> não ancora no fim
-            termo = termo.strip("*")
-
-            # Busca apenas no campo 'numero' (ano + código interno),
-            # por isso "2025" traz proposições DE 2025.
-            if not termo:
-                pass  # só asteriscos: ignora o filtro
-            elif inicio_livre and fim_livre:
-                qs = qs.filter(numero__icontains=termo)      # *2025* -> contém
-            elif inicio_livre:
-                qs = qs.filter(numero__iendswith=termo)      # *2025 -> termina com
-            else:
-                qs = qs.filter(numero__istartswith=termo)    # 2025 / 2025* -> começa com
-
-        if autor:
-            qs = qs.filter(autores__id=autor)
-
-        if comissao_filtro:
-            qs = qs.filter(
-                Q(
-                    tramitacoes__data_entrada=models.F("ultima_data"),
-                    tramitacoes__comissao_id=comissao_filtro,
-                )
-                | Q(tramitacoes__isnull=True)
-            )
-
-        # 🟡 Aguardando parecer do relator (NOVA REGRA CORRETA)
-        if aguardando_parecer == "1":
-            qs = (
-                qs
-                .exclude(tramitacoes__relator__isnull=False)
-            )
+        # 🔍 Filtros da tela (os mesmos da exportação de dossiês)
+        qs = filtrar_lista_proposicoes(
+            qs,
+            self.request.user,
+            tipo=self._tipo_selecionado(),
+            numero=self.request.GET.get("numero"),
+            busca=self.request.GET.get("busca", "").strip(),
+            autor=self.request.GET.get("autor"),
+            comissao=self._comissao_selecionada(),
+            aguardando_parecer=self.request.GET.get("aguardando_parecer") == "1",
+        )
 
-        return qs.distinct().order_by("numero")
+        return qs.order_by(*self.ordenacao_chave)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        params = self.request.GET.copy()
-        params.pop("page", None)
-
-        context["querystring"] = params.urlencode()
+        context["querystring"] = self.querystring_sem_pagina()
 
-        context["tipos"] = TipoProposicao.objects.filter(ativo=True)
+        context["tipos"] = tipos_ativos()
         context["tipo_selecionado"] = self._tipo_selecionado()
         context["comissao_selecionada"] = self._comissao_selecionada()
-        context["autores"] = Autor.objects.filter(ativo=True).order_by("nome")
+        # Combo de autor por busca remota: só o escolhido vai para a página
+        autor = self.request.GET.get("autor")
+        context["autor_selecionado"] = (
+            Autor.objects.filter(pk=autor).first() if autor and autor.isdigit() else None
+        )
 
         # Combo de comissão: todas as ativas (a do usuário vem pré-selecionada)
-        context["comissoes"] = Comissao.objects.filter(ativa=True)
+        context["comissoes"] = comissoes_ativas()
 
         return context
 
 
-class ProposicaoDetailView(LoginRequiredMixin, DetailView):
-    model = Proposicao
-    template_name = "www/proposicao_detail.html"
-
+class ProposicaoExportView(BancoRelatoriosMixin, ExportacaoMixin, ProposicaoListView):
+    """Listagem de proposições em CSV/XLSX, com os filtros da tela."""
 
-###################################################################################
+    nome_exportacao = "proposicoes"
+    titulo_exportacao = "Proposições"
+    colunas = (
+        "Proposição", "Número", "Tipo", "Ementa", "Publicação",
+        "Comissão atual", "Relator atual", "Aguardando parecer",
+    )
 
-class DashboardView(LoginRequiredMixin, TemplateView):
-    template_name = "www/dashboard.html"
-
-    def _calcular_indicadores(self, comissao=None):
-        """
-        Calcula os 4 indicadores do dashboard.
-        comissao=None -> visão global do sistema.
-        """
-        # 🔹 Proposições com data da última tramitação
-        proposicoes = (
-            Proposicao.objects
-            .annotate(
-                ultima_data=models.Max("tramitacoes__data_entrada")
+    def linhas_exportacao(self):
+        return (
+            self.get_queryset()
+            .values_list(
+                "numero", "numero_formatado", "tipo__nome", "ementa",
+                "data_publicacao", "comissao_atual__sigla", "relator_atual__nome",
+                "aguardando_parecer",
             )
+            .iterator(chunk_size=2000)
         )
 
-        # 🔹 Filtra apenas a última tramitação da comissão
-        if comissao:
-            proposicoes = proposicoes.filter(
-                tramitacoes__data_entrada=models.F("ultima_data"),
-                tramitacoes__comissao=comissao
-            )
 
-        total = proposicoes.distinct().count()
+class ProposicaoDossiesZipView(BancoRelatoriosMixin, ProposicaoListView):
+    """
+    Dossiês de TODAS as proposições do filtro da listagem, num ZIP.
+    Os PDFs são gerados em paralelo e enviados conforme ficam prontos
+    (ver www/dossies.py). Saem em ordem de número: se o download cair,
+    ?apos=<último número recebido> continua de onde parou.
+    """
 
-        # Aguardando parecer do relator
-        aguardando_parecer = (
-            proposicoes
-            .exclude(tramitacoes__relator__isnull=False)
-            .distinct()
-            .count()
-        )
+    def get(self, request, *args, **kwargs):
+        proposicoes = self.get_queryset()
 
-        # Entradas no período (últimos 30 dias)
-        data_inicio = now().date() - timedelta(days=30)
-        entradas_periodo = Tramitacao.objects.filter(data_entrada__gte=data_inicio)
-        if comissao:
-            entradas_periodo = entradas_periodo.filter(comissao=comissao)
-        entradas_periodo = entradas_periodo.count()
+        apos = request.GET.get("apos", "").strip()
+        if apos:
+            proposicoes = proposicoes.filter(numero__gt=apos)
 
-        # Tempo médio na comissão (dias)
-        tramitacoes = Tramitacao.objects.all()
-        if comissao:
-            tramitacoes = tramitacoes.filter(comissao=comissao)
+        total = proposicoes.count()
+        dossies = gerar_dossies(proposicoes, usuario=request.user, compartilhado=True)
 
-        tramitacoes = tramitacoes.annotate(
-            dias=models.ExpressionWrapper(
-                now().date() - models.F("data_entrada"),
-                output_field=models.DurationField()
-            )
+        response = StreamingHttpResponse(
+            zip_em_fluxo(arquivos_do_lote(dossies)),
+            content_type="application/zip",
         )
+        nome = f"dossies_apos_{apos}.zip" if apos else "dossies.zip"
+        response["Content-Disposition"] = f'attachment; filename="{nome}"'
+        response["X-Total-Dossies"] = str(total)
+        return response
 
-        if tramitacoes.exists():
-            tempo_medio = (
-                sum(t.dias.days for t in tramitacoes) / tramitacoes.count()
-            )
-        else:
-            tempo_medio = 0
 
-        return {
-            "total": total,
-            "aguardando_parecer": aguardando_parecer,
-            "entradas_periodo": entradas_periodo,
-            "tempo_medio": round(tempo_medio, 1),
-        }
+class ProposicaoDetailView(LoginRequiredMixin, DetailView):
+    model = Proposicao
+    template_name = "www/proposicao_detail.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Só data e parecer aparecem: sem o texto de cada tramitação
+        context["tramitacoes"] = self.object.tramitacoes.only("data_entrada", "parecer")
+        return context
+
+
+###################################################################################
+
+class DashboardView(LoginRequiredMixin, BancoRelatoriosMixin, ContextoUsuarioMixin, TemplateView):
+    template_name = "www/dashboard.html"
+
+    def _calcular_indicadores(self, comissao=None):
+        """
+        Os 4 indicadores do dashboard (em cache; ver www/indicadores.py).
+        comissao=None -> visão global do sistema.
+        """
+        return obter_indicadores(comissao)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
         user = self.request.user
-        comissao_usuario = getattr(user.perfil, "comissao_padrao", None) \
-            if hasattr(user, "perfil") else None
+        comissao_usuario = self.contexto_usuario.comissao
 
         if user.is_superuser:
             # 🔹 Superusuário: visão global + bloco da própria comissão (se tiver)
-            context["indicadores_globais"] = self._calcular_indicadores(None)
+            # + quadro de todas as comissões — tudo de uma única passada do motor.
+            por_comissao = obter_indicadores_por_comissao()
+            context["indicadores_globais"] = por_comissao[None]
             if comissao_usuario:
                 context["comissao"] = comissao_usuario
-                context["indicadores_comissao"] = self._calcular_indicadores(comissao_usuario)
+                context["indicadores_comissao"] = (
+                    por_comissao.get(comissao_usuario.pk) or indicadores_zerados()
+                )
+            context["quadro_comissoes"] = [
+                {"comissao": c, "indicadores": por_comissao.get(c.pk) or indicadores_zerados()}
+                for c in sorted(comissoes_ativas(), key=lambda c: c.sigla)
+            ]
         else:
             # 🔹 Usuário comum: apenas o bloco da sua comissão
             context["comissao"] = comissao_usuario
@@ -256,25 +209,25 @@ class DashboardView(LoginRequiredMixin, TemplateView):
 ###################################################################################
 
 
-class TramitacoesPainelView(LoginRequiredMixin, ListView):
+class TramitacoesPainelView(LoginRequiredMixin, ContextoUsuarioMixin, PaginacaoPorChaveMixin, ListView):
     template_name = "www/tramitacoes/tramitacoes_painel.html"
     context_object_name = "proposicoes"
     paginate_by = 25
+    # numero desempata as proposições publicadas no mesmo dia
+    ordenacao_chave = ("-data_publicacao", "-numero")
 
     def _get_filtros(self):
         """Calcula (uma única vez) comissão/reunião selecionadas a partir do GET."""
         if hasattr(self, "_filtros_cache"):
             return self._filtros_cache
 
-        user = self.request.user
-
         # 🔒 Comissão: vem do filtro selecionado, ou por padrão a comissão
         # registrada para o usuário. Valor explicitamente vazio = "Todas".
         comissao_id = self.request.GET.get("comissao")
         if comissao_id:
             comissao_selecionada = Comissao.objects.filter(pk=comissao_id).first()
-        elif comissao_id is None and getattr(user, "perfil", None) and user.perfil.comissao_padrao_id:
-            comissao_selecionada = user.perfil.comissao_padrao
+        elif comissao_id is None:
+            comissao_selecionada = self.contexto_usuario.comissao
         else:
             comissao_selecionada = None
 
@@ -304,32 +257,40 @@ class TramitacoesPainelView(LoginRequiredMixin, ListView):
         # 🔹 Só entram proposições que já têm alguma tramitação cadastrada
         proposicoes = (
             Proposicao.objects
-            .select_related("tipo")
-            .filter(tramitacoes__isnull=False)
+            .select_related("tipo", "comissao_atual", "relator_atual")
+            .filter(tramitacao_atual__isnull=False)
         )
 
+        # Subconsultas em vez de JOIN + distinct(): sem linhas repetidas
+        # para eliminar, a ordenação segue pelo índice e a paginação por
+        # chave não precisa ordenar o resultado inteiro.
         if filtros["comissao_selecionada"]:
             proposicoes = proposicoes.filter(
-                tramitacoes__comissao=filtros["comissao_selecionada"]
+                numero__in=Tramitacao.objects
+                .filter(comissao=filtros["comissao_selecionada"])
+                .values("proposicao_id")
             )
 
         if filtros["reuniao_selecionada"]:
             proposicoes = proposicoes.filter(
-                tramitacoes__reuniao=filtros["reuniao_selecionada"]
+                numero__in=Tramitacao.objects
+                .filter(reuniao=filtros["reuniao_selecionada"])
+                .values("proposicao_id")
             )
 
-        return proposicoes.distinct().order_by("-data_publicacao")
+        return proposicoes.order_by(*self.ordenacao_chave)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         filtros = self._get_filtros()
 
         context.update({
-            "comissoes": Comissao.objects.filter(ativa=True),
+            "comissoes": comissoes_ativas(),
             "reunioes": filtros["reunioes_qs"],
             "comissao_selecionada": filtros["comissao_selecionada"],
             "reuniao_selecionada": filtros["reuniao_selecionada"],
             "ano_atual": filtros["ano_atual"],
+            "querystring": self.querystring_sem_pagina(),
         })
         return context
 
@@ -411,21 +372,39 @@ class ComissaoListView(LoginRequiredMixin, PaginacaoTolerante, ListView):
 
 ###################################################################################
 
-class TramitacaoListView(LoginRequiredMixin, ListView):
+class TramitacaoListView(LoginRequiredMixin, GetCondicionalMixin, ListView):
     model = Tramitacao
     template_name = "www/tramitacoes/tramitacao_list.html"
     context_object_name = "tramitacoes"
+    etag_com_csrf = True
+
+    def versao_condicional(self, request, proposicao_id, **kwargs):
+        """Histórico da proposição: muda com qualquer tramitação/voto/reunião dela."""
+        alterada_em, tramitacoes, votos = ultima_alteracao(
+            Tramitacao.objects.filter(proposicao_id=proposicao_id)
+        )
+        return (
+            "historico", versao_templates(self.template_name, "base.html"),
+            request.user.pk, proposicao_id, alterada_em, tramitacoes, votos,
+            versoes(Proposicao, proposicao_id),
+        ), alterada_em
 
     def get_queryset(self):
         proposicao_id = self.kwargs["proposicao_id"]
 
         try:
-            self.proposicao = Proposicao.objects.get(pk=proposicao_id)
+            self.proposicao = (
+                Proposicao.objects
+                .select_related("comissao_atual", "relator_atual")
+                .get(pk=proposicao_id)
+            )
         except Proposicao.DoesNotExist:
             raise Http404("Proposição não encontrada")
 
         # 👁️ Leitura do histórico é livre para qualquer usuário logado.
         # As restrições por comissão valem apenas para ações de escrita.
+        # O texto do parecer (HTML do CKEditor) não vai para a lista: ela
+        # mostra texto_resumo e busca o texto inteiro só se o usuário abrir
         return (
             Tramitacao.objects
             .filter(proposicao=self.proposicao)
@@ -435,11 +414,7 @@ class TramitacaoListView(LoginRequiredMixin, ListView):
                 "relator",
                 "reuniao",
             )
-            .prefetch_related(
-                "pareceres_vencidos",
-                "pareceres_vencidos__relator",
-                "pareceres_vencidos__reuniao",
-            )
+            .defer("texto")
             .order_by("data_entrada")
         )
 
@@ -450,12 +425,12 @@ class TramitacaoListView(LoginRequiredMixin, ListView):
 
 
 # View de criação da Tramitação (já com o parecer do relator embutido)
-class TramitacaoComParecerCreateView(LoginRequiredMixin, View):
+class TramitacaoComParecerCreateView(LoginRequiredMixin, ContextoUsuarioMixin, View):
     template_name = "www/tramitacoes/tramitacao_unica_form.html"
 
     def get(self, request, proposicao_id):
         proposicao = get_object_or_404(Proposicao, pk=proposicao_id)
-        tramitacao_form = TramitacaoForm(user=request.user)
+        tramitacao_form = TramitacaoForm(comissao_padrao=self.contexto_usuario.comissao_id)
 
         return render(request, self.template_name, {
             "proposicao": proposicao,
@@ -467,13 +442,14 @@ class TramitacaoComParecerCreateView(LoginRequiredMixin, View):
         proposicao = get_object_or_404(Proposicao, pk=proposicao_id)
 
         # 🔒 mesma restrição de comissão usada nas outras views de tramitação
+        # (a primeira tramitação de uma proposição é livre)
         user = request.user
-        if not user.is_superuser:
-            ultima = proposicao.tramitacoes.order_by("-data_entrada").first()
-            if ultima and ultima.comissao != getattr(user.perfil, "comissao_padrao", None):
-                raise Http404("Acesso negado")
+        if proposicao.tramitacao_atual_id:
+            self.exigir_permissao_comissao(proposicao.comissao_atual_id)
 
-        tramitacao_form = TramitacaoForm(request.POST, user=user)
+        tramitacao_form = TramitacaoForm(
+            request.POST, comissao_padrao=self.contexto_usuario.comissao_id
+        )
 
         if tramitacao_form.is_valid():
             tramitacao = tramitacao_form.save(commit=False)
@@ -497,7 +473,7 @@ class TramitacaoComParecerCreateView(LoginRequiredMixin, View):
 
 
 
-class TramitacaoUpdateView(LoginRequiredMixin, UpdateView):
+class TramitacaoUpdateView(LoginRequiredMixin, ContextoUsuarioMixin, UpdateView):
     model = Tramitacao
     form_class = TramitacaoForm
     template_name = "www/tramitacoes/tramitacao_form.html"
@@ -516,22 +492,19 @@ class TramitacaoUpdateView(LoginRequiredMixin, UpdateView):
 
     def get_object(self, queryset=None):
         obj = super().get_object(queryset)
-        user = self.request.user
 
         # 🔐 garante que a tramitação pertence à proposição
         if obj.proposicao_id != self.proposicao.pk:
             raise Http404("Tramitação inválida")
 
         # 🔒 permissão por comissão
-        if not user.is_superuser:
-            if obj.comissao != user.perfil.comissao_padrao:
-                raise Http404("Acesso negado")
+        self.exigir_permissao_comissao(obj.comissao_id)
 
         return obj
 
     def get_form_kwargs(self):
         kwargs = super().get_form_kwargs()
-        kwargs["user"] = self.request.user
+        kwargs["comissao_padrao"] = self.contexto_usuario.comissao_id
         return kwargs
 
     def form_valid(self, form):
@@ -550,7 +523,7 @@ class TramitacaoUpdateView(LoginRequiredMixin, UpdateView):
         )
 
 
-class TramitacaoDeleteView(LoginRequiredMixin, DeleteView):
+class TramitacaoDeleteView(LoginRequiredMixin, ContextoUsuarioMixin, DeleteView):
     model = Tramitacao
     template_name = "www/tramitacoes/tramitacao_confirm_delete.html"
     pk_url_kwarg = "t"  # 👈 id da tramitação
@@ -567,16 +540,13 @@ class TramitacaoDeleteView(LoginRequiredMixin, DeleteView):
 
     def get_object(self, queryset=None):
         obj = super().get_object(queryset)
-        user = self.request.user
 
         # 🔐 garante vínculo com a proposição
         if obj.proposicao_id != self.proposicao.pk:
             raise Http404("Tramitação inválida")
 
         # 🔒 permissão por comissão
-        if not user.is_superuser:
-            if obj.comissao != user.perfil.comissao_padrao:
-                raise Http404("Acesso negado")
+        self.exigir_permissao_comissao(obj.comissao_id)
 
         return obj
 
@@ -592,11 +562,12 @@ class TramitacaoDeleteView(LoginRequiredMixin, DeleteView):
         )
 
 
-class TramitacaoDetailView(LoginRequiredMixin, DetailView):
+class TramitacaoDetailView(LoginRequiredMixin, ContextoUsuarioMixin, GetCondicionalMixin, DetailView):
     model = Tramitacao
     template_name = "www/tramitacoes/tramitacao_detail.html"
     context_object_name = "tramitacao"
     pk_url_kwarg = "t"  # 👈 id da tramitação
+    etag_com_csrf = True
 
     def dispatch(self, request, *args, **kwargs):
         try:
@@ -608,11 +579,20 @@ class TramitacaoDetailView(LoginRequiredMixin, DetailView):
 
         return super().dispatch(request, *args, **kwargs)
 
+    def versao_condicional(self, request, proposicao_id, t, **kwargs):
+        # Os links de edição dependem da comissão do usuário
+        alterada_em, _, votos = ultima_alteracao(Tramitacao.objects.filter(pk=t))
+        return (
+            "tramitacao", versao_templates(self.template_name, "base.html"),
+            request.user.pk, self.contexto_usuario.is_superuser,
+            self.contexto_usuario.comissao_id, proposicao_id, t, alterada_em, votos,
+            versoes(Tramitacao, t), versoes(Proposicao, proposicao_id),
+        ), alterada_em
+
     def get_queryset(self):
         return (
             Tramitacao.objects
             .select_related("proposicao", "comissao", "relator", "reuniao")
-            .prefetch_related("pareceres_vencidos__relator", "pareceres_vencidos__reuniao")
         )
 
     def get_object(self, queryset=None):
@@ -630,55 +610,113 @@ class TramitacaoDetailView(LoginRequiredMixin, DetailView):
         context = super().get_context_data(**kwargs)
         context["proposicao"] = self.proposicao
 
-        user = self.request.user
-        context["pode_editar"] = (
-            user.is_superuser
-            or self.object.comissao == getattr(user.perfil, "comissao_padrao", None)
+        context["pode_editar"] = self.contexto_usuario.pode_alterar(self.object.comissao_id)
+        # Consulta preguiçosa: só roda se o bloco não estiver no cache de fragmentos
+        context["votos_vencidos"] = (
+            self.object.pareceres_vencidos.select_related("relator", "reuniao").defer("texto")
         )
         return context
 
 
-class TramitacaoPDFView(LoginRequiredMixin, View):
+class TramitacaoPDFView(LoginRequiredMixin, BancoRelatoriosMixin, GetCondicionalMixin, View):
     """
-    Gera o PDF do parecer da tramitação
+    Gera o PDF do parecer da tramitação (com cache em disco: ver www/pdf.py).
+    Com ETag: o navegador que já tem o PDF recebe um 304.
     """
 
-    def get(self, request, pk, *args, **kwargs):
-        tramitacao = get_object_or_404(Tramitacao, pk=pk)
+    template_name = "www/tramitacoes/tramitacao_pdf.html"
 
-        html_string = render_to_string(
-            "www/tramitacoes/tramitacao_pdf.html",
-            {"tramitacao": tramitacao}
+    def versao_condicional(self, request, pk, **kwargs):
+        # O PDF traz ementa, autor e tipo da proposição: entra a versão dela
+        proposicao_id = (
+            Tramitacao.objects.filter(pk=pk).values_list("proposicao_id", flat=True).first()
         )
+        if proposicao_id is None:
+            return None
+        alterada_em, _, votos = ultima_alteracao(Tramitacao.objects.filter(pk=pk))
+        return (
+            "parecer_pdf", versao_templates(self.template_name),
+            pk, alterada_em, votos, versoes(Tramitacao, pk), versoes(Proposicao, proposicao_id),
+        ), alterada_em
 
-        pdf = HTML(string=html_string).write_pdf()
+    def get(self, request, pk, *args, **kwargs):
+        # Tudo que o template usa vem nesta consulta + 1 prefetch
+        tramitacao = get_object_or_404(
+            Tramitacao.objects
+            .select_related("proposicao__tipo", "comissao", "relator")
+            .prefetch_related("pareceres_vencidos__relator"),
+            pk=pk,
+        )
 
-        response = HttpResponse(pdf, content_type="application/pdf")
-        response["Content-Disposition"] = (
-            f'inline; filename="parecer_tramitacao_{pk}.pdf"'
+        chave = impressao_digital(
+            "tramitacao",
+            versao_templates(self.template_name),
+            tramitacao.pk,
+            tramitacao.alterada_em,
+            str(tramitacao.proposicao),
+            str(tramitacao.comissao),
+            str(tramitacao.relator),
+            tramitacao.data_entrada,
+            [
+                (v.pk, str(v.relator), resumo_texto(v.texto))
+                for v in tramitacao.pareceres_vencidos.all()
+            ],
         )
 
-        return response
+        return resposta_pdf_em_cache(
+            request,
+            chave,
+            f"parecer_tramitacao_{pk}.pdf",
+            lambda: render_to_string(self.template_name, {"tramitacao": tramitacao}),
+        )
+
+
+class TextoSobDemandaView(LoginRequiredMixin, GetCondicionalMixin, View):
+    """
+    Texto completo (HTML do CKEditor) de um parecer, como fragmento para o
+    <details> das listagens (www/static/www/texto_sob_demanda.js).
+    A subclasse define texto_queryset(**kwargs).
+    """
+
+    template_name = "www/tramitacoes/texto_fragmento.html"
+
+    def texto_queryset(self, **kwargs):
+        raise NotImplementedError
+
+    def versao_condicional(self, request, *args, **kwargs):
+        alterada_em = self.texto_queryset(**kwargs).values_list("alterada_em", flat=True).first()
+        if alterada_em is None:
+            return None
+        return ("texto", versao_templates(self.template_name), kwargs, alterada_em), alterada_em
+
+    def get(self, request, *args, **kwargs):
+        texto = self.texto_queryset(**kwargs).values_list("texto", flat=True).first()
+        if texto is None:
+            raise Http404("Texto não encontrado")
+        return render(request, self.template_name, {"texto": texto})
+
+
+class TramitacaoTextoView(TextoSobDemandaView):
+
+    def texto_queryset(self, proposicao_id, t, **kwargs):
+        return Tramitacao.objects.filter(pk=t, proposicao_id=proposicao_id)
 
 
 
 ###################################################################################
 
-class ParecerVencidoCreateView(LoginRequiredMixin, CreateView):
+class ParecerVencidoCreateView(LoginRequiredMixin, ContextoUsuarioMixin, CreateView):
     model = ParecerVencido
     form_class = ParecerVencidoForm
     template_name = "www/pareceres_vencidos/parecervencido_form.html"
 
     def dispatch(self, request, *args, **kwargs):
         self.tramitacao = get_object_or_404(
-            Tramitacao, pk=kwargs["tramitacao_id"]
+            Tramitacao.objects.select_related("proposicao"), pk=kwargs["tramitacao_id"]
         )
-        user = request.user
 
         # 🔒 permissão por comissão
-        if not user.is_superuser:
-            if self.tramitacao.comissao != user.perfil.comissao_padrao:
-                raise Http404("Acesso negado")
+        self.exigir_permissao_comissao(self.tramitacao.comissao_id)
 
         return super().dispatch(request, *args, **kwargs)
 
@@ -686,6 +724,11 @@ class ParecerVencidoCreateView(LoginRequiredMixin, CreateView):
         form.instance.tramitacao = self.tramitacao
         return super().form_valid(form)
 
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs["comissao"] = self.tramitacao.comissao_id
+        return kwargs
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["tramitacao"] = self.tramitacao
@@ -702,20 +745,17 @@ class ParecerVencidoCreateView(LoginRequiredMixin, CreateView):
         )
 
 
-class ParecerVencidoUpdateView(LoginRequiredMixin, UpdateView):
+class ParecerVencidoUpdateView(LoginRequiredMixin, ContextoUsuarioMixin, UpdateView):
     model = ParecerVencido
     form_class = ParecerVencidoForm
     template_name = "www/pareceres_vencidos/parecervencido_form.html"
 
     def dispatch(self, request, *args, **kwargs):
         self.tramitacao = get_object_or_404(
-            Tramitacao, pk=kwargs["tramitacao_id"]
+            Tramitacao.objects.select_related("proposicao"), pk=kwargs["tramitacao_id"]
         )
-        user = request.user
 
-        if not user.is_superuser:
-            if self.tramitacao.comissao != user.perfil.comissao_padrao:
-                raise Http404("Acesso negado")
+        self.exigir_permissao_comissao(self.tramitacao.comissao_id)
 
         return super().dispatch(request, *args, **kwargs)
 
@@ -728,6 +768,11 @@ class ParecerVencidoUpdateView(LoginRequiredMixin, UpdateView):
 
         return obj
 
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs["comissao"] = self.tramitacao.comissao_id
+        return kwargs
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["tramitacao"] = self.tramitacao
@@ -744,19 +789,16 @@ class ParecerVencidoUpdateView(LoginRequiredMixin, UpdateView):
         )
 
 
-class ParecerVencidoDeleteView(LoginRequiredMixin, DeleteView):
+class ParecerVencidoDeleteView(LoginRequiredMixin, ContextoUsuarioMixin, DeleteView):
     model = ParecerVencido
     template_name = "www/pareceres_vencidos/parecervencido_confirm_delete.html"
 
     def dispatch(self, request, *args, **kwargs):
         self.tramitacao = get_object_or_404(
-            Tramitacao, pk=kwargs["tramitacao_id"]
+            Tramitacao.objects.select_related("proposicao"), pk=kwargs["tramitacao_id"]
         )
-        user = request.user
 
-        if not user.is_superuser:
-            if self.tramitacao.comissao != user.perfil.comissao_padrao:
-                raise Http404("Acesso negado")
+        self.exigir_permissao_comissao(self.tramitacao.comissao_id)
 
         return super().dispatch(request, *args, **kwargs)
 
@@ -784,28 +826,21 @@ class ParecerVencidoDeleteView(LoginRequiredMixin, DeleteView):
         )
 
 
+class ParecerVencidoTextoView(TextoSobDemandaView):
+
+    def texto_queryset(self, tramitacao_id, pk, **kwargs):
+        return ParecerVencido.objects.filter(pk=pk, tramitacao_id=tramitacao_id)
+
+
 ###################################################################################
 
 
-class ReuniaoListView(LoginRequiredMixin, ListView):
+class ReuniaoListView(LoginRequiredMixin, ContextoUsuarioMixin, ListView):
     model = Reuniao
     template_name = "www/reunioes/reuniao_list.html"
     context_object_name = "reunioes"
     paginate_by = 10
 
-    def _comissao_selecionada(self):
-        if hasattr(self, "_comissao_cache"):
-            return self._comissao_cache
-
-        comissao = self.request.GET.get("comissao")
-        if comissao is None:
-            user = self.request.user
-            if getattr(user, "perfil", None) and user.perfil.comissao_padrao_id:
-                comissao = str(user.perfil.comissao_padrao_id)
-
-        self._comissao_cache = comissao
-        return comissao
-
     def _ano_selecionado(self):
         return self.request.GET.get("ano") or ""
 
@@ -828,20 +863,39 @@ class ReuniaoListView(LoginRequiredMixin, ListView):
         params = self.request.GET.copy()
         params.pop("page", None)
         context["querystring"] = params.urlencode()
+        if context.get("is_paginated"):
+            context["paginas"] = janela_de_paginas(context["page_obj"])
 
-        context["comissoes"] = Comissao.objects.filter(ativa=True)
+        context["comissoes"] = comissoes_ativas()
         context["comissao_selecionada"] = self._comissao_selecionada()
         context["ano_selecionado"] = self._ano_selecionado()
 
-        context["anos"] = (
-            Reuniao.objects
-            .dates("data", "year", order="DESC")
-        )
+        context["anos"] = anos_com_reunioes()
 
         return context
 
 
-class ReuniaoCreateView(LoginRequiredMixin, CreateView):
+class ReuniaoExportView(BancoRelatoriosMixin, ExportacaoMixin, ReuniaoListView):
+    """Listagem de reuniões em CSV/XLSX, com os filtros da tela."""
+
+    nome_exportacao = "reunioes"
+    titulo_exportacao = "Reuniões"
+    CAMPOS = (
+        "comissao__sigla", "tipo", "numero", "data", "hora",
+        "data_edital_do", "tem_edital_assinado", "tem_presenca_assinada",
+        "tem_ata_assinada", "data_ata_do", "tem_parecer_assinado",
+        "tem_deliberacao", "tem_deliberacao_assinada",
+        "tem_conclusao", "tem_conclusao_assinada",
+    )
+    colunas = ("Comissão", "Tipo", "Ordem", "Data", "Hora") + tuple(
+        Reuniao._meta.get_field(campo).verbose_name for campo in CAMPOS[5:]
+    )
+
+    def linhas_exportacao(self):
+        return self.get_queryset().values_list(*self.CAMPOS).iterator(chunk_size=2000)
+
+
+class ReuniaoCreateView(LoginRequiredMixin, ContextoUsuarioMixin, CreateView):
     model = Reuniao
     form_class = ReuniaoForm
     template_name = "www/reunioes/reuniao_form.html"
@@ -849,9 +903,8 @@ class ReuniaoCreateView(LoginRequiredMixin, CreateView):
 
     def get_initial(self):
         initial = super().get_initial()
-        user = self.request.user
-        if getattr(user, "perfil", None) and user.perfil.comissao_padrao_id:
-            initial["comissao"] = user.perfil.comissao_padrao_id
+        if self.contexto_usuario.comissao_id:
+            initial["comissao"] = self.contexto_usuario.comissao_id
         return initial
 
 
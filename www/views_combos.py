@@ -0,0 +1,153 @@
+"""
+Busca remota das combos (Reunião, Relator e Autor), em JSON.
+
+Os formulários só renderizam a opção já escolhida (BuscaRemotaSelect em
+www/forms.py); o restante vem daqui conforme o usuário digita. Cada
+resposta traz no máximo LIMITE itens, casados por prefixo e restritos
+por comissão/ano quando informados, então nem a página nem a resposta
+crescem com o histórico.
+
+Resposta: {"resultados": [{"id": ..., "texto": ...}, ...], "mais": bool}
+("mais" = há outros itens além do limite: refinar a busca).
+"""
+
+import re
+
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db.models import Q
+from django.http import JsonResponse
+from django.views.generic import View
+
+from www.models import Autor, Reuniao
+
+# "3ª", "3º" ou "3" -> ordem da reunião; 4 dígitos -> ano
+_TERMO = re.compile(r"\w+", re.UNICODE)
+_ORDEM = re.compile(r"^(\d{1,3})[ªº°]?$")
+_ANO = re.compile(r"^\d{4}$")
+
+
+def _inteiro(valor):
+    """Parâmetro do GET como inteiro; vazio/inválido -> None."""
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return None
+
+
+def filtrar_reunioes(qs, busca):
+    """
+    Busca nas reuniões: "3" ou "3ª" casa a ordem, "2025" o ano e o texto
+    o início do tipo ou da sigla da comissão (todos os termos valem).
+    """
+    for termo in _TERMO.findall(busca or ""):
+        if _ANO.match(termo):
+            qs = qs.filter(data__year=int(termo))
+        elif ordem := _ORDEM.match(termo):
+            qs = qs.filter(numero__startswith=ordem.group(1))
+        else:
+            qs = qs.filter(
+                Q(tipo__istartswith=termo)
+                | Q(comissao__sigla__istartswith=termo)
+            )
+    return qs
+
+
+def filtrar_autores(qs, busca):
+    """Autores pelo início do nome ou de qualquer sobrenome."""
+    for termo in (busca or "").split():
+        qs = qs.filter(Q(nome__istartswith=termo) | Q(nome__icontains=f" {termo}"))
+    return qs
+
+
+# =========================================================================
+# 🔹 Infraestrutura comum
+# =========================================================================
+
+class BuscaComboView(LoginRequiredMixin, View):
+    """
+    Base dos endpoints: lê 'q' e 'limite', filtra e devolve o JSON.
+    'limite' nunca passa de LIMITE_MAXIMO; vazio, inválido ou <= 0 vale LIMITE.
+    """
+
+    LIMITE = 20
+    LIMITE_MAXIMO = 50
+
+    def get_queryset(self):
+        raise NotImplementedError
+
+    def filtrar(self, qs, busca):
+        return qs
+
+    def item(self, obj):
+        return {"id": obj.pk, "texto": str(obj)}
+
+    def get(self, request, *args, **kwargs):
+        busca = request.GET.get("q", "").strip()
+        limite = _inteiro(request.GET.get("limite"))
+        if not limite or limite < 1:
+            limite = self.LIMITE
+        limite = min(limite, self.LIMITE_MAXIMO)
+
+        qs = self.filtrar(self.get_queryset(), busca)
+
+        # Uma linha a mais só para saber se há outros resultados
+        linhas = list(qs[: limite + 1])
+        return JsonResponse({
+            "resultados": [self.item(obj) for obj in linhas[:limite]],
+            "mais": len(linhas) > limite,
+        })
+
+
+# =========================================================================
+# 🔹 Reuniões
+# =========================================================================
+
+class BuscaReunioesView(BuscaComboView):
+    """
+    Reuniões da comissão (?comissao=) e do ano (?ano=), mais recentes
+    primeiro; ?q= como em filtrar_reunioes.
+    """
+
+    def get_queryset(self):
+        qs = Reuniao.objects.select_related("comissao")
+
+        comissao = _inteiro(self.request.GET.get("comissao"))
+        if comissao is not None:
+            qs = qs.filter(comissao_id=comissao)
+
+        ano = _inteiro(self.request.GET.get("ano"))
+        if ano is not None:
+            qs = qs.filter(data__year=ano)
+
+        # (comissao, data, hora) / (data, hora): os índices da listagem
+        return qs.order_by("-data", "-hora", "-pk")
+
+    def filtrar(self, qs, busca):
+        return filtrar_reunioes(qs, busca)
+
+    def item(self, reuniao):
+        return {
+            "id": reuniao.pk,
+            "texto": reuniao.descricao_combo,
+            "comissao": reuniao.comissao_id,
+        }
+
+
+# =========================================================================
+# 🔹 Autores / Relatores
+# =========================================================================
+
+class BuscaAutoresView(BuscaComboView):
+    """Autores (e relatores) por filtrar_autores. Só os ativos, salvo ?inativos=1."""
+
+    def get_queryset(self):
+        qs = Autor.objects.order_by("nome", "pk")
+        if self.request.GET.get("inativos") != "1":
+            qs = qs.filter(ativo=True)
+        return qs
+
+    def filtrar(self, qs, busca):
+        return filtrar_autores(qs, busca)
+
+    def item(self, autor):
+        return {"id": autor.pk, "texto": autor.nome}
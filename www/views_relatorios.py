@@ -2,20 +2,49 @@
 Relatórios do sistema legislativo.
 
 Cada relatório possui uma tela (com filtros) e uma versão em PDF.
-A geração de PDF é centralizada no RelatorioPDFMixin.
+A geração de PDF é centralizada no RelatorioPDFMixin (ver www/pdf.py,
+inclusive o modo por tarefa em segundo plano). As leituras vão para o
+banco dos relatórios (BancoRelatoriosMixin, ver www/banco_relatorios.py).
 """
 
+from datetime import date
+from urllib.parse import urlencode
+
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.db import models
-from django.db.models import F, Max, OuterRef, Q, Subquery
-from django.http import Http404, HttpResponse
+from django.db.models import F
+from django.db.models.lookups import GreaterThan
+from django.http import FileResponse, Http404, JsonResponse
 from django.shortcuts import get_object_or_404
 from django.template.loader import render_to_string
-from django.utils.timezone import now
+from django.urls import reverse
+from django.utils.timezone import localdate, now
 from django.views.generic import TemplateView, View
-from weasyprint import HTML
 
-from www.models import Comissao, Proposicao, Reuniao, Tramitacao
+from www.banco_relatorios import BancoRelatoriosMixin
+from www.busca import buscar_proposicoes
+from www.condicional import GetCondicionalMixin, ultima_alteracao
+from www.dossies import (
+    TEMPLATE as DOSSIE_TEMPLATE,
+    dossies_queryset,
+    html_dossie,
+    impressao_digital_dossie,
+    nome_arquivo_dossie,
+)
+from www.exportacao import ExportacaoMixin
+from www.fragmentos import versoes
+from www.models import (
+    DOCUMENTOS_REUNIAO,
+    Comissao,
+    Proposicao,
+    Reuniao,
+    TarefaPDF,
+    Tramitacao,
+)
+from www.pdf import resposta_pdf, resposta_pdf_em_cache, versao_templates
+from www.permissoes import contexto_usuario
+from www.tabelas import anos_com_reunioes, comissoes_ativas
+from www.temporal import ler_data, tramitacoes_atuais, tramitacoes_vigentes_em
 
 
 # =========================================================================
@@ -26,15 +55,66 @@ class RelatorioPDFMixin:
     """Gera a resposta PDF a partir de um template e um contexto."""
 
     def renderizar_pdf(self, template_name, context, filename):
+        return resposta_pdf(
+            self.request, self.renderizar_html(template_name, context), filename
+        )
+
+    def renderizar_html(self, template_name, context):
         context.setdefault("gerado_em", now())
         context.setdefault("gerado_por", self.request.user)
+        return render_to_string(template_name, context)
+
+
+class TarefaPDFMixin:
+    """Tarefa de PDF visível só para quem pediu (ou superusuário)."""
 
-        html_string = render_to_string(template_name, context)
-        pdf = HTML(string=html_string).write_pdf()
+    def get_tarefa(self, pk):
+        tarefa = get_object_or_404(TarefaPDF, pk=pk)
+        user = self.request.user
+        if not user.is_superuser and tarefa.solicitada_por_id != user.pk:
+            raise Http404("Tarefa não encontrada")
+        return tarefa
 
-        response = HttpResponse(pdf, content_type="application/pdf")
-        response["Content-Disposition"] = f'inline; filename="{filename}"'
-        return response
+
+class TarefaPDFDetailView(LoginRequiredMixin, TarefaPDFMixin, TemplateView):
+    """Tela de espera: acompanha a tarefa e abre o PDF quando ficar pronto."""
+
+    template_name = "www/relatorios/tarefa_pdf.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["tarefa"] = self.get_tarefa(kwargs["pk"])
+        return context
+
+
+class TarefaPDFStatusView(LoginRequiredMixin, TarefaPDFMixin, View):
+    """Endpoint de consulta (polling) da tarefa, em JSON."""
+
+    def get(self, request, pk, *args, **kwargs):
+        tarefa = self.get_tarefa(pk)
+        dados = {
+            "id": tarefa.pk,
+            "status": tarefa.status,
+            "status_display": tarefa.get_status_display(),
+            "erro": tarefa.erro,
+            "arquivo_url": None,
+        }
+        if tarefa.status == TarefaPDF.CONCLUIDA:
+            dados["arquivo_url"] = reverse("tarefa_pdf_arquivo", args=[tarefa.pk])
+        return JsonResponse(dados)
+
+
+class TarefaPDFArquivoView(LoginRequiredMixin, TarefaPDFMixin, View):
+    def get(self, request, pk, *args, **kwargs):
+        tarefa = self.get_tarefa(pk)
+        if tarefa.status != TarefaPDF.CONCLUIDA or not tarefa.arquivo:
+            raise Http404("PDF ainda não disponível")
+        return FileResponse(
+            tarefa.arquivo.open("rb"),
+            content_type="application/pdf",
+            filename=tarefa.nome_arquivo,
+            as_attachment=False,
+        )
 
 
 def _comissao_do_filtro(request):
@@ -46,29 +126,23 @@ def _comissao_do_filtro(request):
     if comissao_id:
         return Comissao.objects.filter(pk=comissao_id).first()
     if comissao_id is None:
-        perfil = getattr(request.user, "perfil", None)
-        if perfil and perfil.comissao_padrao_id:
-            return perfil.comissao_padrao
+        return contexto_usuario(request).comissao
     return None
 
 
-def _ultimas_tramitacoes_da_comissao(comissao):
+def _ultimas_tramitacoes_da_comissao(comissao, as_of=None):
     """
     Tramitações que são a ÚLTIMA da sua proposição e pertencem à comissão.
+    Com as_of, as vigentes naquela data (ver www/temporal.py).
     """
-    ultima_data = (
-        Tramitacao.objects
-        .filter(proposicao=OuterRef("proposicao"))
-        .values("proposicao")
-        .annotate(m=Max("data_entrada"))
-        .values("m")[:1]
-    )
+    if as_of:
+        qs = tramitacoes_vigentes_em(as_of, comissao)
+    else:
+        qs = tramitacoes_atuais(comissao)
     return (
-        Tramitacao.objects
-        .filter(comissao=comissao)
-        .annotate(max_data=Subquery(ultima_data))
-        .filter(data_entrada=F("max_data"))
+        qs
         .select_related("proposicao", "proposicao__tipo", "relator", "reuniao")
+        .defer("texto")
         .order_by("data_entrada")
     )
 
@@ -77,26 +151,29 @@ def _ultimas_tramitacoes_da_comissao(comissao):
 # 1️⃣ Situação da Comissão
 # =========================================================================
 
-class RelatorioSituacaoComissaoView(LoginRequiredMixin, TemplateView):
+class RelatorioSituacaoComissaoView(LoginRequiredMixin, BancoRelatoriosMixin, TemplateView):
     template_name = "www/relatorios/situacao_comissao.html"
 
     def montar_dados(self):
         comissao = _comissao_do_filtro(self.request)
+        # 🕒 Situação numa data passada (?as_of=aaaa-mm-dd); sem ela, a atual
+        as_of = ler_data(self.request.GET.get("as_of"))
 
         com_relator, aguardando = [], []
         if comissao:
-            hoje = now().date()
-            for t in _ultimas_tramitacoes_da_comissao(comissao):
+            referencia = as_of or localdate()
+            for t in _ultimas_tramitacoes_da_comissao(comissao, as_of):
                 item = {
                     "proposicao": t.proposicao,
                     "tramitacao": t,
-                    "dias": (hoje - t.data_entrada).days,
+                    "dias": (referencia - t.data_entrada).days,
                 }
                 (com_relator if t.relator_id else aguardando).append(item)
 
         return {
             "comissao": comissao,
-            "comissoes": Comissao.objects.filter(ativa=True),
+            "as_of": as_of,
+            "comissoes": comissoes_ativas(),
             "com_relator": com_relator,
             "aguardando": aguardando,
             "total": len(com_relator) + len(aguardando),
@@ -114,64 +191,195 @@ class RelatorioSituacaoComissaoPDFView(RelatorioPDFMixin,
         dados = self.montar_dados()
         if not dados["comissao"]:
             raise Http404("Selecione uma comissão para gerar o PDF.")
+        sufixo = f"_{dados['as_of']:%Y-%m-%d}" if dados["as_of"] else ""
         return self.renderizar_pdf(
             "www/relatorios/situacao_comissao_pdf.html",
             dados,
-            f"situacao_{dados['comissao'].sigla}.pdf",
+            f"situacao_{dados['comissao'].sigla}{sufixo}.pdf",
+        )
+
+
+class RelatorioSituacaoComissaoExportView(ExportacaoMixin,
+                                          RelatorioSituacaoComissaoView):
+    titulo_exportacao = "Situação da comissão"
+    colunas = (
+        "Situação", "Tipo", "Número", "Ementa", "Relator", "Parecer",
+        "Entrada", "Dias na comissão",
+    )
+
+    def get(self, request, *args, **kwargs):
+        self.comissao = _comissao_do_filtro(request)
+        if not self.comissao:
+            raise Http404("Selecione uma comissão para exportar.")
+        self.as_of = ler_data(request.GET.get("as_of"))
+        return super().get(request, *args, **kwargs)
+
+    def get_nome_exportacao(self):
+        sufixo = f"_{self.as_of:%Y-%m-%d}" if self.as_of else ""
+        return f"situacao_{self.comissao.sigla}{sufixo}"
+
+    def linhas_exportacao(self):
+        referencia = self.as_of or localdate()
+        linhas = (
+            _ultimas_tramitacoes_da_comissao(self.comissao, self.as_of)
+            # como na tela: aguardando parecer primeiro, cada bloco por entrada
+            .annotate(com_relator=models.ExpressionWrapper(
+                models.Q(relator__isnull=False), output_field=models.BooleanField()
+            ))
+            .order_by("com_relator", "data_entrada")
+            .values_list(
+                "relator__nome", "proposicao__tipo__sigla",
+                "proposicao__numero_formatado", "proposicao__ementa",
+                "parecer", "data_entrada",
+            )
+            .iterator(chunk_size=2000)
         )
+        for relator, sigla, numero, ementa, parecer, data_entrada in linhas:
+            yield (
+                "Com relator" if relator else "Aguardando parecer",
+                sigla, numero, ementa, relator, parecer,
+                data_entrada, (referencia - data_entrada).days,
+            )
 
 
 # =========================================================================
 # 6️⃣ Pendências documentais das Reuniões
 # =========================================================================
 
-# (campo, rótulo) — usados para montar a lista de pendências de cada reunião
-CAMPOS_DOCUMENTAIS = [
-    ("tem_edital_assinado", "Edital assinado"),
-    ("tem_presenca_assinada", "Presença assinada"),
-    ("tem_ata_assinada", "Ata assinada"),
-    ("tem_parecer_assinado", "Parecer assinado"),
-    ("tem_deliberacao_assinada", "Deliberação assinada"),
-    ("tem_conclusao_assinada", "Conclusão assinada"),
-]
+# (campo, rótulo) — colunas dos documentos, na ordem dos bits de Reuniao.pendencias
+CAMPOS_DOCUMENTAIS = [(campo, rotulo) for campo, rotulo, _ in DOCUMENTOS_REUNIAO]
+_BITS_DOCUMENTOS = {campo: bit for campo, _, bit in DOCUMENTOS_REUNIAO}
+
+
+def _ano(valor):
+    """Ano do GET; vazio/inválido -> None."""
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return None
+
+
+def _documento_pendente(bit):
+    """Condição SQL: o bit do documento está ligado em Reuniao.pendencias."""
+    return GreaterThan(F("pendencias").bitand(bit), 0)
 
 
-class RelatorioPendenciasReunioesView(LoginRequiredMixin, TemplateView):
+def pendencias_por_comissao(reunioes):
+    """
+    Matriz comissão × documento: para cada comissão, o total de reuniões,
+    quantas têm alguma pendência e quantas têm cada documento pendente.
+    Uma única consulta agrupada (COUNT condicional sobre a máscara
+    Reuniao.pendencias): nenhuma reunião é carregada.
+    """
+    contagens = {
+        campo: models.Count("pk", filter=_documento_pendente(bit))
+        for campo, _, bit in DOCUMENTOS_REUNIAO
+    }
+    linhas = (
+        reunioes
+        .order_by()
+        .values("comissao_id", "comissao__sigla")
+        .annotate(
+            total=models.Count("pk"),
+            pendentes=models.Count("pk", filter=models.Q(pendencias__gt=0)),
+            **contagens,
+        )
+        .order_by("comissao__sigla")
+    )
+    return [
+        {
+            "sigla": linha["comissao__sigla"],
+            "total": linha["total"],
+            "pendentes": linha["pendentes"],
+            "documentos": [linha[campo] for campo, _ in CAMPOS_DOCUMENTAIS],
+        }
+        for linha in linhas
+    ]
+
+
+class RelatorioPendenciasReunioesView(LoginRequiredMixin, BancoRelatoriosMixin, TemplateView):
+    """
+    Pendências documentais, calculadas pelo banco (Reuniao.pendencias).
+    Filtros: comissão, período (?ano= ou ?ano_inicio=&ano_fim=), documento
+    pendente (?documento=<campo>) e ?todas=1 para incluir as sem pendência.
+    """
+
     template_name = "www/relatorios/pendencias_reunioes.html"
 
-    def montar_dados(self):
+    def periodo(self):
+        """(ano_inicio, ano_fim); ?ano= vale para os dois, padrão = ano atual."""
+        ano = _ano(self.request.GET.get("ano")) or now().year
+        inicio = _ano(self.request.GET.get("ano_inicio")) or ano
+        fim = _ano(self.request.GET.get("ano_fim")) or ano
+        return min(inicio, fim), max(inicio, fim)
+
+    def documento(self):
+        """Campo do documento escolhido no filtro (ou None = qualquer um)."""
+        documento = self.request.GET.get("documento")
+        return documento if documento in _BITS_DOCUMENTOS else None
+
+    def reunioes_do_periodo(self):
+        """(comissão, ano_inicio, ano_fim, reuniões da comissão no período)."""
         comissao = _comissao_do_filtro(self.request)
-        ano = self.request.GET.get("ano") or now().year
-        somente_pendentes = self.request.GET.get("todas") != "1"
+        ano_inicio, ano_fim = self.periodo()
 
-        reunioes = (
-            Reuniao.objects
-            .filter(data__year=ano)
-            .select_related("comissao")
-            .order_by("comissao__sigla", "data")
+        # Intervalo de datas (e não data__year): usa os índices por data
+        reunioes = Reuniao.objects.filter(
+            data__gte=date(ano_inicio, 1, 1),
+            data__lte=date(ano_fim, 12, 31),
         )
         if comissao:
             reunioes = reunioes.filter(comissao=comissao)
+        return comissao, ano_inicio, ano_fim, reunioes
+
+    def filtros(self):
+        """(comissão, ano_inicio, ano_fim, somente_pendentes, documento, reuniões do filtro)."""
+        comissao, ano_inicio, ano_fim, reunioes = self.reunioes_do_periodo()
+        somente_pendentes = self.request.GET.get("todas") != "1"
+        documento = self.documento()
+
+        if documento:
+            reunioes = reunioes.filter(_documento_pendente(_BITS_DOCUMENTOS[documento]))
+        elif somente_pendentes:
+            # Índice parcial reuniao_pendente_idx: só as reuniões com pendência
+            reunioes = reunioes.filter(pendencias__gt=0)
 
-        linhas = []
-        for reuniao in reunioes:
-            pendencias = [
-                rotulo
-                for campo, rotulo in CAMPOS_DOCUMENTAIS
-                if getattr(reuniao, campo) is not True
-            ]
-            if pendencias or not somente_pendentes:
-                linhas.append({"reuniao": reuniao, "pendencias": pendencias})
+        reunioes = reunioes.select_related("comissao").order_by("comissao__sigla", "data")
+        return comissao, ano_inicio, ano_fim, somente_pendentes, documento, reunioes
 
-        anos = Reuniao.objects.dates("data", "year", order="DESC")
+    def sufixo_arquivo(self, comissao, ano_inicio, ano_fim):
+        sufixo = comissao.sigla if comissao else "todas"
+        periodo = str(ano_inicio) if ano_inicio == ano_fim else f"{ano_inicio}-{ano_fim}"
+        return f"{sufixo}_{periodo}"
+
+    def montar_dados(self):
+        comissao, ano_inicio, ano_fim, somente_pendentes, documento, reunioes = self.filtros()
+
+        linhas = [
+            {"reuniao": reuniao, "pendencias": reuniao.rotulos_pendencias}
+            for reuniao in reunioes
+        ]
 
         return {
             "comissao": comissao,
-            "comissoes": Comissao.objects.filter(ativa=True),
-            "ano": int(ano),
-            "anos": anos,
+            "comissoes": comissoes_ativas(),
+            "ano_inicio": ano_inicio,
+            "ano_fim": ano_fim,
+            "anos": anos_com_reunioes(),
             "somente_pendentes": somente_pendentes,
+            "documento": documento,
+            "documentos": CAMPOS_DOCUMENTAIS,
+            # A matriz ignora os filtros de pendência: é o panorama do período
+            "matriz": pendencias_por_comissao(self.reunioes_do_periodo()[3]),
             "linhas": linhas,
+            # Mesmos filtros nos links de PDF/Excel/CSV
+            "filtros": urlencode({
+                "ano_inicio": ano_inicio,
+                "ano_fim": ano_fim,
+                "comissao": comissao.pk if comissao else "",
+                "documento": documento or "",
+                **({} if somente_pendentes else {"todas": 1}),
+            }),
         }
 
     def get_context_data(self, **kwargs):
@@ -184,19 +392,45 @@ class RelatorioPendenciasReunioesPDFView(RelatorioPDFMixin,
                                          RelatorioPendenciasReunioesView):
     def get(self, request, *args, **kwargs):
         dados = self.montar_dados()
-        sufixo = dados["comissao"].sigla if dados["comissao"] else "todas"
+        sufixo = self.sufixo_arquivo(dados["comissao"], dados["ano_inicio"], dados["ano_fim"])
         return self.renderizar_pdf(
             "www/relatorios/pendencias_reunioes_pdf.html",
             dados,
-            f"pendencias_reunioes_{sufixo}_{dados['ano']}.pdf",
+            f"pendencias_reunioes_{sufixo}.pdf",
         )
 
 
+class RelatorioPendenciasReunioesExportView(ExportacaoMixin,
+                                            RelatorioPendenciasReunioesView):
+    titulo_exportacao = "Pendências das reuniões"
+    colunas = (
+        "Comissão", "Tipo", "Ordem", "Data",
+        *(rotulo for _, rotulo in CAMPOS_DOCUMENTAIS),
+        "Pendências",
+    )
+
+    def get(self, request, *args, **kwargs):
+        self.comissao, self.ano_inicio, self.ano_fim, _, _, self.reunioes = self.filtros()
+        return super().get(request, *args, **kwargs)
+
+    def get_nome_exportacao(self):
+        return f"pendencias_reunioes_{self.sufixo_arquivo(self.comissao, self.ano_inicio, self.ano_fim)}"
+
+    def linhas_exportacao(self):
+        campos = [campo for campo, _ in CAMPOS_DOCUMENTAIS]
+        linhas = self.reunioes.values_list(
+            "comissao__sigla", "tipo", "numero", "data", *campos, "pendencias"
+        ).iterator(chunk_size=2000)
+        for *linha, pendencias in linhas:
+            rotulos = [rotulo for _, rotulo, bit in DOCUMENTOS_REUNIAO if pendencias & bit]
+            yield (*linha, ", ".join(rotulos))
+
+
 # =========================================================================
 # 3️⃣ Dossiê da Proposição
 # =========================================================================
 
-class RelatorioDossieView(LoginRequiredMixin, TemplateView):
+class RelatorioDossieView(LoginRequiredMixin, BancoRelatoriosMixin, TemplateView):
     """Tela de busca da proposição para geração do dossiê."""
 
     template_name = "www/relatorios/dossie.html"
@@ -207,35 +441,30 @@ class RelatorioDossieView(LoginRequiredMixin, TemplateView):
         context["busca"] = busca
 
         if busca:
-            context["resultados"] = (
-                Proposicao.objects
-                .filter(
-                    Q(numero__icontains=busca) |
-                    Q(numero_formatado__icontains=busca) |
-                    Q(ementa__icontains=busca)
-                )
-                .select_related("tipo")[:20]
-            )
+            # 🔍 Índice full-text: resultados por relevância, com trecho destacado
+            context["resultados"] = buscar_proposicoes(busca, limite=20)
         return context
 
 
-class RelatorioDossiePDFView(LoginRequiredMixin, RelatorioPDFMixin, View):
-    def get(self, request, pk, *args, **kwargs):
-        proposicao = get_object_or_404(
-            Proposicao.objects
-            .select_related("tipo")
-            .prefetch_related(
-                "autores",
-                "tramitacoes__comissao",
-                "tramitacoes__relator",
-                "tramitacoes__reuniao",
-                "tramitacoes__pareceres_vencidos__relator",
-                "tramitacoes__pareceres_vencidos__reuniao",
-            ),
-            pk=pk,
+class RelatorioDossiePDFView(LoginRequiredMixin, BancoRelatoriosMixin, GetCondicionalMixin, View):
+
+    def versao_condicional(self, request, pk, **kwargs):
+        # O cabeçalho do PDF informa quem o gerou e em que dia: usuário e
+        # data no ETag, como na chave do cache (impressao_digital_dossie)
+        alterada_em, tramitacoes, votos = ultima_alteracao(
+            Tramitacao.objects.filter(proposicao_id=pk)
         )
-        return self.renderizar_pdf(
-            "www/relatorios/dossie_pdf.html",
-            {"proposicao": proposicao},
-            f"dossie_{proposicao.pk}.pdf",
+        return (
+            "dossie_pdf", versao_templates(DOSSIE_TEMPLATE, "www/relatorios/base_pdf.html"),
+            request.user.pk, localdate(), pk, alterada_em, tramitacoes, votos,
+            versoes(Proposicao, pk),
+        ), alterada_em
+
+    def get(self, request, pk, *args, **kwargs):
+        proposicao = get_object_or_404(dossies_queryset(), pk=pk)
+        return resposta_pdf_em_cache(
+            request,
+            impressao_digital_dossie(proposicao, request.user),
+            nome_arquivo_dossie(proposicao),
+            lambda: html_dossie(proposicao, request.user),
         )